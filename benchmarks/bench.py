@@ -0,0 +1,244 @@
+"""
+Offline benchmarks for the tariff engine hot paths.
+
+Generates synthetic 15-min price series (1 day to 1 year) and times the
+statistics, fusion, parsing and storage paths plus what entities do when
+writing state. No network or Home Assistant instance is needed.
+
+    python -m benchmarks.bench                 # print timings
+    python -m benchmarks.bench --check         # compare with baseline.json
+    python -m benchmarks.bench --update        # record a new baseline
+
+Timings are machine dependent: record the baseline on the machine that
+runs --check. A case regresses when it is slower than its baseline times
+--threshold.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import json
+import platform
+import random
+import sys
+import timeit
+from collections.abc import Callable
+from pathlib import Path
+
+from custom_components.ekz_tariffs import statistics
+from custom_components.ekz_tariffs.api import TariffSeries, _parse_prices
+from custom_components.ekz_tariffs.snapshot import TariffSnapshot
+from custom_components.ekz_tariffs.statistics import (
+    bucket_prices,
+    bucket_prices_range,
+    daily_stats,
+    rolling_window_extreme,
+)
+from custom_components.ekz_tariffs.storage import (
+    _RECORD,
+    _latest_wins,
+    slots_from_json,
+)
+from custom_components.ekz_tariffs.utils import fuse_slots
+from homeassistant.util import dt as dt_util
+
+BASELINE = Path(__file__).with_name("baseline.json")
+TIME_ZONE = "Europe/Zurich"
+START = dt.date(2025, 1, 1)
+SIZES = {"day": 1, "week": 7, "month": 31, "year": 365}
+WINDOWS = (120, 240)
+# Cases that depend on statistics.ENGINE; the rest run once as "common"
+ENGINE_CASES = {
+    "daily_stats",
+    "bucket_prices",
+    "bucket_prices_range",
+    "rolling_window_extreme",
+    "snapshot_cold",
+    "sensor_paths",
+}
+
+Case = Callable[[], object]
+
+
+def make_series(days: int, seed: int = 0) -> TariffSeries:
+    """Contiguous 15-min slots from START with a daily price shape + noise."""
+    rng = random.Random(seed)
+    tz = dt_util.get_time_zone(TIME_ZONE)
+    start = int(dt.datetime.combine(START, dt.time.min, tz).timestamp())
+    end = int(
+        dt.datetime.combine(
+            START + dt.timedelta(days=days), dt.time.min, tz
+        ).timestamp()
+    )
+    rows = []
+    for ts in range(start, end, 900):
+        hour = (ts - start) // 3600 % 24
+        base = 0.30 if 7 <= hour < 21 else 0.18
+        rows.append((ts, ts + 900, round(base + rng.uniform(-0.05, 0.05), 4)))
+    return TariffSeries.from_rows(rows)
+
+
+def _iso(ts: int) -> str:
+    return dt_util.as_local(dt_util.utc_from_timestamp(ts)).isoformat()
+
+
+def cases(series: TariffSeries, days: int) -> dict[str, Case]:
+    last_day = START + dt.timedelta(days=days - 1)
+    now = dt_util.as_local(
+        dt.datetime.combine(last_day, dt.time(12, 7), dt_util.DEFAULT_TIME_ZONE)
+    )
+    prices, day_start = bucket_prices(series, last_day)
+    span_start = dt_util.as_local(dt_util.utc_from_timestamp(series.starts[0]))
+    span_end = dt_util.as_local(dt_util.utc_from_timestamp(series.ends[-1]))
+
+    api_body = {
+        "prices": [
+            {
+                "start_timestamp": _iso(s),
+                "end_timestamp": _iso(e),
+                "integrated": [{"unit": "CHF_kWh", "value": p}],
+            }
+            for s, e, p in series.rows()
+        ]
+    }
+    legacy_json = [
+        {"start": _iso(s), "end": _iso(e), "price": p} for s, e, p in series.rows()
+    ]
+    packed = b"".join(_RECORD.pack(*row) for row in series.rows())
+
+    warm = TariffSnapshot.build(series, WINDOWS)
+
+    def sensor_paths() -> None:
+        # What the entities read when writing state (warm snapshot).
+        warm.current(now)
+        warm.next_boundary(now)
+        today = warm.day_offset(now, 0)
+        for minutes in WINDOWS:
+            today.window(minutes, "min")
+            today.window(minutes, "max")
+            warm.rolling.window(now, minutes, "min")
+        today.is_cheapest(now, 16)
+        warm.rolling.average(now)
+
+    def snapshot_cold() -> None:
+        # A refresh: build the snapshot and serve today's entities once.
+        snap = TariffSnapshot.build(series, WINDOWS)
+        day = snap.day_offset(now, 0)
+        for minutes in WINDOWS:
+            day.window(minutes, "min")
+        snap.rolling.window(now, WINDOWS[-1], "min")
+
+    return {
+        "fuse_slots": lambda: fuse_slots(series),
+        "daily_stats": lambda: daily_stats(series, last_day),
+        "bucket_prices": lambda: bucket_prices(series, last_day),
+        "bucket_prices_range": lambda: bucket_prices_range(
+            series, span_start, span_end
+        ),
+        "rolling_window_extreme": lambda: rolling_window_extreme(
+            prices, day_start, 240, "min"
+        ),
+        "parse_api_response": lambda: _parse_prices(api_body),
+        "slots_from_json": lambda: slots_from_json(legacy_json),
+        "archive_encode": lambda: b"".join(_RECORD.pack(*r) for r in series.rows()),
+        "archive_decode": lambda: _latest_wins(list(_RECORD.iter_unpack(packed))),
+        "snapshot_cold": snapshot_cold,
+        "sensor_paths": sensor_paths,
+    }
+
+
+def measure(fn: Case, repeat: int) -> float:
+    """Best time per call in microseconds."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e6
+
+
+def run(sizes: list[str], engines: list[str], repeat: int) -> dict[str, float]:
+    results: dict[str, float] = {}
+    default_engine = statistics.ENGINE
+    try:
+        for size in sizes:
+            days = SIZES[size]
+            series = make_series(days)
+            for engine in engines:
+                statistics.ENGINE = engine
+                for name, fn in cases(series, days).items():
+                    if name in ENGINE_CASES:
+                        key = f"{engine}/{name}/{size}"
+                    elif engine == engines[0]:
+                        key = f"common/{name}/{size}"
+                    else:
+                        continue
+                    results[key] = measure(fn, repeat)
+                    print(f"{key:45} {results[key]:12.1f} us", flush=True)
+    finally:
+        statistics.ENGINE = default_engine
+    return results
+
+
+def compare(
+    results: dict[str, float], baseline: dict[str, float], threshold: float
+) -> list[str]:
+    regressions = []
+    for key, value in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        ratio = value / base
+        if ratio > threshold:
+            regressions.append(
+                f"{key}: {value:.1f} us vs {base:.1f} us baseline ({ratio:.2f}x)"
+            )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--sizes", default=",".join(SIZES), help="comma separated: day,week,..."
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["python", "numpy", "all"],
+        default="all" if statistics.np is not None else "python",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--threshold", type=float, default=1.5)
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--check", action="store_true")
+    mode.add_argument("--update", action="store_true")
+    args = parser.parse_args(argv)
+
+    dt_util.set_default_time_zone(dt_util.get_time_zone(TIME_ZONE))
+    engines = ["python", "numpy"] if args.engine == "all" else [args.engine]
+    results = run(args.sizes.split(","), engines, args.repeat)
+
+    if args.update:
+        args.baseline.write_text(
+            json.dumps(
+                {
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "results": {k: round(v, 1) for k, v in sorted(results.items())},
+                },
+                indent=2,
+            )
+            + "\n"
+        )
+        print(f"Baseline written to {args.baseline}")
+    elif args.check:
+        baseline = json.loads(args.baseline.read_text())["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print(f"No regressions (threshold {args.threshold}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
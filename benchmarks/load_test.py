@@ -0,0 +1,145 @@
+"""
+Load test: many EKZ tariff entries refreshing against the mock API.
+
+Starts benchmarks.mock_server in-process and drives the real fetch path
+(EkzTariffsCoordinator -> FetchManager -> EkzTariffsApi with response
+cache -> TariffArchive) for N entries through three rounds:
+
+    cold         empty archives, the whole window is downloaded
+    refetch      manual refresh, answered by 304 from the response cache
+    incremental  daily refresh with complete data, no request at all
+
+    python -m benchmarks.load_test --entries 50 --latency 0.2 --error-rate 0.05
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import tempfile
+import time
+
+from custom_components.ekz_tariffs.api import EkzTariffsApi
+from custom_components.ekz_tariffs.coordinator import EkzTariffsCoordinator
+from custom_components.ekz_tariffs.fetch import FetchManager
+from custom_components.ekz_tariffs.storage import ResponseCache, TariffArchive
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from pytest_homeassistant_custom_component.common import async_test_home_assistant
+
+from benchmarks.mock_server import MockConfig, MockEkzServer
+
+ROUNDS = ("cold", "refetch", "incremental")
+
+
+async def _timed_refresh(coordinator: EkzTariffsCoordinator) -> float:
+    started = time.perf_counter()
+    await coordinator.async_refresh()
+    return time.perf_counter() - started
+
+
+def _percentile(values: list[float], q: float) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[int(q) - 1]
+
+
+async def run(args: argparse.Namespace) -> list[dict]:
+    server = MockEkzServer(
+        MockConfig(
+            latency=args.latency,
+            jitter=args.jitter,
+            error_rate=args.error_rate,
+            rate_limit=args.rate_limit,
+            burst=args.burst,
+            padding=args.padding,
+        )
+    )
+    base_url = await server.async_start()
+    report: list[dict] = []
+    try:
+        with tempfile.TemporaryDirectory() as config_dir:
+            async with async_test_home_assistant(storage_dir=config_dir) as hass:
+                await hass.config.async_set_time_zone("Europe/Zurich")
+                api = EkzTariffsApi(
+                    async_get_clientsession(hass),
+                    cache=None if args.no_cache else ResponseCache(hass),
+                    base_url=base_url,
+                )
+                manager = FetchManager(hass, api, max_parallel=args.parallel)
+                coordinators = []
+                for i in range(args.entries):
+                    coordinator = EkzTariffsCoordinator(
+                        hass,
+                        manager,
+                        f"T{i:03d}",
+                        TariffArchive(hass, f"load_{i}"),
+                        history_days=0,
+                    )
+                    manager.async_register(coordinator)
+                    coordinators.append(coordinator)
+
+                for name in ROUNDS:
+                    if name == "refetch":
+                        for coordinator in coordinators:
+                            coordinator.request_refetch()
+                    before = server.stats.snapshot()
+                    started = time.perf_counter()
+                    latencies = await asyncio.gather(
+                        *(_timed_refresh(c) for c in coordinators)
+                    )
+                    wall = time.perf_counter() - started
+                    after = server.stats.snapshot()
+                    failed = [c for c in coordinators if not c.last_update_success]
+                    retries = [
+                        c.update_interval.total_seconds()
+                        for c in failed
+                        if c.update_interval is not None
+                    ]
+                    report.append(
+                        {
+                            "round": name,
+                            "entries": len(coordinators),
+                            "wall_s": round(wall, 3),
+                            "entries_per_s": round(len(coordinators) / wall, 1),
+                            "p50_ms": round(_percentile(latencies, 50) * 1000, 1),
+                            "p95_ms": round(_percentile(latencies, 95) * 1000, 1),
+                            "failed": len(failed),
+                            "retry_in_s": [round(min(retries)), round(max(retries))]
+                            if retries
+                            else None,
+                            **{k: after[k] - before[k] for k in after},
+                        }
+                    )
+                for coordinator in coordinators:
+                    coordinator.scheduler.async_stop()
+                    await coordinator.async_shutdown()
+                await hass.async_stop(force=True)
+    finally:
+        await server.async_stop()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--entries", type=int, default=20)
+    parser.add_argument("--parallel", type=int, default=2, help="fetch manager bound")
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=0.0)
+    parser.add_argument("--burst", type=int, default=10)
+    parser.add_argument("--padding", type=int, default=0)
+    parser.add_argument("--no-cache", action="store_true")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    columns = list(report[0])
+    print("  ".join(f"{c:>13}" for c in columns))
+    for row in report:
+        print("  ".join(f"{json.dumps(row[c]):>13}" for c in columns))
+
+
+if __name__ == "__main__":
+    main()
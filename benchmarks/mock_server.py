@@ -0,0 +1,234 @@
+"""
+Local stand-in for the EKZ tariffs API.
+
+Serves /v1/tariffs like api.tariffs.ekz.ch, with configurable latency,
+error rate, rate limit and payload size, ETags for conditional requests
+and delayed publication of tomorrow's prices.
+
+    python -m benchmarks.mock_server --port 8080 --latency 0.2 --error-rate 0.1
+
+Point EkzTariffsApi(..., base_url="http://127.0.0.1:8080/v1") at it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import datetime as dt
+import hashlib
+import json
+import random
+import time
+import zlib
+from dataclasses import dataclass, field
+from zoneinfo import ZoneInfo
+
+from aiohttp import web
+
+TIME_ZONE = ZoneInfo("Europe/Zurich")
+SLOT = dt.timedelta(minutes=15)
+# Refuse ranges longer than this (the real API limits the range as well)
+MAX_RANGE = dt.timedelta(days=400)
+
+
+@dataclass
+class MockConfig:
+    latency: float = 0.0  # seconds added to every response
+    jitter: float = 0.0  # +/- uniform seconds on top of latency
+    error_rate: float = 0.0  # fraction of requests answered with 500
+    rate_limit: float = 0.0  # sustained requests/s, excess gets 429 (0: off)
+    burst: int = 10  # requests allowed at once before the rate limit applies
+    padding: int = 0  # extra non-price components per item (payload size)
+    publish_hour: int | None = None  # local hour from which tomorrow is served
+    revision: int = 0  # bump to simulate revised prices (new ETags/prices)
+    seed: int = 0
+
+
+@dataclass
+class MockStats:
+    requests: int = 0
+    ok: int = 0
+    not_modified: int = 0
+    errors: int = 0
+    rate_limited: int = 0
+    bad_requests: int = 0
+    bytes_sent: int = 0
+    by_tariff: dict[str, int] = field(default_factory=dict)
+
+    def snapshot(self) -> dict[str, int]:
+        return {k: v for k, v in vars(self).items() if isinstance(v, int)}
+
+
+class MockEkzServer:
+    def __init__(self, config: MockConfig | None = None) -> None:
+        self.config = config or MockConfig()
+        self.stats = MockStats()
+        self._rng = random.Random(self.config.seed)
+        self._tokens = float(self.config.burst)
+        self._refilled = time.monotonic()
+        self._runner: web.AppRunner | None = None
+        self.app = web.Application()
+        self.app.router.add_get("/v1/tariffs", self._handle)
+
+    async def async_start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving; returns the base URL to pass to EkzTariffsApi."""
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound = self._runner.addresses[0][1]
+        return f"http://{host}:{bound}/v1"
+
+    async def async_stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def price(self, tariff_name: str, start: dt.datetime) -> float:
+        """Deterministic price per tariff, slot and revision."""
+        local = start.astimezone(TIME_ZONE)
+        base = 0.30 if 7 <= local.hour < 21 else 0.18
+        key = f"{tariff_name}|{int(start.timestamp())}|{self.config.revision}"
+        noise = zlib.crc32(key.encode()) % 1000 / 10000 - 0.05
+        return round(base + noise, 5)
+
+    def _rate_limited(self) -> bool:
+        if self.config.rate_limit <= 0:
+            return False
+        now = time.monotonic()
+        self._tokens = min(
+            float(self.config.burst),
+            self._tokens + (now - self._refilled) * self.config.rate_limit,
+        )
+        self._refilled = now
+        if self._tokens < 1:
+            return True
+        self._tokens -= 1
+        return False
+
+    def _published_until(self) -> dt.datetime | None:
+        """End of the served prices (None: unlimited)."""
+        if self.config.publish_hour is None:
+            return None
+        now = dt.datetime.now(TIME_ZONE)
+        days = 2 if now.hour >= self.config.publish_hour else 1
+        midnight = dt.datetime.combine(now.date(), dt.time.min, TIME_ZONE)
+        return midnight + dt.timedelta(days=days)
+
+    def _items(
+        self, tariff_name: str, start: dt.datetime, end: dt.datetime
+    ) -> list[dict]:
+        published = self._published_until()
+        if published is not None:
+            end = min(end, published)
+        padding = [
+            {"unit": "CHF_m", "value": 0.0, "component": f"fee_{i}"}
+            for i in range(self.config.padding)
+        ]
+        items = []
+        # Step in UTC so DST days have 92/100 slots like the real API.
+        cur = start.astimezone(dt.UTC)
+        while cur < end:
+            nxt = cur + SLOT
+            items.append(
+                {
+                    "start_timestamp": cur.astimezone(TIME_ZONE).isoformat(),
+                    "end_timestamp": nxt.astimezone(TIME_ZONE).isoformat(),
+                    "integrated": [
+                        *padding,
+                        {"unit": "CHF_kWh", "value": self.price(tariff_name, cur)},
+                    ],
+                }
+            )
+            cur = nxt
+        return items
+
+    async def _handle(self, request: web.Request) -> web.StreamResponse:
+        stats = self.stats
+        stats.requests += 1
+        if self._rate_limited():
+            stats.rate_limited += 1
+            return web.Response(status=429, headers={"Retry-After": "1"})
+
+        delay = self.config.latency
+        if self.config.jitter:
+            delay += self._rng.uniform(-self.config.jitter, self.config.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if self._rng.random() < self.config.error_rate:
+            stats.errors += 1
+            return web.Response(status=500, text="mock failure")
+
+        try:
+            tariff_name = request.query["tariff_name"]
+            start = dt.datetime.fromisoformat(request.query["start_timestamp"])
+            end = dt.datetime.fromisoformat(request.query["end_timestamp"])
+            if start.tzinfo is None or end.tzinfo is None or end - start > MAX_RANGE:
+                raise ValueError("bad range")
+        except (KeyError, ValueError):
+            stats.bad_requests += 1
+            return web.Response(status=400, text="bad request")
+        stats.by_tariff[tariff_name] = stats.by_tariff.get(tariff_name, 0) + 1
+
+        published = self._published_until()
+        tag = hashlib.sha1(
+            f"{tariff_name}|{start.isoformat()}|{end.isoformat()}|"
+            f"{self.config.revision}|{published}".encode()
+        ).hexdigest()
+        etag = f'"{tag}"'
+        if request.headers.get("If-None-Match") == etag:
+            stats.not_modified += 1
+            return web.Response(status=304, headers={"ETag": etag})
+
+        body = json.dumps(
+            {
+                "tariff_name": tariff_name,
+                "prices": self._items(tariff_name, start, end),
+            }
+        ).encode()
+        stats.ok += 1
+        stats.bytes_sent += len(body)
+        return web.Response(
+            body=body, content_type="application/json", headers={"ETag": etag}
+        )
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    server = MockEkzServer(
+        MockConfig(
+            latency=args.latency,
+            jitter=args.jitter,
+            error_rate=args.error_rate,
+            rate_limit=args.rate_limit,
+            burst=args.burst,
+            padding=args.padding,
+            publish_hour=args.publish_hour,
+        )
+    )
+    url = await server.async_start(args.host, args.port)
+    print(f"Serving mock EKZ API at {url}", flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.async_stop()
+        print(json.dumps(server.stats.snapshot()))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=0.0)
+    parser.add_argument("--burst", type=int, default=10)
+    parser.add_argument("--padding", type=int, default=0)
+    parser.add_argument("--publish-hour", type=int, default=None)
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(_serve(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
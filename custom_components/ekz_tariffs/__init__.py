@@ -2,76 +2,102 @@ from __future__ import annotations
 
 import datetime as dt
 import logging
+import time
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, ServiceCall
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from homeassistant.helpers.event import async_track_time_change
+from homeassistant.core import HomeAssistant, callback
 
-from .api import EkzTariffsApi
 from .const import (
+    CONF_HISTORY_DAYS,
     CONF_TARIFF_NAME,
+    DEFAULT_HISTORY_DAYS,
     DEFAULT_TARIFF_NAME,
     DOMAIN,
-    FETCH_HOUR,
-    FETCH_MINUTE,
     PLATFORMS,
-    SERVICE_REFRESH,
 )
 from .coordinator import EkzTariffsCoordinator
-from .storage import make_store, slots_from_json
+from .fetch import async_get_fetch_manager
+from .scheduler import BOUNDARY_FETCH
+from .services import async_setup_services
+from .storage import TariffArchive, async_migrate_store, make_store
+from .utils import window_specs
 
 _LOGGER = logging.getLogger(__name__)
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    started = time.monotonic()
     tariff_name = entry.data.get(CONF_TARIFF_NAME, DEFAULT_TARIFF_NAME)
 
-    session = async_get_clientsession(hass)
-    api = EkzTariffsApi(session)
+    # One API gateway for all entries: shared in-flight requests, bounded
+    # parallelism and one coordinated daily refresh cycle.
+    manager = async_get_fetch_manager(hass)
 
-    store = make_store(hass, entry.entry_id)
-    coordinator = EkzTariffsCoordinator(hass, api, tariff_name, store)
+    archive = TariffArchive(hass, entry.entry_id)
+    await async_migrate_store(make_store(hass, entry.entry_id), archive)
+    coordinator = EkzTariffsCoordinator(
+        hass,
+        manager,
+        tariff_name,
+        archive,
+        window_minutes={spec.minutes for spec in window_specs(entry.options)},
+        history_days=int(entry.options.get(CONF_HISTORY_DAYS, DEFAULT_HISTORY_DAYS)),
+    )
 
-    saved = await store.async_load()
-    if saved and "slots" in saved:
-        coordinator.async_set_updated_data(slots_from_json(saved["slots"]))
+    await coordinator.async_load_archive()
 
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {
         "coordinator": coordinator,
         "tariff_name": tariff_name,
     }
 
-    await coordinator.async_config_entry_first_refresh()
+    entry.async_on_unload(manager.async_register(coordinator))
+    await coordinator.async_startup_refresh(entry)
 
-    async def _scheduled_refresh(_now: dt.datetime) -> None:
+    @callback
+    def _scheduled_refresh(_boundary: dt.datetime) -> None:
         _LOGGER.debug("Scheduled refresh triggered")
-        await coordinator.async_request_refresh()
+        hass.async_create_task(manager.async_refresh_all())
 
-    unsub = async_track_time_change(
-        hass,
-        _scheduled_refresh,
-        hour=FETCH_HOUR,
-        minute=FETCH_MINUTE,
-        second=0,
+    entry.async_on_unload(
+        coordinator.scheduler.async_subscribe(BOUNDARY_FETCH, _scheduled_refresh)
     )
-    entry.async_on_unload(unsub)
+    entry.async_on_unload(coordinator.scheduler.async_stop)
 
-    async def _handle_refresh(call: ServiceCall) -> None:
-        await coordinator.async_request_refresh()
+    # Hourly prices as long-term statistics (only when the recorder runs)
+    if "recorder" in hass.config.components:
+        from .external_statistics import PriceStatistics
 
-    hass.services.async_register(
-        DOMAIN,
-        SERVICE_REFRESH,
-        _handle_refresh,
-    )
+        price_statistics = PriceStatistics(hass, coordinator, tariff_name)
+        entry.async_on_unload(price_statistics.async_start())
+        entry.async_create_background_task(
+            hass, price_statistics.async_backfill(), f"{DOMAIN} statistics backfill"
+        )
+
+    async_setup_services(hass)
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    _LOGGER.debug(
+        "Setup of %s took %.3f s (%d cached slots)",
+        tariff_name,
+        time.monotonic() - started,
+        len(coordinator.data) if coordinator.data is not None else 0,
+    )
     return True
 
 
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    # Window/cheapest-slot sensors are created from the options -> rebuild entities
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id, None)
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    await TariffArchive(hass, entry.entry_id).async_remove()
@@ -1,14 +1,22 @@
 from __future__ import annotations
 
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Any, overload
 
-from aiohttp import ClientSession
+from aiohttp import ClientSession, hdrs
 from homeassistant.util import dt as dt_util
+from homeassistant.util.json import json_loads
 
 from .const import API_BASE, API_TARIFFS_PATH, INTEGRATED_PREFIX
 
+if TYPE_CHECKING:
+    from .storage import ResponseCache
+
 
 @dataclass(frozen=True)
 class TariffSlot:
@@ -17,16 +25,171 @@ class TariffSlot:
     price_chf_per_kwh: float
 
 
+def from_epoch(ts: int) -> datetime:
+    return dt_util.as_local(dt_util.utc_from_timestamp(ts))
+
+
+class TariffSeries:
+    """
+    Compact, array-backed list of tariff slots sorted by start.
+
+    Slot bounds are stored as epoch seconds in array('q') columns and prices
+    in an array('d') column. Iterating or indexing still yields TariffSlot
+    so existing callers keep working; hot paths use the columns directly.
+    """
+
+    __slots__ = ("ends", "prices", "starts")
+
+    def __init__(
+        self,
+        starts: array | None = None,
+        ends: array | None = None,
+        prices: array | None = None,
+    ) -> None:
+        self.starts: array = starts if starts is not None else array("q")
+        self.ends: array = ends if ends is not None else array("q")
+        self.prices: array = prices if prices is not None else array("d")
+
+    @classmethod
+    def from_slots(cls, slots: Iterable[TariffSlot]) -> TariffSeries:
+        if isinstance(slots, TariffSeries):
+            return slots
+        ordered = sorted(slots, key=lambda s: s.start)
+        return cls(
+            array("q", (int(s.start.timestamp()) for s in ordered)),
+            array("q", (int(s.end.timestamp()) for s in ordered)),
+            array("d", (float(s.price_chf_per_kwh) for s in ordered)),
+        )
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple[int, int, float]]) -> TariffSeries:
+        """Build from (start_ts, end_ts, price) rows that are sorted by start."""
+        rows = list(rows)
+        return cls(
+            array("q", (r[0] for r in rows)),
+            array("q", (r[1] for r in rows)),
+            array("d", (r[2] for r in rows)),
+        )
+
+    def rows(self) -> Iterator[tuple[int, int, float]]:
+        return zip(self.starts, self.ends, self.prices, strict=True)
+
+    def covered(self) -> list[tuple[int, int]]:
+        """Epoch ranges [start, end) covered by slots, contiguous slots merged."""
+        out: list[tuple[int, int]] = []
+        for start, end in zip(self.starts, self.ends, strict=True):
+            if out and out[-1][1] >= start:
+                out[-1] = (out[-1][0], max(out[-1][1], end))
+            else:
+                out.append((start, end))
+        return out
+
+    def since(self, ts: int) -> TariffSeries:
+        """Slots ending after ts (older history dropped)."""
+        return self[bisect_right(self.ends, ts) :]
+
+    def merged(self, other: TariffSeries) -> TariffSeries:
+        """This series with other's slots; other wins where both cover a time."""
+        if not len(other):
+            return self
+        if not len(self):
+            return other
+        # Per range covered by other: copy own slots before it, then other's
+        # slots in it, and skip own slots overlapping it (found by bisect).
+        starts, ends, prices = array("q"), array("q"), array("d")
+        keep = j = 0
+        for range_start, range_end in other.covered():
+            lo, hi = self.overlapping(range_start, range_end)
+            k = bisect_left(other.starts, range_end, j)
+            for column, own, new in (
+                (starts, self.starts, other.starts),
+                (ends, self.ends, other.ends),
+                (prices, self.prices, other.prices),
+            ):
+                column.extend(own[keep:lo])
+                column.extend(new[j:k])
+            keep, j = max(keep, hi), k
+        starts.extend(self.starts[keep:])
+        ends.extend(self.ends[keep:])
+        prices.extend(self.prices[keep:])
+        return TariffSeries(starts, ends, prices)
+
+    def overlapping(self, start_ts: int, end_ts: int) -> tuple[int, int]:
+        """Index range [lo, hi) of slots overlapping [start_ts, end_ts)."""
+        lo = bisect_right(self.ends, start_ts)
+        hi = bisect_left(self.starts, end_ts, lo)
+        return lo, max(lo, hi)
+
+    def slot(self, i: int) -> TariffSlot:
+        return TariffSlot(
+            start=from_epoch(self.starts[i]),
+            end=from_epoch(self.ends[i]),
+            price_chf_per_kwh=self.prices[i],
+        )
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __iter__(self) -> Iterator[TariffSlot]:
+        for i in range(len(self.starts)):
+            yield self.slot(i)
+
+    @overload
+    def __getitem__(self, key: int) -> TariffSlot: ...
+
+    @overload
+    def __getitem__(self, key: slice) -> TariffSeries: ...
+
+    def __getitem__(self, key: int | slice) -> TariffSlot | TariffSeries:
+        if isinstance(key, slice):
+            return TariffSeries(self.starts[key], self.ends[key], self.prices[key])
+        if key < 0:
+            key += len(self.starts)
+        if not 0 <= key < len(self.starts):
+            raise IndexError("TariffSeries index out of range")
+        return self.slot(key)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, TariffSeries):
+            return NotImplemented
+        return (
+            self.starts == other.starts
+            and self.ends == other.ends
+            and self.prices == other.prices
+        )
+
+    def __repr__(self) -> str:
+        return f"TariffSeries(len={len(self.starts)})"
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """Cache validators of an API response and its parsed body."""
+
+    etag: str | None
+    last_modified: str | None
+    series: TariffSeries
+
+
 class EkzTariffsApi:
-    def __init__(self, session: ClientSession):
+    def __init__(
+        self,
+        session: ClientSession,
+        cache: ResponseCache | None = None,
+        base_url: str = API_BASE,
+    ):
         self._session = session
+        # Overridable for a local stand-in server (benchmarks/mock_server.py)
+        self._base_url = base_url.rstrip("/")
+        # Conditional requests need the validators of earlier responses
+        self._cache = cache
 
     async def fetch_tariffs(
         self,
         tariff_name: str,
         start: datetime,
         end: datetime,
-    ) -> list[TariffSlot]:
+    ) -> TariffSeries:
         """Fetch tariff slots from EKZ API for time range"""
         start = dt_util.as_local(start)
         end = dt_util.as_local(end)
@@ -37,34 +200,87 @@ class EkzTariffsApi:
             "end_timestamp": end.isoformat(timespec="seconds"),
         }
 
-        url = f"{API_BASE}{API_TARIFFS_PATH}"
+        url = f"{self._base_url}{API_TARIFFS_PATH}"
+
+        key = (tariff_name, int(start.timestamp()), int(end.timestamp()))
+        cached = await self._cache.async_get(*key) if self._cache else None
+        headers: dict[str, str] = {}
+        if cached is not None:
+            if cached.etag:
+                headers[hdrs.IF_NONE_MATCH] = cached.etag
+            if cached.last_modified:
+                headers[hdrs.IF_MODIFIED_SINCE] = cached.last_modified
 
-        async with self._session.get(url, params=params, timeout=30) as resp:
+        async with self._session.get(
+            url, params=params, headers=headers, timeout=30
+        ) as resp:
+            if resp.status == HTTPStatus.NOT_MODIFIED and cached is not None:
+                return cached.series
             resp.raise_for_status()
-            data: dict[str, Any] = await resp.json()
-
-        slots: list[TariffSlot] = []
-        for item in data.get("prices", []):
-            start_ts = dt_util.parse_datetime(item["start_timestamp"])
-            end_ts = dt_util.parse_datetime(item["end_timestamp"])
-            if start_ts is None or end_ts is None:
-                continue
-            price_val = None
-            for comp in item.get("integrated", []):
-                if comp.get("unit") == "CHF_kWh":
-                    price_val = comp.get("value")
-                    break
-
-            if price_val is None:
-                continue
-
-            slots.append(
-                TariffSlot(
-                    start=dt_util.as_local(start_ts),
-                    end=dt_util.as_local(end_ts),
-                    price_chf_per_kwh=float(price_val),
-                )
-            )
-
-        slots.sort(key=lambda s: s.start)
-        return slots
+            # orjson via HA; the body is decoded once, without aiohttp's checks
+            data: dict[str, Any] = json_loads(await resp.read())
+            etag = resp.headers.get(hdrs.ETAG)
+            last_modified = resp.headers.get(hdrs.LAST_MODIFIED)
+
+        series = _parse_prices(data)
+        if self._cache is not None and (etag or last_modified):
+            self._cache.async_put(*key, CachedResponse(etag, last_modified, series))
+        return series
+
+
+def _parse_prices(data: dict[str, Any]) -> TariffSeries:
+    """
+    Price slots of an API response body, built straight into the columns.
+
+    Slots are contiguous, so a start timestamp usually is the previous end
+    timestamp and is not parsed again. The API returns ordered items, so
+    the sort is skipped unless an item starts before its predecessor.
+    """
+    starts = array("q")
+    ends = array("q")
+    prices = array("d")
+    ordered = True
+    prev_end: tuple[str, int | None] = ("", None)
+    for item in data.get("prices", ()):
+        price_val = None
+        for comp in item.get("integrated", ()):
+            if comp.get("unit") == "CHF_kWh":
+                price_val = comp.get("value")
+                break
+
+        start_raw = item["start_timestamp"]
+        end_raw = item["end_timestamp"]
+        start_ts = prev_end[1] if start_raw == prev_end[0] else parse_epoch(start_raw)
+        end_ts = parse_epoch(end_raw)
+        prev_end = (end_raw, end_ts)
+        if start_ts is None or end_ts is None or price_val is None:
+            continue
+
+        if starts and start_ts < starts[-1]:
+            ordered = False
+        starts.append(start_ts)
+        ends.append(end_ts)
+        prices.append(float(price_val))
+
+    series = TariffSeries(starts, ends, prices)
+    return series if ordered else TariffSeries.from_rows(sorted(series.rows()))
+
+
+def parse_epoch(value: str) -> int | None:
+    """
+    Epoch seconds of an ISO 8601 timestamp (None if it is not one).
+
+    Timestamps without an offset are taken in Home Assistant's time zone,
+    not the OS one that datetime.timestamp() would assume.
+    """
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        # Formats fromisoformat does not take; dt_util also raises on
+        # well-formed but invalid values.
+        parsed = dt_util.parse_datetime(value)
+        if parsed is None:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE)
+    return int(parsed.timestamp())
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import datetime as dt
+from typing import Any
+
+from homeassistant.components.binary_sensor import BinarySensorEntity
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.util import dt as dt_util
+
+from .const import CONF_CHEAPEST_COUNT, DEFAULT_CHEAPEST_COUNT, DOMAIN
+from .coordinator import EkzTariffsCoordinator
+from .scheduler import BOUNDARY_BUCKET
+
+
+class EkzCheapestSlotsBinarySensor(BinarySensorEntity):
+    """On while the current 15-min slot is among today's N cheapest."""
+
+    _attr_has_entity_name = True
+    _attr_icon = "mdi:cash-clock"
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        tariff_name: str,
+        coordinator: EkzTariffsCoordinator,
+        count: int,
+    ) -> None:
+        self.hass = hass
+        self._entry_id = entry_id
+        self._tariff_name = tariff_name
+        self._coordinator = coordinator
+        self._count = count
+        self._attr_name = f"Cheapest {count} slots today: {tariff_name}"
+        self._attr_unique_id = f"{entry_id}_cheapest_slots_today"
+
+    async def async_added_to_hass(self) -> None:
+        self.async_on_remove(self._coordinator.async_add_listener(self._handle_update))
+        # Selection is per 15-min bucket (and per day at midnight).
+        self.async_on_remove(
+            self._coordinator.scheduler.async_subscribe(
+                BOUNDARY_BUCKET, self._on_boundary
+            )
+        )
+        self.async_write_ha_state()
+
+    def _on_boundary(self, _boundary: dt.datetime) -> None:
+        self.async_write_ha_state()
+
+    def _handle_update(self) -> None:
+        if self._coordinator.changed_day(dt_util.as_local(dt_util.now()).date()):
+            self.async_write_ha_state()
+
+    @property
+    def is_on(self) -> bool:
+        now = dt_util.now()
+        day = self._coordinator.snapshot.day_offset(now, 0)
+        return day.is_cheapest(now, self._count)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        day = self._coordinator.snapshot.day_offset(dt_util.now(), 0)
+        runs = day.cheapest(self._count)
+        return {
+            "tariff_name": self._tariff_name,
+            "date": day.day.isoformat(),
+            "count": self._count,
+            "slots": [
+                {
+                    "start": r.start_iso,
+                    "end": r.end_iso,
+                    "value": round(r.avg, 6),
+                }
+                for r in runs
+            ],
+        }
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    count = int(entry.options.get(CONF_CHEAPEST_COUNT, DEFAULT_CHEAPEST_COUNT))
+    if count <= 0:
+        return
+    data = hass.data[DOMAIN][entry.entry_id]
+    async_add_entities(
+        [
+            EkzCheapestSlotsBinarySensor(
+                hass, entry.entry_id, data["tariff_name"], data["coordinator"], count
+            )
+        ],
+        update_before_add=False,
+    )
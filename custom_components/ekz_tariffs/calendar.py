@@ -1,19 +1,20 @@
 from __future__ import annotations
 
-import contextlib
+import asyncio
 import datetime as dt
+from collections.abc import AsyncIterator
 
-from custom_components.ekz_tariffs.api import TariffSlot
 from homeassistant.components.calendar import CalendarEntity, CalendarEvent
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.event import async_track_point_in_time
 from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN, EVENT_TARIFF_START, EVENT_TYPE
+from .const import CALENDAR_PAGE_SIZE, DOMAIN, EVENT_TARIFF_START, EVENT_TYPE
 from .coordinator import EkzTariffsCoordinator
-from .utils import FusedEvent, fuse_slots
+from .scheduler import BOUNDARY_SLOT
+from .snapshot import TariffSnapshot
+from .utils import FusedEvent
 
 
 class EkzTariffsCalendar(CalendarEntity):
@@ -34,105 +35,110 @@ class EkzTariffsCalendar(CalendarEntity):
         self._attr_unique_id = f"{entry_id}_calendar"
         self._attr_name = f"EKZ Tariffs: {tariff_name}"
 
-        self._events: list[CalendarEvent] = []
-        self._fused: list[FusedEvent] = []
-        self._unsubs: list[callable] = []
-
     async def async_added_to_hass(self) -> None:
         self.async_on_remove(
             self._coordinator.async_add_listener(self._handle_coordinator_update)
         )
-        self._handle_coordinator_update()
+        # One shared timer per entry instead of one per future event
+        self.async_on_remove(
+            self._coordinator.scheduler.async_subscribe(
+                BOUNDARY_SLOT, self._on_boundary
+            )
+        )
+        self.async_write_ha_state()
 
-    def _clear_scheduled_callbacks(self) -> None:
-        for unsub in self._unsubs:
-            with contextlib.suppress(Exception):
-                unsub()
-        self._unsubs.clear()
+    def _on_boundary(self, boundary: dt.datetime) -> None:
+        snapshot = self._coordinator.snapshot
+        fe = snapshot.current(boundary)
+        if fe is not None and fe.start == boundary:
+            self.hass.bus.async_fire(
+                EVENT_TYPE,
+                {
+                    "type": EVENT_TARIFF_START,
+                    "entry_id": self._entry_id,
+                    "tariff_name": self._tariff_name,
+                    "start": fe.start_iso,
+                    "end": fe.end_iso,
+                    "price_chf_per_kwh": fe.price,
+                },
+            )
+        self.async_write_ha_state()
 
-    def _schedule_callbacks(self) -> None:
-        self._clear_scheduled_callbacks()
-        now = dt_util.now()
+    def _make_event(self, idx: int, fe: FusedEvent) -> CalendarEvent:
+        summary = f"EKZ {self._tariff_name}: {fe.price:.5f} CHF/kWh"
+        desc = (
+            f"Tariff: {self._tariff_name}\n"
+            f"Price: {fe.price:.6f} CHF/kWh\n"
+            f"From: {fe.start_iso}\n"
+            f"To: {fe.end_iso}\n"
+        )
+        return CalendarEvent(
+            start=fe.start,
+            end=fe.end,
+            summary=summary,
+            description=desc,
+            uid=f"{self._entry_id}:{fe.start_iso}:{idx}",
+        )
 
-        for fe in self._fused:
-            if fe.start <= now:
-                continue
-
-            def _make_cb(start: dt.datetime, end: dt.datetime, price: float):
-                async def _cb(_now: dt.datetime) -> None:
-                    self.hass.bus.async_fire(
-                        EVENT_TYPE,
-                        {
-                            "type": EVENT_TARIFF_START,
-                            "entry_id": self._entry_id,
-                            "tariff_name": self._tariff_name,
-                            "start": start.isoformat(),
-                            "end": start.isoformat(),
-                            "price_chf_per_kwh": price,
-                        },
-                    )
-
-                return _cb
-
-            unsub = async_track_point_in_time(
-                self.hass, _make_cb(fe.start, fe.end, fe.price), fe.start
-            )
-            self._unsubs.append(unsub)
+    def _event_at(self, snapshot: TariffSnapshot, idx: int) -> CalendarEvent:
+        # One slot per fused event of the data version, filled in on first
+        # use; shared through the snapshot and dropped with it.
+        events: list[CalendarEvent | None] = snapshot.rendered(
+            ("calendar", self._tariff_name), lambda: [None] * len(snapshot.fused)
+        )
+        ev = events[idx]
+        if ev is None:
+            ev = self._make_event(idx, snapshot.fused[idx])
+            events[idx] = ev
+        return ev
 
     def _handle_coordinator_update(self) -> None:
-        slots: list[TariffSlot] = self._coordinator.data or []
-        self._fused = fuse_slots(slots)
-
-        events: list[CalendarEvent] = []
-        for idx, fe in enumerate(self._fused):
-            summary = f"EKZ {self._tariff_name}: {fe.price:.5f} CHF/kWh"
-            desc = (
-                f"Tariff: {self._tariff_name}\n"
-                f"Price: {fe.price:.6f} CHF/kWh\n"
-                f"From: {fe.start.isoformat()}\n"
-                f"To: {fe.end.isoformat()}\n"
-            )
-            events.append(
-                CalendarEvent(
-                    start=fe.start,
-                    end=fe.end,
-                    summary=summary,
-                    description=desc,
-                    uid=f"{self._entry_id}:{fe.start.isoformat()}:{idx}",
-                )
-            )
-
-        self._events = events
-        self._schedule_callbacks()
-        self.async_write_ha_state()
+        # The state is the current (or next) event; past changes don't matter.
+        if self._coordinator.changed(dt_util.now()):
+            self.async_write_ha_state()
 
     @property
     def event(self) -> CalendarEvent | None:
         now = dt_util.now()
-        for ev in self._events:
-            if isinstance(ev.start, dt.datetime) and isinstance(ev.end, dt.datetime):
-                if ev.start <= now < ev.end:
-                    return ev
-                if ev.start > now:
-                    return ev
-        return None
+        snapshot = self._coordinator.snapshot
+        i = snapshot.index.position(now)
+        if i is None:
+            i = snapshot.index.next_position(now)
+        if i is None:
+            return None
+        return self._event_at(snapshot, i)
+
+    async def async_iter_events(
+        self,
+        start_date: dt.datetime,
+        end_date: dt.datetime,
+        page_size: int = CALENDAR_PAGE_SIZE,
+    ) -> AsyncIterator[list[CalendarEvent]]:
+        """
+        Events overlapping [start_date, end_date) in pages of page_size.
+
+        Fused events are sorted and disjoint, so the range is found by
+        bisection and pages come out in start order. Events are only built
+        for the requested pages, yielding to the event loop in between.
+        """
+        # Pages of one query all come from the same data version.
+        snapshot = self._coordinator.snapshot
+        lo, hi = snapshot.index.range(start_date, end_date)
+        for page in range(lo, hi, page_size):
+            if page > lo:
+                await asyncio.sleep(0)
+            yield [
+                self._event_at(snapshot, i)
+                for i in range(page, min(page + page_size, hi))
+            ]
 
     async def async_get_events(
         self, hass: HomeAssistant, start_date: dt.datetime, end_date: dt.datetime
     ) -> list[CalendarEvent]:
-        # Follow HA calendar range semantics :contentReference[oaicite:4]{index=4}
+        # HA calendar range semantics: events overlapping [start, end)
         out: list[CalendarEvent] = []
-        for ev in self._events:
-            if not isinstance(ev.start, dt.datetime) or not isinstance(
-                ev.end, dt.datetime
-            ):
-                continue
-            if ev.end <= start_date:
-                continue
-            if ev.start >= end_date:
-                continue
-            out.append(ev)
-        out.sort(key=lambda e: e.start)
+        async for page in self.async_iter_events(start_date, end_date):
+            out.extend(page)
         return out
 
 
@@ -4,9 +4,44 @@ from typing import Any
 
 import voluptuous as vol
 from homeassistant import config_entries
+from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
+from homeassistant.helpers import selector
 
-from .const import CONF_TARIFF_NAME, DEFAULT_TARIFF_NAME, DOMAIN
+from .const import (
+    CONF_CHEAPEST_COUNT,
+    CONF_HISTORY_DAYS,
+    CONF_HORIZON_HOURS,
+    CONF_LEVEL_CHEAP,
+    CONF_LEVEL_EXPENSIVE,
+    CONF_LEVEL_HYSTERESIS,
+    CONF_LEVEL_MODE,
+    CONF_SLIM_ATTRIBUTES,
+    CONF_TARIFF_NAME,
+    CONF_WINDOW_HOURS,
+    CONF_WINDOW_MINUTES,
+    CONF_WINDOW_MODES,
+    CONF_WINDOW_SCOPES,
+    DEFAULT_CHEAPEST_COUNT,
+    DEFAULT_HISTORY_DAYS,
+    DEFAULT_HORIZON_HOURS,
+    DEFAULT_LEVEL_HYSTERESIS,
+    DEFAULT_LEVEL_MODE,
+    DEFAULT_LEVEL_THRESHOLDS,
+    DEFAULT_SLIM_ATTRIBUTES,
+    DEFAULT_TARIFF_NAME,
+    DEFAULT_WINDOW_MINUTES,
+    DEFAULT_WINDOW_MODES,
+    DEFAULT_WINDOW_SCOPES,
+    DOMAIN,
+    LEVEL_MODE_ABSOLUTE,
+    LEVEL_MODE_OFF,
+    LEVEL_MODE_QUANTILE,
+    LEVEL_MODES,
+    WINDOW_MODES,
+    WINDOW_SCOPES,
+)
+from .utils import format_window_hours, parse_window_hours
 
 TARIFF_CHOICES = ["400D", "400F", "400ST", "400WP", "400L", "400LS", "16L", "16LS"]
 
@@ -22,10 +57,41 @@ TARIFF_DESCRIPTIONS = {
 }
 
 
+# Price level thresholds per mode: CHF/kWh or percentiles of the day's prices
+_LEVEL_THRESHOLD_SELECTORS = {
+    LEVEL_MODE_ABSOLUTE: selector.NumberSelector(
+        selector.NumberSelectorConfig(
+            min=0,
+            step=0.001,
+            mode=selector.NumberSelectorMode.BOX,
+            unit_of_measurement="CHF/kWh",
+        )
+    ),
+    LEVEL_MODE_QUANTILE: selector.NumberSelector(
+        selector.NumberSelectorConfig(
+            min=0,
+            max=100,
+            step=0.1,
+            mode=selector.NumberSelectorMode.BOX,
+            unit_of_measurement="%",
+        )
+    ),
+}
+
+
 class EkzTariffsConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
 
-    async def async_step_user(self, user_input: dict[str, Any] | None = None) -> FlowResult:
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> EkzTariffsOptionsFlow:
+        return EkzTariffsOptionsFlow()
+
+    async def async_step_user(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
         # If submitted, go to confirmation step to show full description
         if user_input is not None:
             self.context[CONF_TARIFF_NAME] = user_input[CONF_TARIFF_NAME]
@@ -44,7 +110,9 @@ class EkzTariffsConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         )
 
         # Build description text directly
-        desc_text = f"Select your EKZ tariff product.\n\n**Tariff Description:**\n{description}"
+        desc_text = (
+            f"Select your EKZ tariff product.\n\n**Tariff Description:**\n{description}"
+        )
 
         return self.async_show_form(
             step_id="user",
@@ -54,7 +122,9 @@ class EkzTariffsConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             },
         )
 
-    async def async_step_confirm(self, user_input: dict[str, Any] | None = None) -> FlowResult:
+    async def async_step_confirm(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
         """Confirmation step showing full tariff details."""
         tariff_name = self.context.get(CONF_TARIFF_NAME, DEFAULT_TARIFF_NAME)
         description = TARIFF_DESCRIPTIONS.get(tariff_name, "")
@@ -80,3 +150,186 @@ class EkzTariffsConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 "description": desc_text,
             },
         )
+
+
+class EkzTariffsOptionsFlow(config_entries.OptionsFlow):
+    """
+    Configure the window, cheapest-slot and price level sensors.
+
+    The price level thresholds mean different things per mode, so they are
+    asked for in a second step once the mode is known.
+    """
+
+    def __init__(self) -> None:
+        self._options: dict[str, Any] = {}
+
+    def _entry_options(self) -> dict[str, Any]:
+        entry = self.hass.config_entries.async_get_entry(self.handler)
+        return dict(entry.options) if entry else {}
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        options = self._entry_options()
+        errors: dict[str, str] = {}
+
+        if user_input is not None:
+            try:
+                minutes = parse_window_hours(user_input[CONF_WINDOW_HOURS])
+            except ValueError:
+                errors[CONF_WINDOW_HOURS] = "invalid_window_hours"
+            if not errors:
+                mode = user_input[CONF_LEVEL_MODE]
+                self._options = {
+                    **options,
+                    CONF_WINDOW_MINUTES: minutes,
+                    CONF_WINDOW_MODES: user_input[CONF_WINDOW_MODES],
+                    CONF_WINDOW_SCOPES: user_input[CONF_WINDOW_SCOPES],
+                    CONF_HORIZON_HOURS: int(user_input[CONF_HORIZON_HOURS]),
+                    CONF_CHEAPEST_COUNT: int(user_input[CONF_CHEAPEST_COUNT]),
+                    CONF_HISTORY_DAYS: int(user_input[CONF_HISTORY_DAYS]),
+                    CONF_SLIM_ATTRIBUTES: user_input[CONF_SLIM_ATTRIBUTES],
+                    CONF_LEVEL_MODE: mode,
+                }
+                if mode != options.get(CONF_LEVEL_MODE, DEFAULT_LEVEL_MODE):
+                    # Thresholds only make sense in the mode they were set for
+                    self._options.pop(CONF_LEVEL_CHEAP, None)
+                    self._options.pop(CONF_LEVEL_EXPENSIVE, None)
+                if mode == LEVEL_MODE_OFF:
+                    return self.async_create_entry(title="", data=self._options)
+                return await self.async_step_levels()
+
+        schema = vol.Schema(
+            {
+                vol.Required(
+                    CONF_WINDOW_HOURS,
+                    default=format_window_hours(
+                        options.get(CONF_WINDOW_MINUTES, DEFAULT_WINDOW_MINUTES)
+                    ),
+                ): str,
+                vol.Required(
+                    CONF_WINDOW_MODES,
+                    default=options.get(CONF_WINDOW_MODES, DEFAULT_WINDOW_MODES),
+                ): selector.SelectSelector(
+                    selector.SelectSelectorConfig(
+                        options=WINDOW_MODES,
+                        multiple=True,
+                        translation_key=CONF_WINDOW_MODES,
+                    )
+                ),
+                vol.Required(
+                    CONF_WINDOW_SCOPES,
+                    default=options.get(CONF_WINDOW_SCOPES, DEFAULT_WINDOW_SCOPES),
+                ): selector.SelectSelector(
+                    selector.SelectSelectorConfig(
+                        options=WINDOW_SCOPES,
+                        multiple=True,
+                        translation_key=CONF_WINDOW_SCOPES,
+                    )
+                ),
+                vol.Required(
+                    CONF_HORIZON_HOURS,
+                    default=options.get(CONF_HORIZON_HOURS, DEFAULT_HORIZON_HOURS),
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=0,
+                        max=48,
+                        step=1,
+                        mode=selector.NumberSelectorMode.BOX,
+                        unit_of_measurement="h",
+                    )
+                ),
+                vol.Required(
+                    CONF_CHEAPEST_COUNT,
+                    default=options.get(CONF_CHEAPEST_COUNT, DEFAULT_CHEAPEST_COUNT),
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=0, max=96, step=1, mode=selector.NumberSelectorMode.BOX
+                    )
+                ),
+                vol.Required(
+                    CONF_HISTORY_DAYS,
+                    default=options.get(CONF_HISTORY_DAYS, DEFAULT_HISTORY_DAYS),
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=0,
+                        max=730,
+                        step=1,
+                        mode=selector.NumberSelectorMode.BOX,
+                        unit_of_measurement="d",
+                    )
+                ),
+                vol.Required(
+                    CONF_SLIM_ATTRIBUTES,
+                    default=options.get(CONF_SLIM_ATTRIBUTES, DEFAULT_SLIM_ATTRIBUTES),
+                ): selector.BooleanSelector(),
+                vol.Required(
+                    CONF_LEVEL_MODE,
+                    default=options.get(CONF_LEVEL_MODE, DEFAULT_LEVEL_MODE),
+                ): selector.SelectSelector(
+                    selector.SelectSelectorConfig(
+                        options=LEVEL_MODES,
+                        mode=selector.SelectSelectorMode.DROPDOWN,
+                        translation_key=CONF_LEVEL_MODE,
+                    )
+                ),
+            }
+        )
+
+        return self.async_show_form(step_id="init", data_schema=schema, errors=errors)
+
+    async def async_step_levels(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Price level thresholds for the mode chosen in the init step."""
+        options = self._options
+        mode = options[CONF_LEVEL_MODE]
+        errors: dict[str, str] = {}
+
+        if user_input is not None:
+            # Ranges are checked by the mode's selector
+            cheap = float(user_input[CONF_LEVEL_CHEAP])
+            expensive = float(user_input[CONF_LEVEL_EXPENSIVE])
+            if cheap >= expensive:
+                errors[CONF_LEVEL_EXPENSIVE] = "invalid_levels"
+            else:
+                return self.async_create_entry(
+                    title="",
+                    data={
+                        **options,
+                        CONF_LEVEL_CHEAP: cheap,
+                        CONF_LEVEL_EXPENSIVE: expensive,
+                        CONF_LEVEL_HYSTERESIS: float(user_input[CONF_LEVEL_HYSTERESIS]),
+                    },
+                )
+
+        default_cheap, default_expensive = DEFAULT_LEVEL_THRESHOLDS[mode]
+        threshold = _LEVEL_THRESHOLD_SELECTORS[mode]
+        schema = vol.Schema(
+            {
+                vol.Required(
+                    CONF_LEVEL_CHEAP,
+                    default=options.get(CONF_LEVEL_CHEAP, default_cheap),
+                ): threshold,
+                vol.Required(
+                    CONF_LEVEL_EXPENSIVE,
+                    default=options.get(CONF_LEVEL_EXPENSIVE, default_expensive),
+                ): threshold,
+                vol.Required(
+                    CONF_LEVEL_HYSTERESIS,
+                    default=options.get(
+                        CONF_LEVEL_HYSTERESIS, DEFAULT_LEVEL_HYSTERESIS
+                    ),
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=0,
+                        max=1,
+                        step=0.001,
+                        mode=selector.NumberSelectorMode.BOX,
+                        unit_of_measurement="CHF/kWh",
+                    )
+                ),
+            }
+        )
+
+        return self.async_show_form(step_id="levels", data_schema=schema, errors=errors)
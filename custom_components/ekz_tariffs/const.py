@@ -1,7 +1,11 @@
 from homeassistant.const import Platform
 
 DOMAIN = "ekz_tariffs"
-PLATFORMS: list[Platform] = [Platform.CALENDAR, Platform.SENSOR]
+PLATFORMS: list[Platform] = [
+    Platform.BINARY_SENSOR,
+    Platform.CALENDAR,
+    Platform.SENSOR,
+]
 
 CONF_TARIFF_NAME = "tariff_name"
 DEFAULT_TARIFF_NAME = "400D"
@@ -11,10 +15,95 @@ API_TARIFFS_PATH = "/tariffs"
 
 INTEGRATED_PREFIX = "integrated_"
 
+# hass.data key of the fetch manager shared by all entries
+DATA_FETCH_MANAGER = f"{DOMAIN}_fetch_manager"
+# Requests to the API in flight at once, across all entries
+MAX_PARALLEL_FETCHES = 2
+# API responses (tariff, range) kept with their ETag/Last-Modified
+RESPONSE_CACHE_SIZE = 32
+
+# Options: lowest/highest window sensors (cartesian product of these)
+CONF_WINDOW_HOURS = "window_hours"
+CONF_WINDOW_MINUTES = "window_minutes"
+CONF_WINDOW_MODES = "window_modes"
+CONF_WINDOW_SCOPES = "window_scopes"
+
+WINDOW_MODES = ["min", "max"]
+WINDOW_SCOPE_TODAY = "today"
+WINDOW_SCOPE_TOMORROW = "tomorrow"
+WINDOW_SCOPE_UPCOMING = "upcoming"
+WINDOW_SCOPES = [WINDOW_SCOPE_TODAY, WINDOW_SCOPE_TOMORROW, WINDOW_SCOPE_UPCOMING]
+
+DEFAULT_WINDOW_MINUTES: tuple[int, ...] = (120, 240)
+DEFAULT_WINDOW_MODES = ["min", "max"]
+DEFAULT_WINDOW_SCOPES = [WINDOW_SCOPE_TODAY, WINDOW_SCOPE_TOMORROW]
+
+# Options: length of the "upcoming" rolling horizon (0 = until end of known prices)
+CONF_HORIZON_HOURS = "horizon_hours"
+DEFAULT_HORIZON_HOURS = 0
+
+# Options: "cheapest N slots today" binary sensor (0, the default, disables it)
+CONF_CHEAPEST_COUNT = "cheapest_count"
+DEFAULT_CHEAPEST_COUNT = 0
+
+# Options: days of past prices kept in the cache/storage (0 = from today on)
+CONF_HISTORY_DAYS = "history_days"
+DEFAULT_HISTORY_DAYS = 90
+
+# Options: price levels (cheap/normal/expensive). Thresholds are CHF/kWh in
+# "absolute" mode and percentiles of the day's slot prices in "quantile"
+# mode; the hysteresis band is CHF/kWh in both modes and keeps a level until
+# the price clearly leaves it.
+CONF_LEVEL_MODE = "level_mode"
+CONF_LEVEL_CHEAP = "level_cheap"
+CONF_LEVEL_EXPENSIVE = "level_expensive"
+CONF_LEVEL_HYSTERESIS = "level_hysteresis"
+
+LEVEL_MODE_OFF = "off"
+LEVEL_MODE_ABSOLUTE = "absolute"
+LEVEL_MODE_QUANTILE = "quantile"
+LEVEL_MODES = [LEVEL_MODE_OFF, LEVEL_MODE_ABSOLUTE, LEVEL_MODE_QUANTILE]
+
+LEVEL_CHEAP = "cheap"
+LEVEL_NORMAL = "normal"
+LEVEL_EXPENSIVE = "expensive"
+LEVELS = [LEVEL_CHEAP, LEVEL_NORMAL, LEVEL_EXPENSIVE]
+
+DEFAULT_LEVEL_MODE = LEVEL_MODE_OFF
+# (cheap, expensive) per mode
+DEFAULT_LEVEL_THRESHOLDS = {
+    LEVEL_MODE_ABSOLUTE: (0.20, 0.35),
+    LEVEL_MODE_QUANTILE: (25.0, 75.0),
+}
+DEFAULT_LEVEL_HYSTERESIS = 0.005
+
+# Options: keep the today/tomorrow schedule off the current price sensor and
+# on a dedicated schedule sensor whose lists are not recorded
+CONF_SLIM_ATTRIBUTES = "slim_attributes"
+DEFAULT_SLIM_ATTRIBUTES = False
+
+# Hours per insert job when importing long-term statistics
+STATISTICS_BATCH_HOURS = 24 * 31
+
 FETCH_HOUR = 18
 FETCH_MINUTE = 30
+# Fetched window: today 00:00 + FETCH_DAYS days (only missing parts are requested)
+FETCH_DAYS = 2
+
+# Retry/poll backoff while fetching fails or due prices are missing: the
+# n-th retry waits a random time in [delay / 2, delay], with
+# delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2**n).
+RETRY_BASE_SECONDS = 120
+RETRY_MAX_SECONDS = 1800
+
+# Calendar events materialized per step of a range query before yielding
+# to the event loop (month views over a long history)
+CALENDAR_PAGE_SIZE = 500
 
 EVENT_TYPE = f"{DOMAIN}_event"
 EVENT_TARIFF_START = "tariff_start"
+EVENT_PRICE_LEVEL = "price_level"
 
 SERVICE_REFRESH = "refresh"
+SERVICE_CHEAPEST_SLOTS = "cheapest_slots"
+SERVICE_PLAN_LOAD = "plan_load"
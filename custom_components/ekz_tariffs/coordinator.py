@@ -1,51 +1,260 @@
 from __future__ import annotations
 
+import datetime as dt
 import logging
+import random
+from collections.abc import Iterable
 from datetime import timedelta
 
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.storage import Store
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from homeassistant.util import dt as dt_util
 
-from .api import EkzTariffsApi, TariffSlot
-from .storage import slots_to_json
+from .api import TariffSeries, from_epoch
+from .const import (
+    DEFAULT_HISTORY_DAYS,
+    DEFAULT_WINDOW_MINUTES,
+    DOMAIN,
+    FETCH_DAYS,
+    FETCH_HOUR,
+    FETCH_MINUTE,
+    RETRY_BASE_SECONDS,
+    RETRY_MAX_SECONDS,
+)
+from .diff import SeriesDiff, diff_series
+from .fetch import FetchManager
+from .scheduler import BoundaryScheduler
+from .snapshot import TariffSnapshot
+from .storage import TariffArchive
+from .utils import missing_ranges, next_midnight
 
 _LOGGER = logging.getLogger(__name__)
 
 
-class EkzTariffsCoordinator(DataUpdateCoordinator[list[TariffSlot]]):
+class EkzTariffsCoordinator(DataUpdateCoordinator[TariffSeries]):
     def __init__(
-        self, hass: HomeAssistant, api: EkzTariffsApi, tariff_name: str, store: Store
+        self,
+        hass: HomeAssistant,
+        api: FetchManager,
+        tariff_name: str,
+        archive: TariffArchive,
+        window_minutes: Iterable[int] = DEFAULT_WINDOW_MINUTES,
+        history_days: int = DEFAULT_HISTORY_DAYS,
     ):
         super().__init__(
             hass,
             _LOGGER,
             name="EKZ Tariffs",
             update_interval=None,
+            # Unchanged data (TariffSeries.__eq__) does not notify listeners.
+            always_update=False,
         )
 
         self._api = api
         self._tariff_name = tariff_name
-        self._store = store
+        self.window_minutes = tuple(sorted(window_minutes))
+        self.history_days = history_days
+        # Set by request_refetch(): re-download the whole window once
+        self._refetch = False
+        # Consecutive retries/polls so far (backoff exponent)
+        self._retries = 0
+        self._archive = archive
+        self._snapshot: TariffSnapshot | None = None
+        self._snapshot_source: TariffSeries | None = None
+        # Diff of the latest data change against the data before it; None
+        # means "everything may have changed" (e.g. restored from storage).
+        self.last_diff: SeriesDiff | None = None
+        self._diff_base: TariffSeries | None = None
+        # Single timer for all boundary-driven entity updates of this entry
+        self.scheduler = BoundaryScheduler(hass, self)
 
-    async def _async_update_data(self) -> list[TariffSlot]:
-        try:
-            now = dt_util.now()
-            today = dt_util.as_local(now).date()
+    @property
+    def snapshot(self) -> TariffSnapshot:
+        """Precomputed view of the current data, rebuilt once per data change."""
+        if self._snapshot is None or self._snapshot_source is not self.data:
+            # Days untouched by the diff keep their precomputed views.
+            reuse = (
+                self._snapshot
+                if self.last_diff is not None
+                and self._snapshot_source is self._diff_base
+                else None
+            )
+            self._snapshot = TariffSnapshot.build(
+                self.data or TariffSeries(),
+                self.window_minutes,
+                previous=reuse,
+                diff=self.last_diff,
+            )
+            self._snapshot_source = self.data
+        return self._snapshot
 
-            start = dt_util.start_of_local_day(
-                dt_util.as_local(
-                    dt_util.dt.datetime.combine(today, dt_util.dt.time.min)
-                )
+    def changed(self, start: dt.datetime, end: dt.datetime | None = None) -> bool:
+        """Whether the latest update may have changed prices in [start, end)."""
+        return self.last_diff is None or self.last_diff.affects(start, end)
+
+    def changed_day(self, day: dt.date) -> bool:
+        """Whether the latest update may have changed prices on a local day."""
+        return self.last_diff is None or self.last_diff.affects_day(day)
+
+    @callback
+    def async_set_updated_data(self, data: TariffSeries) -> None:
+        self.last_diff = None
+        self._diff_base = None
+        super().async_set_updated_data(data)
+
+    def request_refetch(self) -> None:
+        """Make the next refresh re-download the whole window, not only gaps."""
+        self._refetch = True
+
+    def _fetch_window(self) -> tuple[dt.datetime, dt.datetime, dt.datetime]:
+        """(history cutoff, window start, window end) for the current day."""
+        today = dt_util.as_local(dt_util.now()).date()
+
+        def _day_start(day: dt.date) -> dt.datetime:
+            return dt_util.start_of_local_day(
+                dt_util.as_local(dt.datetime.combine(day, dt.time.min))
             )
-            end = start + timedelta(days=2)
-            slots = await self._api.fetch_tariffs(
-                tariff_name=self._tariff_name,
-                start=start,
-                end=end,
+
+        return (
+            _day_start(today - timedelta(days=self.history_days)),
+            _day_start(today),
+            _day_start(today + timedelta(days=FETCH_DAYS)),
+        )
+
+    async def async_load_archive(self) -> None:
+        """Restore the retained history from the archive (startup)."""
+        cutoff, _, _ = self._fetch_window()
+        slots = await self._archive.async_read(int(cutoff.timestamp()))
+        if len(slots):
+            self.async_set_updated_data(slots)
+
+    def _gaps(self, series: TariffSeries | None = None) -> list[tuple[int, int]]:
+        """Parts of the fetch window series (default: the data) does not cover."""
+        _, start, end = self._fetch_window()
+        series = series if series is not None else self.data
+        covered = series.covered() if series is not None else []
+        return missing_ranges(covered, int(start.timestamp()), int(end.timestamp()))
+
+    @property
+    def needs_fetch(self) -> bool:
+        """Whether a refresh would request anything from the API."""
+        return self._refetch or bool(self._gaps())
+
+    def _fetch_due(self, series: TariffSeries | None = None) -> bool:
+        """
+        Whether missing prices should already be available.
+
+        Gaps up to the end of today are always due; tomorrow's prices are
+        only published in the evening, so gaps after midnight are due from
+        the daily fetch time on.
+        """
+        if self._refetch:
+            return True
+        gaps = self._gaps(series)
+        if not gaps:
+            return False
+        now = dt_util.now()
+        if gaps[0][0] < int(next_midnight(now).timestamp()):
+            return True
+        published = dt_util.as_local(now).replace(
+            hour=FETCH_HOUR, minute=FETCH_MINUTE, second=0, microsecond=0
+        )
+        return now >= published
+
+    def _plan_retry(self, series: TariffSeries | None = None) -> None:
+        """
+        Poll again with jittered exponential backoff while fetching failed
+        or due prices are still missing; otherwise wait for the daily fetch.
+        """
+        if not self._fetch_due(series):
+            self._retries = 0
+            self.update_interval = None
+            return
+        delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2**self._retries)
+        self._retries += 1
+        self.update_interval = timedelta(seconds=random.uniform(delay / 2, delay))
+        _LOGGER.debug(
+            "%s: prices incomplete, retry %d in %s",
+            self._tariff_name,
+            self._retries,
+            self.update_interval,
+        )
+
+    async def async_startup_refresh(self, entry: ConfigEntry) -> None:
+        """
+        First refresh at setup, only blocking when cached data is not enough.
+
+        If the archive has every price that is already published nothing
+        is fetched; if it covers today the fetch runs in the background, so
+        setup (and HA boot) does not wait for the API. Otherwise this is the
+        regular blocking first refresh that raises ConfigEntryNotReady on
+        failure.
+        """
+        if not self._fetch_due():
+            _LOGGER.debug("%s: cached tariffs are up to date", self._tariff_name)
+            return
+        gaps = self._gaps()
+        tomorrow = int(next_midnight(dt_util.now()).timestamp())
+        if self.data is not None and gaps[0][0] >= tomorrow:
+            _LOGGER.debug("%s: refreshing in the background", self._tariff_name)
+            entry.async_create_background_task(
+                self.hass, self.async_refresh(), f"{DOMAIN} first refresh"
             )
-            await self._store.async_save({"slots": slots_to_json(slots)})
+            return
+        await self.async_config_entry_first_refresh()
+
+    async def _async_update_data(self) -> TariffSeries:
+        try:
+            cutoff, start, end = self._fetch_window()
+            current = self.data if self.data is not None else TariffSeries()
+
+            # Only request the parts of the window that are not known yet.
+            if self._refetch:
+                gaps = [(int(start.timestamp()), int(end.timestamp()))]
+            else:
+                gaps = self._gaps()
+            slots = current
+            for gap_start, gap_end in gaps:
+                fetched = TariffSeries.from_slots(
+                    await self._api.fetch_tariffs(
+                        tariff_name=self._tariff_name,
+                        start=from_epoch(gap_start),
+                        end=from_epoch(gap_end),
+                    )
+                )
+                slots = slots.merged(fetched)
+            self._refetch = False
+            slots = slots.since(int(cutoff.timestamp()))
+            self._plan_retry(slots)
+
+            diff = diff_series(current, slots)
+            if not diff and self.data is not None:
+                # Keep the current object so snapshot and entities stay as is.
+                return self.data
+            # Append only what is new or revised; evicted months are deleted.
+            if self.data is None:
+                await self._archive.async_append(slots)
+            else:
+                await self._archive.async_append(
+                    _select(slots, diff.added + diff.changed)
+                )
+            await self._archive.async_evict(int(cutoff.timestamp()))
+            # Only describe data that made it into the archive
+            self.last_diff = diff if self.data is not None else None
+            self._diff_base = self.data
             return slots
         except Exception as err:
+            # The failed part is still missing (or the refetch still pending).
+            self._plan_retry()
             raise UpdateFailed(f"Failed to fetch EKZ tariffs: {err}") from err
+
+
+def _select(series: TariffSeries, ranges: Iterable[tuple[int, int]]) -> TariffSeries:
+    """Slots of series overlapping any of the (sorted, disjoint) ranges."""
+    rows: list[tuple[int, int, float]] = []
+    for start, end in ranges:
+        lo, hi = series.overlapping(start, end)
+        rows.extend(series[lo:hi].rows())
+    rows.sort()
+    return TariffSeries.from_rows(rows)
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import datetime as dt
+from dataclasses import dataclass
+from functools import cached_property
+
+from homeassistant.util import dt as dt_util
+
+from .api import TariffSeries, from_epoch
+
+# [start, end) in epoch seconds
+Range = tuple[int, int]
+
+
+@dataclass(frozen=True)
+class SeriesDiff:
+    """
+    Slot-level difference between two refreshes.
+
+    Slots are matched by their (start, end) bounds: bounds only in the new
+    series are added, bounds only in the old one are removed, and equal
+    bounds with a different price are changed. Contiguous slots are merged
+    into ranges.
+    """
+
+    added: tuple[Range, ...] = ()
+    changed: tuple[Range, ...] = ()
+    removed: tuple[Range, ...] = ()
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+    @property
+    def ranges(self) -> tuple[Range, ...]:
+        return self.added + self.changed + self.removed
+
+    @cached_property
+    def days(self) -> frozenset[dt.date]:
+        """Local days overlapping any added, changed or removed range."""
+        out: set[dt.date] = set()
+        for start, end in self.ranges:
+            day = dt_util.as_local(from_epoch(start)).date()
+            last = dt_util.as_local(from_epoch(end - 1)).date()
+            while day <= last:
+                out.add(day)
+                day += dt.timedelta(days=1)
+        return frozenset(out)
+
+    def affects(self, start: dt.datetime, end: dt.datetime | None = None) -> bool:
+        """Whether any range overlaps [start, end) (end=None: open-ended)."""
+        a = int(start.timestamp())
+        b = int(end.timestamp()) if end is not None else None
+        return any(a < e and (b is None or s < b) for s, e in self.ranges)
+
+    def affects_day(self, day: dt.date) -> bool:
+        return day in self.days
+
+
+def diff_series(old: TariffSeries, new: TariffSeries) -> SeriesDiff:
+    """Diff two start-sorted series in one merge pass (O(n + m))."""
+    added: list[Range] = []
+    changed: list[Range] = []
+    removed: list[Range] = []
+
+    i = j = 0
+    n, m = len(old), len(new)
+    while i < n or j < m:
+        old_key = (old.starts[i], old.ends[i]) if i < n else None
+        new_key = (new.starts[j], new.ends[j]) if j < m else None
+        if old_key == new_key:
+            if old.prices[i] != new.prices[j]:
+                _append(changed, new_key)
+            i += 1
+            j += 1
+        elif new_key is None or (old_key is not None and old_key < new_key):
+            _append(removed, old_key)
+            i += 1
+        else:
+            _append(added, new_key)
+            j += 1
+
+    return SeriesDiff(tuple(added), tuple(changed), tuple(removed))
+
+
+def _append(ranges: list[Range], rng: Range) -> None:
+    if ranges and ranges[-1][1] == rng[0]:
+        ranges[-1] = (ranges[-1][0], rng[1])
+    else:
+        ranges.append(rng)
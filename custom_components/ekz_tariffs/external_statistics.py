@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import logging
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+    get_last_statistics,
+)
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+from homeassistant.util import slugify
+
+from .const import DOMAIN, STATISTICS_BATCH_HOURS
+from .coordinator import EkzTariffsCoordinator
+from .statistics import HOUR_SECONDS, hourly_stats
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def price_statistic_id(tariff_name: str) -> str:
+    return f"{DOMAIN}:price_{slugify(tariff_name)}"
+
+
+class PriceStatistics:
+    """
+    Hourly tariff prices as external long-term statistics.
+
+    The recorder gets mean/min/max per hour instead of price lists in state
+    attributes. On start, hours after the last imported one are backfilled
+    from the coordinator data (the archive); afterwards only the hours a
+    refresh added or revised are imported again. Inserts are batched.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinator: EkzTariffsCoordinator,
+        tariff_name: str,
+    ) -> None:
+        self._hass = hass
+        self._coordinator = coordinator
+        self.statistic_id = price_statistic_id(tariff_name)
+        self._metadata = StatisticMetaData(
+            has_mean=True,
+            has_sum=False,
+            name=f"EKZ price {tariff_name}",
+            source=DOMAIN,
+            statistic_id=self.statistic_id,
+            unit_of_measurement="CHF/kWh",
+        )
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Import on every data change; returns a stop callback."""
+        return self._coordinator.async_add_listener(self._handle_update)
+
+    async def async_backfill(self) -> None:
+        """Import the hours after the last imported one (all on first run)."""
+        last = await get_instance(self._hass).async_add_executor_job(
+            get_last_statistics, self._hass, 1, self.statistic_id, False, {"mean"}
+        )
+        rows = last.get(self.statistic_id)
+        start_ts = int(rows[0]["start"]) + HOUR_SECONDS if rows else None
+        self._import(start_ts, None)
+
+    @callback
+    def _handle_update(self) -> None:
+        diff = self._coordinator.last_diff
+        if diff is None:
+            self._import(None, None)
+            return
+        for start_ts, end_ts in diff.added + diff.changed:
+            self._import(start_ts, end_ts)
+
+    @callback
+    def _import(self, start_ts: int | None, end_ts: int | None) -> None:
+        if self._coordinator.data is None:
+            return
+        hours = hourly_stats(self._coordinator.data, start_ts, end_ts)
+        for i in range(0, len(hours), STATISTICS_BATCH_HOURS):
+            async_add_external_statistics(
+                self._hass,
+                self._metadata,
+                [
+                    StatisticData(
+                        start=dt_util.utc_from_timestamp(h.start_ts),
+                        mean=h.mean,
+                        min=h.min,
+                        max=h.max,
+                    )
+                    for h in hours[i : i + STATISTICS_BATCH_HOURS]
+                ],
+            )
+        if hours:
+            _LOGGER.debug("Imported %d hours into %s", len(hours), self.statistic_id)
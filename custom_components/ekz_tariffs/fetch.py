@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Iterable
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .api import EkzTariffsApi, TariffSeries
+from .const import DATA_FETCH_MANAGER, MAX_PARALLEL_FETCHES
+from .storage import ResponseCache
+
+if TYPE_CHECKING:
+    from .coordinator import EkzTariffsCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# (tariff_name, start_ts, end_ts)
+FetchKey = tuple[str, int, int]
+
+
+class FetchManager:
+    """
+    Domain-wide gateway to the EKZ API shared by all config entries.
+
+    Identical requests that are in flight at the same time are sent once and
+    their result is shared; distinct requests run with at most max_parallel
+    of them in flight. The endpoint takes a single tariff name per call, so
+    several tariffs are fetched concurrently rather than in one request.
+    Refresh cycles of all registered coordinators are coalesced as well.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: EkzTariffsApi,
+        max_parallel: int = MAX_PARALLEL_FETCHES,
+    ) -> None:
+        self._hass = hass
+        self._api = api
+        self._semaphore = asyncio.Semaphore(max_parallel)
+        self._inflight: dict[FetchKey, asyncio.Future[TariffSeries]] = {}
+        self._coordinators: list[EkzTariffsCoordinator] = []
+        self._cycle: asyncio.Future[None] | None = None
+
+    @callback
+    def async_register(self, coordinator: EkzTariffsCoordinator) -> CALLBACK_TYPE:
+        """Include coordinator in refresh cycles; returns an unregister."""
+        self._coordinators.append(coordinator)
+
+        @callback
+        def _unregister() -> None:
+            self._coordinators.remove(coordinator)
+
+        return _unregister
+
+    async def fetch_tariffs(
+        self,
+        tariff_name: str,
+        start: datetime,
+        end: datetime,
+    ) -> TariffSeries:
+        """Same contract as EkzTariffsApi.fetch_tariffs, deduplicated and bounded."""
+        key = (tariff_name, int(start.timestamp()), int(end.timestamp()))
+        future = self._inflight.get(key)
+        if future is None:
+            future = self._hass.async_create_task(
+                self._fetch(tariff_name, start, end),
+                f"ekz_tariffs fetch {tariff_name}",
+            )
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            _LOGGER.debug("Joining in-flight fetch of %s", tariff_name)
+        # Callers share one task; a cancelled caller must not cancel the rest.
+        return await asyncio.shield(future)
+
+    async def _fetch(
+        self, tariff_name: str, start: datetime, end: datetime
+    ) -> TariffSeries:
+        async with self._semaphore:
+            return TariffSeries.from_slots(
+                await self._api.fetch_tariffs(
+                    tariff_name=tariff_name, start=start, end=end
+                )
+            )
+
+    async def async_refresh(
+        self,
+        coordinators: Iterable[EkzTariffsCoordinator],
+        *,
+        refetch: bool = False,
+    ) -> None:
+        """Refresh the given coordinators together (fetches bounded as above)."""
+        coordinators = list(coordinators)
+        if refetch:
+            for coordinator in coordinators:
+                coordinator.request_refetch()
+        await asyncio.gather(
+            *(coordinator.async_request_refresh() for coordinator in coordinators)
+        )
+
+    async def async_refresh_all(self) -> None:
+        """
+        One refresh cycle for every registered coordinator.
+
+        All entries trigger this at the daily fetch time; calls made while a
+        cycle is running join it instead of starting another one. Entries
+        that already have the whole window are skipped.
+        """
+        if self._cycle is None:
+            self._cycle = self._hass.async_create_task(
+                self.async_refresh(c for c in self._coordinators if c.needs_fetch),
+                "ekz_tariffs refresh cycle",
+            )
+            self._cycle.add_done_callback(lambda _: setattr(self, "_cycle", None))
+        await asyncio.shield(self._cycle)
+
+
+@callback
+def async_get_fetch_manager(hass: HomeAssistant) -> FetchManager:
+    """The shared fetch manager, created on first use."""
+    manager: FetchManager | None = hass.data.get(DATA_FETCH_MANAGER)
+    if manager is None:
+        api = EkzTariffsApi(async_get_clientsession(hass), cache=ResponseCache(hass))
+        manager = FetchManager(hass, api)
+        hass.data[DATA_FETCH_MANAGER] = manager
+    return manager
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import datetime as dt
+import heapq
+import logging
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.util import dt as dt_util
+
+from .api import from_epoch
+from .const import FETCH_HOUR, FETCH_MINUTE
+from .statistics import BUCKET_SECONDS
+from .utils import next_midnight, next_time_of_day
+
+if TYPE_CHECKING:
+    from .coordinator import EkzTariffsCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Boundary kinds entities can subscribe to
+BOUNDARY_SLOT = "slot"  # start/end of a fused price event
+BOUNDARY_BUCKET = "bucket"  # every 15-min bucket
+BOUNDARY_MIDNIGHT = "midnight"  # local midnight
+BOUNDARY_FETCH = "fetch"  # daily fetch time (FETCH_HOUR:FETCH_MINUTE)
+
+BoundaryAction = Callable[[dt.datetime], None]
+
+
+class BoundaryScheduler:
+    """
+    One timer per config entry for every time-driven update.
+
+    Keeps a heap with the next boundary of each subscribed kind and arms a
+    single HA timer for the earliest one. When it fires, all subscribers of
+    the due kinds are called with the boundary time and the fired kinds are
+    pushed again with their following occurrence. Slot boundaries come from
+    the coordinator snapshot and are re-planned on every data update.
+    """
+
+    def __init__(self, hass: HomeAssistant, coordinator: EkzTariffsCoordinator):
+        self._hass = hass
+        self._coordinator = coordinator
+        self._subscribers: dict[str, list[BoundaryAction]] = {}
+        self._heap: list[tuple[int, str]] = []
+        self._armed_ts: int | None = None
+        self._unsub_timer: CALLBACK_TYPE | None = None
+        self._unsub_data: CALLBACK_TYPE | None = None
+
+    @property
+    def next_boundary(self) -> dt.datetime | None:
+        return from_epoch(self._heap[0][0]) if self._heap else None
+
+    @callback
+    def async_subscribe(self, kind: str, action: BoundaryAction) -> CALLBACK_TYPE:
+        """Call action(boundary) at every boundary of kind; returns an unsubscribe."""
+        subscribers = self._subscribers.setdefault(kind, [])
+        subscribers.append(action)
+        if len(subscribers) == 1:
+            if kind == BOUNDARY_SLOT and self._unsub_data is None:
+                self._unsub_data = self._coordinator.async_add_listener(
+                    self._handle_coordinator_update
+                )
+            self._push(kind, _now_ts())
+            self._arm()
+
+        @callback
+        def _unsubscribe() -> None:
+            subscribers.remove(action)
+            if not subscribers:
+                self._drop(kind)
+                self._arm()
+
+        return _unsubscribe
+
+    @callback
+    def async_stop(self) -> None:
+        self._subscribers.clear()
+        self._heap.clear()
+        self._cancel_timer()
+        if self._unsub_data is not None:
+            self._unsub_data()
+            self._unsub_data = None
+
+    def _next(self, kind: str, ts: int) -> int | None:
+        """First boundary of kind strictly after ts."""
+        if kind == BOUNDARY_BUCKET:
+            return ts - ts % BUCKET_SECONDS + BUCKET_SECONDS
+        now = from_epoch(ts)
+        if kind == BOUNDARY_SLOT:
+            nxt = self._coordinator.snapshot.next_boundary(now)
+        elif kind == BOUNDARY_MIDNIGHT:
+            nxt = next_midnight(now)
+        elif kind == BOUNDARY_FETCH:
+            nxt = next_time_of_day(now, FETCH_HOUR, FETCH_MINUTE)
+        else:
+            raise ValueError(f"Unknown boundary kind: {kind}")
+        if nxt is None:
+            return None
+        nxt_ts = int(nxt.timestamp())
+        return nxt_ts if nxt_ts > ts else None
+
+    def _push(self, kind: str, after_ts: int) -> None:
+        nxt = self._next(kind, after_ts)
+        if nxt is not None:
+            heapq.heappush(self._heap, (nxt, kind))
+
+    def _drop(self, kind: str) -> None:
+        self._subscribers.pop(kind, None)
+        self._heap = [entry for entry in self._heap if entry[1] != kind]
+        heapq.heapify(self._heap)
+        if kind == BOUNDARY_SLOT and self._unsub_data is not None:
+            self._unsub_data()
+            self._unsub_data = None
+
+    def _cancel_timer(self) -> None:
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+        self._armed_ts = None
+
+    def _arm(self) -> None:
+        if not self._heap:
+            self._cancel_timer()
+            return
+        ts = self._heap[0][0]
+        if ts == self._armed_ts:
+            return
+        self._cancel_timer()
+        self._armed_ts = ts
+        self._unsub_timer = async_track_point_in_utc_time(
+            self._hass, self._handle_timer, dt_util.utc_from_timestamp(ts)
+        )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        # New data -> new price changes; the other kinds are data independent.
+        self._heap = [entry for entry in self._heap if entry[1] != BOUNDARY_SLOT]
+        heapq.heapify(self._heap)
+        if BOUNDARY_SLOT in self._subscribers:
+            self._push(BOUNDARY_SLOT, _now_ts())
+        self._arm()
+
+    @callback
+    def _handle_timer(self, _now: dt.datetime) -> None:
+        self._unsub_timer = None
+        ts = self._armed_ts
+        self._armed_ts = None
+        if ts is None:
+            return
+
+        due: list[str] = []
+        while self._heap and self._heap[0][0] <= ts:
+            _, kind = heapq.heappop(self._heap)
+            if kind not in due:
+                due.append(kind)
+        # After a long stall, skip missed boundaries instead of replaying them.
+        after = max(ts, _now_ts())
+        for kind in due:
+            self._push(kind, after)
+        self._arm()
+
+        boundary = from_epoch(ts)
+        for kind in due:
+            for action in list(self._subscribers.get(kind, ())):
+                try:
+                    action(boundary)
+                except Exception:
+                    _LOGGER.exception(
+                        "Error handling %s boundary at %s", kind, boundary
+                    )
+
+
+def _now_ts() -> int:
+    return int(dt_util.now().timestamp())
@@ -1,7 +1,5 @@
-
 from __future__ import annotations
 
-import contextlib
 import datetime as dt
 from typing import Any
 
@@ -13,45 +11,42 @@ from homeassistant.components.sensor import (
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.event import async_track_point_in_time
 from homeassistant.util import dt as dt_util
 
-from .api import TariffSlot
-from .const import DOMAIN
-from .sensor_daily_average import EkzAverageTodaySensor, EkzAverageTomorrowSensor
+from .const import (
+    CONF_SLIM_ATTRIBUTES,
+    CONF_WINDOW_SCOPES,
+    DEFAULT_SLIM_ATTRIBUTES,
+    DEFAULT_WINDOW_SCOPES,
+    DOMAIN,
+    WINDOW_SCOPE_UPCOMING,
+)
+from .scheduler import BOUNDARY_MIDNIGHT, BOUNDARY_SLOT
+from .sensor_daily_average import (
+    EkzAverageTodaySensor,
+    EkzAverageTomorrowSensor,
+    EkzAverageUpcomingSensor,
+)
+from .sensor_price_level import EkzPriceLevelSensor
 from .sensor_window_extreme import EkzWindowExtremeSensor
-from .utils import FusedEvent, fuse_slots
-
-
-def _find_current_slot(slots: list[FusedEvent], now: dt.datetime) -> FusedEvent | None:
-    for s in slots:
-        if s.start <= now < s.end:
-            return s
-    return None
-
-
-def _find_next_boundary(
-    slots: list[FusedEvent], now: dt.datetime
-) -> dt.datetime | None:
-    """
-    Next moment when the price can change:
-    - if currently in a slot: its end
-    - else: the next slot start after now
-    """
-    cur = _find_current_slot(slots, now)
-    if cur:
-        return cur.end
-
-    for s in slots:
-        if s.start > now:
-            return s.start
-    return None
+from .snapshot import TariffSnapshot
+from .utils import horizon_minutes, level_config, window_specs
 
 
 def santize_tariff_name(tariff_name: str) -> str:
     return tariff_name.replace(" ", "_").lower()
 
 
+def _schedule_attributes(snapshot: TariffSnapshot, today: dt.date) -> dict[str, Any]:
+    """today/tomorrow: Listen [{start, end, value}] (CHF/kWh) der fusionierten Slots."""
+    # Events sind im Snapshot nach lokalem Startdatum gruppiert und einmal
+    # pro Datenstand gerendert
+    return {
+        "today": snapshot.day_attributes(today),
+        "tomorrow": snapshot.day_attributes(today + dt.timedelta(days=1)),
+    }
+
+
 class EkzCurrentPriceSensor(SensorEntity):
     _attr_has_entity_name = True
     _attr_native_unit_of_measurement = "CHF/kWh"
@@ -59,58 +54,47 @@ class EkzCurrentPriceSensor(SensorEntity):
     _attr_icon = "mdi:cash-100"
 
     def __init__(
-        self, hass: HomeAssistant, entry_id: str, tariff_name: str, coordinator
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        tariff_name: str,
+        coordinator,
+        slim: bool = DEFAULT_SLIM_ATTRIBUTES,
     ) -> None:
         self.hass = hass
         self._entry_id = entry_id
         self._tariff_name = tariff_name
         self._coordinator = coordinator
+        # Slim: only scalar attributes, the schedule is on EkzScheduleSensor
+        self._slim = slim
         self._attr_unique_id = f"{entry_id}_current_price"
         self._attr_name = f"Current price: {tariff_name}"
-        self._unsub_boundary: Any | None = None
 
     async def async_added_to_hass(self) -> None:
         self.async_on_remove(
             self._coordinator.async_add_listener(self._handle_coordinator_update)
         )
-        self._handle_coordinator_update()
-
-    def _clear_boundary_timer(self) -> None:
-        if self._unsub_boundary:
-            with contextlib.suppress(Exception):
-                self._unsub_boundary()
-            self._unsub_boundary = None
-
-    def _schedule_next_boundary_update(self) -> None:
-        self._clear_boundary_timer()
-        slots: list[TariffSlot] = self._coordinator.data or []
-        now = dt_util.now()
-
-        fused_slots = fuse_slots(slots)
-        next_boundary = _find_next_boundary(fused_slots, now)
-        if not next_boundary or next_boundary <= now:
-            return
-
-        async def _on_boundary(_now: dt.datetime) -> None:
-            # Recompute native_value/attributes and then schedule the *next* boundary.
-            self.async_write_ha_state()
-            self._schedule_next_boundary_update()
-
-        self._unsub_boundary = async_track_point_in_time(
-            self.hass, _on_boundary, next_boundary
+        # Price changes are tracked by the entry's shared boundary scheduler
+        self.async_on_remove(
+            self._coordinator.scheduler.async_subscribe(
+                BOUNDARY_SLOT, self._on_boundary
+            )
         )
+        self.async_write_ha_state()
 
-    def _handle_coordinator_update(self) -> None:
-        # Tariff schedule changed (daily refresh) -> reschedule boundary updates
-        self._schedule_next_boundary_update()
+    def _on_boundary(self, _boundary: dt.datetime) -> None:
         self.async_write_ha_state()
 
+    def _handle_coordinator_update(self) -> None:
+        # State covers the current slot and the today/tomorrow attributes.
+        today = dt_util.start_of_local_day()
+        end = today + dt.timedelta(days=1 if self._slim else 2)
+        if self._coordinator.changed(today, end):
+            self.async_write_ha_state()
+
     @property
     def native_value(self) -> float | None:
-        slots: list[TariffSlot] = self._coordinator.data or []
-        now = dt_util.now()
-        fused_slots = fuse_slots(slots)
-        cur = _find_current_slot(fused_slots, now)
+        cur = self._coordinator.snapshot.current(dt_util.now())
         if not cur:
             return None
         # avoid float noise; keep sensor stable
@@ -119,58 +103,93 @@ class EkzCurrentPriceSensor(SensorEntity):
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """
-        Neben Metadaten stellt dieser Sensor *zugleich* die zukünftigen Slots bereit:
-        - today/tomorrow: Listen [{start, end, value}] (CHF/kWh)
-          aus den fusionierten Slots (FusedEvent), die ein .price-Attribut besitzen.
+        Neben Metadaten stellt dieser Sensor *zugleich* die zukünftigen Slots bereit
+        (siehe _schedule_attributes), ausser im Slim-Modus.
         """
-        # Original-Slots vom Coordinator (list[TariffSlot])
-        slots: list[TariffSlot] = self._coordinator.data or []
+        # Vorberechneter Snapshot des Coordinators (einmal pro Refresh erstellt)
+        snapshot = self._coordinator.snapshot
         now = dt_util.now()
 
-        # Für aktuellen Wert & Grenzzeitpunkte weiter wie gehabt:
-        fused_slots = fuse_slots(slots)
-        cur = _find_current_slot(fused_slots, now)
-        next_boundary = _find_next_boundary(fused_slots, now)
-
-        # NEU: today/tomorrow-Listen aus den fusionierten Slots erzeugen
-        today_date = dt_util.as_local(now).date()
-        tomorrow_date = today_date + dt.timedelta(days=1)
-
-        def _events_for_day(day: dt.date) -> list[dict[str, Any]]:
-            out: list[dict[str, Any]] = []
-            for e in fused_slots:
-                # Wir ordnen nach Startdatum (lokal) – reicht im 15-min Raster
-                if dt_util.as_local(e.start).date() == day:
-                    out.append(
-                        {
-                            "start": e.start.isoformat(),
-                            "end": e.end.isoformat(),
-                            "value": round(e.price, 6),
-                        }
-                    )
-            out.sort(key=lambda x: x["start"])
-            return out
+        cur = snapshot.current(now)
+        next_boundary = snapshot.next_boundary(now)
+        today = dt_util.as_local(now).date()
 
         attrs: dict[str, Any] = {
             "tariff_name": self._tariff_name,
-            "schedule_date": dt_util.as_local(now).date().isoformat(),
+            "schedule_date": today.isoformat(),
             "next_change": next_boundary.isoformat() if next_boundary else None,
             "price_unit": "CHF/kWh",
-            "today": _events_for_day(today_date),
-            "tomorrow": _events_for_day(tomorrow_date),
+            **({} if self._slim else _schedule_attributes(snapshot, today)),
         }
 
         if cur:
             attrs.update(
                 {
-                    "slot_start": cur.start.isoformat(),
-                    "slot_end": cur.end.isoformat(),
+                    "slot_start": cur.start_iso,
+                    "slot_end": cur.end_iso,
                 }
             )
 
         return attrs
 
 
+class EkzScheduleSensor(SensorEntity):
+    """
+    Today's and tomorrow's fused price events (slim attribute mode).
+
+    State is the end of the known prices. The event lists are rebuilt only
+    when the data or the day changes and are not written to the database.
+    """
+
+    _attr_has_entity_name = True
+    _attr_device_class = SensorDeviceClass.TIMESTAMP
+    _attr_icon = "mdi:calendar-clock"
+    _unrecorded_attributes = frozenset({"today", "tomorrow"})
+
+    def __init__(
+        self, hass: HomeAssistant, entry_id: str, tariff_name: str, coordinator
+    ) -> None:
+        self.hass = hass
+        self._entry_id = entry_id
+        self._tariff_name = tariff_name
+        self._coordinator = coordinator
+        self._attr_name = f"Schedule: {tariff_name}"
+        self._attr_unique_id = f"{entry_id}_schedule"
+
+    async def async_added_to_hass(self) -> None:
+        self.async_on_remove(self._coordinator.async_add_listener(self._handle_update))
+        self.async_on_remove(
+            self._coordinator.scheduler.async_subscribe(
+                BOUNDARY_MIDNIGHT, self._on_boundary
+            )
+        )
+        self._update_schedule()
+        self.async_write_ha_state()
+
+    def _update_schedule(self) -> None:
+        snapshot = self._coordinator.snapshot
+        ends = snapshot.slots.ends
+        today = dt_util.as_local(dt_util.now()).date()
+        self._attr_native_value = dt_util.utc_from_timestamp(ends[-1]) if ends else None
+        self._attr_extra_state_attributes = {
+            "tariff_name": self._tariff_name,
+            "price_unit": "CHF/kWh",
+            "schedule_date": today.isoformat(),
+            **_schedule_attributes(snapshot, today),
+        }
+
+    def _on_boundary(self, _boundary: dt.datetime) -> None:
+        self._update_schedule()
+        self.async_write_ha_state()
+
+    def _handle_update(self) -> None:
+        today = dt_util.start_of_local_day()
+        # Only today/tomorrow are listed; the end of known prices is in there too
+        if self._coordinator.changed(today, today + dt.timedelta(days=2)):
+            self._update_schedule()
+            self.async_write_ha_state()
+
+
 class EkzNextChangeSensor(SensorEntity):
     _attr_has_entity_name = True
     _attr_device_class = SensorDeviceClass.TIMESTAMP
@@ -187,89 +206,44 @@ class EkzNextChangeSensor(SensorEntity):
 
     async def async_added_to_hass(self) -> None:
         self.async_on_remove(self._coordinator.async_add_listener(self._handle_update))
-        self._handle_update()
+        self.async_on_remove(
+            self._coordinator.scheduler.async_subscribe(
+                BOUNDARY_SLOT, self._on_boundary
+            )
+        )
+        self.async_write_ha_state()
 
-    def _handle_update(self) -> None:
+    def _on_boundary(self, _boundary: dt.datetime) -> None:
         self.async_write_ha_state()
 
+    def _handle_update(self) -> None:
+        if self._coordinator.changed(dt_util.start_of_local_day()):
+            self.async_write_ha_state()
+
     @property
     def native_value(self) -> dt.datetime | None:
-        slots: list[TariffSlot] = self._coordinator.data or []
-        fused_slots = fuse_slots(slots)
-        return _find_next_boundary(fused_slots, dt_util.now())
+        return self._coordinator.snapshot.next_boundary(dt_util.now())
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
-        slots: list[TariffSlot] = self._coordinator.data or []
-        now = dt_util.now()
-        fused_slots = fuse_slots(slots)
-        cur = _find_current_slot(fused_slots, now)
+        cur = self._coordinator.snapshot.current(dt_util.now())
         return {
             "tariff_name": self._tariff_name,
-            "slot_start": cur.start.isoformat() if cur else None,
-            "slot_end": cur.end.isoformat() if cur else None,
+            "slot_start": cur.start_iso if cur else None,
+            "slot_end": cur.end_iso if cur else None,
         }
 
 
-def _mk_windows(hass, entry_id, tariff_name, coordinator, day_offset: int, suffix: str):
-    label = "today" if day_offset == 0 else "tomorrow"
-    return [
-        EkzWindowExtremeSensor(
-            hass,
-            entry_id,
-            tariff_name,
-            coordinator,
-            day_offset,
-            window_minutes=240,
-            mode="min",
-            name=f"Lowest 4h window {label}: {tariff_name}",
-            unique_suffix=f"lowest_4h_{suffix}",
-        ),
-        EkzWindowExtremeSensor(
-            hass,
-            entry_id,
-            tariff_name,
-            coordinator,
-            day_offset,
-            window_minutes=120,
-            mode="min",
-            name=f"Lowest 2h window {label}: {tariff_name}",
-            unique_suffix=f"lowest_2h_{suffix}",
-        ),
-        EkzWindowExtremeSensor(
-            hass,
-            entry_id,
-            tariff_name,
-            coordinator,
-            day_offset,
-            window_minutes=240,
-            mode="max",
-            name=f"Highest 4h window {label}: {tariff_name}",
-            unique_suffix=f"highest_4h_{suffix}",
-        ),
-        EkzWindowExtremeSensor(
-            hass,
-            entry_id,
-            tariff_name,
-            coordinator,
-            day_offset,
-            window_minutes=120,
-            mode="max",
-            name=f"Highest 2h window {label}: {tariff_name}",
-            unique_suffix=f"highest_2h_{suffix}",
-        ),
-    ]
-
-
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     data = hass.data[DOMAIN][entry.entry_id]
+    slim = entry.options.get(CONF_SLIM_ATTRIBUTES, DEFAULT_SLIM_ATTRIBUTES)
     entities = [
         EkzCurrentPriceSensor(
-            hass, entry.entry_id, data["tariff_name"], data["coordinator"]
+            hass, entry.entry_id, data["tariff_name"], data["coordinator"], slim
         ),
         EkzNextChangeSensor(
             hass, entry.entry_id, data["tariff_name"], data["coordinator"]
@@ -282,21 +256,38 @@ async def async_setup_entry(
         ),
     ]
 
-    entities += _mk_windows(
-        hass,
-        entry.entry_id,
-        data["tariff_name"],
-        data["coordinator"],
-        day_offset=0,
-        suffix="today",
-    )
-    entities += _mk_windows(
-        hass,
-        entry.entry_id,
-        data["tariff_name"],
-        data["coordinator"],
-        day_offset=1,
-        suffix="tomorrow",
-    )
+    if slim:
+        entities.append(
+            EkzScheduleSensor(
+                hass, entry.entry_id, data["tariff_name"], data["coordinator"]
+            )
+        )
+
+    scopes = entry.options.get(CONF_WINDOW_SCOPES, DEFAULT_WINDOW_SCOPES)
+    if WINDOW_SCOPE_UPCOMING in scopes:
+        entities.append(
+            EkzAverageUpcomingSensor(
+                hass,
+                entry.entry_id,
+                data["tariff_name"],
+                data["coordinator"],
+                horizon_minutes(entry.options),
+            )
+        )
+
+    entities += [
+        EkzWindowExtremeSensor(
+            hass, entry.entry_id, data["tariff_name"], data["coordinator"], spec
+        )
+        for spec in window_specs(entry.options)
+    ]
+
+    levels = level_config(entry.options)
+    if levels is not None:
+        entities.append(
+            EkzPriceLevelSensor(
+                hass, entry.entry_id, data["tariff_name"], data["coordinator"], levels
+            )
+        )
 
     async_add_entities(entities, update_before_add=False)
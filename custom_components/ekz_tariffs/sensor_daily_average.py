@@ -1,16 +1,13 @@
-import contextlib
 import datetime as dt
 from typing import Any
 
 from homeassistant.components.sensor import SensorEntity, SensorStateClass
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.event import async_track_point_in_time
 from homeassistant.util import dt as dt_util
 
-from .api import TariffSlot
 from .coordinator import EkzTariffsCoordinator
-from .statistics import daily_stats
-from .utils import next_midnight
+from .scheduler import BOUNDARY_BUCKET, BOUNDARY_MIDNIGHT
+from .utils import window_label
 
 
 class _EkzDailyAverageSensor(SensorEntity):
@@ -36,52 +33,43 @@ class _EkzDailyAverageSensor(SensorEntity):
         self._day_offset = day_offset
         self._attr_name = name
         self._attr_unique_id = f"{entry_id}_{unique_suffix}"
-        self._unsub_midnight = None
 
     async def async_added_to_hass(self):
         self.async_on_remove(self._coordinator.async_add_listener(self._handle_update))
-        self._schedule_midnight_update()
-        self._handle_update()
-
-    def _schedule_midnight_update(self):
-        if self._unsub_midnight:
-            with contextlib.suppress(Exception):
-                self._unsub_midnight()
-            self._unsub_midnight = None
-
-        when = next_midnight(dt_util.now())
-
-        async def _on_midnight(_now: dt.datetime):
-            self.async_write_ha_state()
-            self._schedule_midnight_update()
-
-        self._unsub_midnight = async_track_point_in_time(self.hass, _on_midnight, when)
+        self.async_on_remove(
+            self._coordinator.scheduler.async_subscribe(
+                BOUNDARY_MIDNIGHT, self._on_boundary
+            )
+        )
+        self.async_write_ha_state()
 
-    def _handle_update(self):
+    def _on_boundary(self, _boundary: dt.datetime) -> None:
         self.async_write_ha_state()
 
-    @property
-    def native_value(self) -> float | None:
-        slots: list[TariffSlot] = self._coordinator.data or []
+    def _handle_update(self):
         day = dt_util.as_local(dt_util.now()).date() + dt.timedelta(
             days=self._day_offset
         )
-        stats = daily_stats(slots, day)
+        if self._coordinator.changed_day(day):
+            self.async_write_ha_state()
+
+    @property
+    def native_value(self) -> float | None:
+        stats = self._coordinator.snapshot.day_offset(
+            dt_util.now(), self._day_offset
+        ).stats
         if stats["avg"] is None:
             return None
         return round(stats["avg"], 6)
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
-        slots: list[TariffSlot] = self._coordinator.data or []
-        day = dt_util.as_local(dt_util.now()).date() + dt.timedelta(
-            days=self._day_offset
-        )
-        stats = daily_stats(slots, day)
+        day = self._coordinator.snapshot.day_offset(dt_util.now(), self._day_offset)
+        stats = day.stats
 
         attrs: dict[str, Any] = {
             "tariff_name": self._tariff_name,
-            "day": day.isoformat(),
+            "day": day.day.isoformat(),
             "slots_count": stats["slots_count"],
             "covered_minutes": stats["covered_minutes"],
         }
@@ -129,3 +117,67 @@ class EkzAverageTomorrowSensor(_EkzDailyAverageSensor):
             name=f"Average price tomorrow: {tariff_name}",
             unique_suffix="avg_tomorrow",
         )
+
+
+class EkzAverageUpcomingSensor(SensorEntity):
+    """Average price over the rolling horizon starting at the current 15-min bucket."""
+
+    _attr_native_unit_of_measurement = "CHF/kWh"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_has_entity_name = True
+    _attr_icon = "mdi:cash-fast"
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        tariff_name: str,
+        coordinator: EkzTariffsCoordinator,
+        horizon_minutes: int,
+    ):
+        self.hass = hass
+        self._entry_id = entry_id
+        self._tariff_name = tariff_name
+        self._coordinator = coordinator
+        self._horizon_minutes = horizon_minutes
+        horizon = (
+            f"next {window_label(horizon_minutes)}" if horizon_minutes else "upcoming"
+        )
+        self._attr_name = f"Average price {horizon}: {tariff_name}"
+        self._attr_unique_id = f"{entry_id}_avg_upcoming"
+
+    async def async_added_to_hass(self):
+        self.async_on_remove(self._coordinator.async_add_listener(self._handle_update))
+        self.async_on_remove(
+            self._coordinator.scheduler.async_subscribe(
+                BOUNDARY_BUCKET, self._on_boundary
+            )
+        )
+        self.async_write_ha_state()
+
+    def _on_boundary(self, _boundary: dt.datetime) -> None:
+        self.async_write_ha_state()
+
+    def _handle_update(self):
+        if self._coordinator.changed(dt_util.now()):
+            self.async_write_ha_state()
+
+    @property
+    def native_value(self) -> float | None:
+        avg = self._coordinator.snapshot.rolling.average(
+            dt_util.now(), self._horizon_minutes
+        )
+        return round(avg, 6) if avg is not None else None
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        rolling = self._coordinator.snapshot.rolling
+        now = dt_util.now()
+        lo, hi = rolling.span(now, self._horizon_minutes)
+        return {
+            "tariff_name": self._tariff_name,
+            "horizon_minutes": self._horizon_minutes,
+            "horizon_start": rolling.at(lo).isoformat() if hi > lo else None,
+            "horizon_end": rolling.at(hi).isoformat() if hi > lo else None,
+            "missing_buckets": rolling.missing_buckets(now, self._horizon_minutes),
+        }
@@ -0,0 +1,126 @@
+import datetime as dt
+from typing import Any
+
+from homeassistant.components.sensor import SensorDeviceClass, SensorEntity
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .const import EVENT_PRICE_LEVEL, EVENT_TYPE, LEVELS
+from .coordinator import EkzTariffsCoordinator
+from .scheduler import BOUNDARY_MIDNIGHT, BOUNDARY_SLOT
+from .utils import LevelConfig
+
+
+class EkzPriceLevelSensor(SensorEntity):
+    """
+    Price level (cheap/normal/expensive) of the current slot.
+
+    Levels are computed once per refresh with hysteresis. State is only
+    written and a price_level event only fired when the level changes,
+    so automations don't need to watch every tariff_start.
+    """
+
+    _attr_has_entity_name = True
+    _attr_device_class = SensorDeviceClass.ENUM
+    _attr_options = LEVELS
+    _attr_icon = "mdi:stairs"
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        tariff_name: str,
+        coordinator: EkzTariffsCoordinator,
+        config: LevelConfig,
+    ):
+        self.hass = hass
+        self._entry_id = entry_id
+        self._tariff_name = tariff_name
+        self._coordinator = coordinator
+        self._config = config
+        self._attr_name = f"Price level: {tariff_name}"
+        self._attr_unique_id = f"{entry_id}_price_level"
+        # Current level and its run (start, end) as last written
+        self._level: str | None = None
+        self._run: tuple[dt.datetime, dt.datetime] | None = None
+
+    async def async_added_to_hass(self):
+        self.async_on_remove(self._coordinator.async_add_listener(self._handle_update))
+        self.async_on_remove(
+            self._coordinator.scheduler.async_subscribe(
+                BOUNDARY_SLOT, self._on_boundary
+            )
+        )
+        # The thresholds attributes are per day
+        self.async_on_remove(
+            self._coordinator.scheduler.async_subscribe(
+                BOUNDARY_MIDNIGHT, self._on_midnight
+            )
+        )
+        self._update_level(fire=False)
+        self.async_write_ha_state()
+
+    def _on_boundary(self, _boundary: dt.datetime) -> None:
+        if self._update_level():
+            self.async_write_ha_state()
+
+    def _on_midnight(self, _boundary: dt.datetime) -> None:
+        self._update_level()
+        self.async_write_ha_state()
+
+    def _handle_update(self) -> None:
+        # Quantile thresholds (attributes) depend on the whole day's prices
+        today = dt_util.as_local(dt_util.now()).date()
+        if self._update_level() or self._coordinator.changed_day(today):
+            self.async_write_ha_state()
+
+    def _update_level(self, fire: bool = True) -> bool:
+        """Look up the current level; True if it or its run changed."""
+        snapshot = self._coordinator.snapshot
+        i = snapshot.index.position(dt_util.now())
+        if i is None:
+            level, run, fe = None, None, None
+        else:
+            levels = snapshot.price_levels(self._config)
+            lo, hi = levels.run(i, snapshot.fused)
+            level = levels.levels[i]
+            run = (snapshot.fused[lo].start, snapshot.fused[hi - 1].end)
+            fe = snapshot.fused[i]
+
+        if level == self._level and run == self._run:
+            return False
+        previous = self._level
+        self._level, self._run = level, run
+        if fire and fe is not None and previous is not None and level != previous:
+            self.hass.bus.async_fire(
+                EVENT_TYPE,
+                {
+                    "type": EVENT_PRICE_LEVEL,
+                    "entry_id": self._entry_id,
+                    "tariff_name": self._tariff_name,
+                    "level": level,
+                    "previous_level": previous,
+                    "start": run[0].isoformat(),
+                    "end": run[1].isoformat(),
+                    "price_chf_per_kwh": fe.price,
+                },
+            )
+        return True
+
+    @property
+    def native_value(self) -> str | None:
+        return self._level
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        snapshot = self._coordinator.snapshot
+        today = dt_util.as_local(dt_util.now()).date()
+        thresholds = snapshot.price_levels(self._config).thresholds.get(today)
+        return {
+            "tariff_name": self._tariff_name,
+            "mode": self._config.mode,
+            "cheap_threshold": round(thresholds[0], 6) if thresholds else None,
+            "expensive_threshold": round(thresholds[1], 6) if thresholds else None,
+            "level_start": self._run[0].isoformat() if self._run else None,
+            "level_end": self._run[1].isoformat() if self._run else None,
+        }
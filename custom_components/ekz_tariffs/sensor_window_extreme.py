@@ -1,4 +1,3 @@
-import contextlib
 import datetime as dt
 from typing import Any
 
@@ -7,13 +6,14 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.event import async_track_point_in_time
 from homeassistant.util import dt as dt_util
 
-from .api import TariffSlot
+from .const import WINDOW_SCOPE_TOMORROW, WINDOW_SCOPE_UPCOMING
 from .coordinator import EkzTariffsCoordinator
-from .statistics import bucket_prices, rolling_window_extreme
-from .utils import next_midnight
+from .scheduler import BOUNDARY_BUCKET, BOUNDARY_MIDNIGHT
+from .snapshot import DaySnapshot
+from .statistics import WindowResult
+from .utils import WindowSpec
 
 
 class EkzWindowExtremeSensor(SensorEntity):
@@ -27,83 +27,92 @@ class EkzWindowExtremeSensor(SensorEntity):
         entry_id: str,
         tariff_name: str,
         coordinator: EkzTariffsCoordinator,
-        day_offset: int,
-        window_minutes: int,
-        mode: str,
-        name: str,
-        unique_suffix: str,
+        spec: WindowSpec,
     ):
         self.hass = hass
         self._entry_id = entry_id
         self._tariff_name = tariff_name
         self._coordinator = coordinator
-        self._day_offset = day_offset
-        self._window_minutes = window_minutes
-        self._mode = mode
-        self._attr_name = name
-        self._attr_unique_id = f"{entry_id}_{unique_suffix}"
-        self._unsub_midnight = None
+        self._spec = spec
+        self._window_minutes = spec.minutes
+        self._mode = spec.mode
+        kind = "lowest" if spec.mode == "min" else "highest"
+        self._attr_name = (
+            f"{kind.capitalize()} {spec.label} window {spec.scope_label}: {tariff_name}"
+        )
+        self._attr_unique_id = f"{entry_id}_{kind}_{spec.label}_{spec.scope}"
 
     async def async_added_to_hass(self):
         self.async_on_remove(self._coordinator.async_add_listener(self._handle_update))
-        self._schedule_midnight_update()
-        self._handle_update()
-
-    def _schedule_midnight_update(self):
-        if self._unsub_midnight:
-            with contextlib.suppress(Exception):
-                self._unsub_midnight()
-            self._unsub_midnight = None
+        # The rolling horizon advances with every 15-min bucket, days at midnight.
+        kind = (
+            BOUNDARY_BUCKET
+            if self._spec.scope == WINDOW_SCOPE_UPCOMING
+            else BOUNDARY_MIDNIGHT
+        )
+        self.async_on_remove(
+            self._coordinator.scheduler.async_subscribe(kind, self._on_boundary)
+        )
+        self.async_write_ha_state()
 
-        when = next_midnight(dt_util.now())
+    def _on_boundary(self, _boundary: dt.datetime) -> None:
+        self.async_write_ha_state()
 
-        async def _on_midnight(_now: dt.datetime):
+    def _handle_update(self):
+        if self._spec.scope == WINDOW_SCOPE_UPCOMING:
+            changed = self._coordinator.changed(dt_util.now())
+        else:
+            changed = self._coordinator.changed_day(self._day().day)
+        if changed:
             self.async_write_ha_state()
-            self._schedule_midnight_update()
 
-        self._unsub_midnight = async_track_point_in_time(self.hass, _on_midnight, when)
+    def _day(self) -> DaySnapshot:
+        offset = 1 if self._spec.scope == WINDOW_SCOPE_TOMORROW else 0
+        return self._coordinator.snapshot.day_offset(dt_util.now(), offset)
 
-    def _handle_update(self):
-        self.async_write_ha_state()
+    def _result(self) -> WindowResult | None:
+        if self._spec.scope == WINDOW_SCOPE_UPCOMING:
+            return self._coordinator.snapshot.rolling.window(
+                dt_util.now(),
+                self._window_minutes,
+                self._mode,
+                self._spec.horizon_minutes,
+            )
+        return self._day().window(self._window_minutes, self._mode)
 
     @property
     def native_value(self) -> float | None:
-        slots: list[TariffSlot] = self._coordinator.data or []
-        day = dt_util.as_local(dt_util.now()).date() + dt.timedelta(
-            days=self._day_offset
-        )
-
-        prices, day_start = bucket_prices(slots, day)
-        res = rolling_window_extreme(
-            prices, day_start, self._window_minutes, self._mode
-        )
+        res = self._result()
         if res is None:
             return None
         return round(res.avg, 6)
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
-        slots: list[TariffSlot] = self._coordinator.data or []
-        day = dt_util.as_local(dt_util.now()).date() + dt.timedelta(
-            days=self._day_offset
-        )
-
-        prices, day_start = bucket_prices(slots, day)
-        res = rolling_window_extreme(
-            prices, day_start, self._window_minutes, self._mode
-        )
+        res = self._result()
 
         attrs: dict[str, Any] = {
             "tariff_name": self._tariff_name,
-            "date": day.isoformat(),
             "window_minutes": self._window_minutes,
             "mode": self._mode,
-            "missing_buckets": prices.count(None),
         }
+        if self._spec.scope == WINDOW_SCOPE_UPCOMING:
+            rolling = self._coordinator.snapshot.rolling
+            now = dt_util.now()
+            lo, hi = rolling.span(now, self._spec.horizon_minutes)
+            attrs["missing_buckets"] = rolling.missing_buckets(
+                now, self._spec.horizon_minutes
+            )
+            attrs["horizon_start"] = rolling.at(lo).isoformat() if hi > lo else None
+            attrs["horizon_end"] = rolling.at(hi).isoformat() if hi > lo else None
+        else:
+            day = self._day()
+            attrs["missing_buckets"] = day.missing_buckets
+            attrs["date"] = day.day.isoformat()
 
         if res is not None:
-            attrs["window_start"] = res.start.isoformat()
-            attrs["window_end"] = res.end.isoformat()
+            attrs["window_start"] = res.start_iso
+            attrs["window_end"] = res.end_iso
         else:
             attrs["window_start"] = None
             attrs["window_end"] = None
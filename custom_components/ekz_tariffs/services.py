@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import datetime as dt
+from typing import Any
+
+import voluptuous as vol
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    SERVICE_CHEAPEST_SLOTS,
+    SERVICE_PLAN_LOAD,
+    SERVICE_REFRESH,
+)
+from .coordinator import EkzTariffsCoordinator
+from .fetch import async_get_fetch_manager
+from .statistics import BUCKET_SECONDS, bucket_prices_range, cheapest_slots
+
+ATTR_ENTRY_ID = "entry_id"
+ATTR_COUNT = "count"
+ATTR_START = "start"
+ATTR_END = "end"
+ATTR_POWER_PROFILE = "power_profile"
+ATTR_EARLIEST_START = "earliest_start"
+ATTR_DEADLINE = "deadline"
+
+REFRESH_SCHEMA = vol.Schema({vol.Optional(ATTR_ENTRY_ID): cv.string})
+
+CHEAPEST_SLOTS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTRY_ID): cv.string,
+        vol.Required(ATTR_COUNT): vol.All(vol.Coerce(int), vol.Range(min=1)),
+        vol.Optional(ATTR_START): cv.datetime,
+        vol.Optional(ATTR_END): cv.datetime,
+    }
+)
+
+PLAN_LOAD_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTRY_ID): cv.string,
+        vol.Required(ATTR_POWER_PROFILE): vol.All(
+            cv.ensure_list, vol.Length(min=1), [vol.Coerce(float)]
+        ),
+        vol.Optional(ATTR_EARLIEST_START): cv.datetime,
+        vol.Optional(ATTR_DEADLINE): cv.datetime,
+    }
+)
+
+
+def _get_entry_data(hass: HomeAssistant, call: ServiceCall) -> dict[str, Any]:
+    entries: dict[str, dict[str, Any]] = hass.data.get(DOMAIN, {})
+    entry_id = call.data.get(ATTR_ENTRY_ID)
+    if entry_id is not None:
+        if entry_id not in entries:
+            raise HomeAssistantError(f"Unknown EKZ Tariffs entry: {entry_id}")
+        return entries[entry_id]
+    if len(entries) != 1:
+        raise HomeAssistantError(
+            "entry_id is required unless exactly one EKZ Tariffs entry is configured"
+        )
+    return next(iter(entries.values()))
+
+
+def _align(value: dt.datetime, *, up: bool) -> dt.datetime:
+    """Round to the 15-min bucket grid (down, or up for earliest starts)."""
+    ts = int(dt_util.as_local(value).timestamp())
+    rem = ts % BUCKET_SECONDS
+    if rem:
+        ts += BUCKET_SECONDS - rem if up else -rem
+    return dt_util.as_local(dt_util.utc_from_timestamp(ts))
+
+
+def _call_range(
+    coordinator: EkzTariffsCoordinator,
+    start: dt.datetime | None,
+    end: dt.datetime | None,
+    *,
+    start_up: bool,
+) -> tuple[dt.datetime, dt.datetime]:
+    """[start, end) on the bucket grid; defaults to now .. end of known prices."""
+    start = _align(start or dt_util.now(), up=start_up)
+    if end is None:
+        slots = coordinator.snapshot.slots
+        end = dt_util.utc_from_timestamp(slots.ends[-1]) if len(slots) else start
+    end = _align(end, up=False)
+    return start, max(start, end)
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register domain services (once, shared by all entries)."""
+    if hass.services.has_service(DOMAIN, SERVICE_CHEAPEST_SLOTS):
+        return
+
+    async def _handle_refresh(call: ServiceCall) -> None:
+        entries: dict[str, dict[str, Any]] = hass.data.get(DOMAIN, {})
+        if ATTR_ENTRY_ID in call.data:
+            selected = [_get_entry_data(hass, call)]
+        else:
+            selected = list(entries.values())
+        # A manual refresh re-downloads the whole window to pick up revisions.
+        await async_get_fetch_manager(hass).async_refresh(
+            (data["coordinator"] for data in selected), refetch=True
+        )
+
+    async def _handle_cheapest_slots(call: ServiceCall) -> ServiceResponse:
+        data = _get_entry_data(hass, call)
+        coordinator: EkzTariffsCoordinator = data["coordinator"]
+        start, end = _call_range(
+            coordinator,
+            call.data.get(ATTR_START),
+            call.data.get(ATTR_END),
+            start_up=False,
+        )
+        count = call.data[ATTR_COUNT]
+
+        prices = bucket_prices_range(coordinator.snapshot.slots, start, end)
+        runs = cheapest_slots(prices, start, count)
+        selected = sum(round((r.end - r.start).total_seconds()) for r in runs)
+        weighted = sum(r.avg * (r.end - r.start).total_seconds() for r in runs)
+
+        return {
+            "tariff_name": data["tariff_name"],
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "count": selected // BUCKET_SECONDS,
+            "average_price": round(weighted / selected, 6) if selected else None,
+            "slots": [
+                {
+                    "start": r.start.isoformat(),
+                    "end": r.end.isoformat(),
+                    "value": round(r.avg, 6),
+                }
+                for r in runs
+            ],
+        }
+
+    async def _handle_plan_load(call: ServiceCall) -> ServiceResponse:
+        data = _get_entry_data(hass, call)
+        coordinator: EkzTariffsCoordinator = data["coordinator"]
+        start, end = _call_range(
+            coordinator,
+            call.data.get(ATTR_EARLIEST_START),
+            call.data.get(ATTR_DEADLINE),
+            start_up=True,
+        )
+        profile = tuple(call.data[ATTR_POWER_PROFILE])
+
+        plan = coordinator.snapshot.plan_load(start, end, profile)
+        response: dict[str, Any] = {
+            "tariff_name": data["tariff_name"],
+            "earliest_start": start.isoformat(),
+            "deadline": end.isoformat(),
+            "start": None,
+            "end": None,
+            "cost_chf": None,
+            "energy_kwh": round(sum(profile) * BUCKET_SECONDS / 3600, 6),
+            "average_price": None,
+        }
+        if plan is not None:
+            response.update(
+                {
+                    "start": plan.start.isoformat(),
+                    "end": plan.end.isoformat(),
+                    "cost_chf": round(plan.cost_chf, 6),
+                    "average_price": round(plan.cost_chf / plan.energy_kwh, 6)
+                    if plan.energy_kwh
+                    else None,
+                }
+            )
+        return response
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_REFRESH,
+        _handle_refresh,
+        schema=REFRESH_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_CHEAPEST_SLOTS,
+        _handle_cheapest_slots,
+        schema=CHEAPEST_SLOTS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PLAN_LOAD,
+        _handle_plan_load,
+        schema=PLAN_LOAD_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
@@ -0,0 +1,382 @@
+from __future__ import annotations
+
+import datetime as dt
+from collections.abc import Callable, Hashable, Iterable
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Any, TypeVar
+
+from homeassistant.util import dt as dt_util
+
+from .api import TariffSeries, TariffSlot, from_epoch
+from .const import LEVEL_MODE_QUANTILE
+from .diff import SeriesDiff
+from .statistics import (
+    BUCKET_MINUTES,
+    BUCKET_SECONDS,
+    DailyStats,
+    LoadPlan,
+    SlidingWindowExtreme,
+    WindowExtremes,
+    WindowResult,
+    bucket_prices,
+    bucket_prices_range,
+    cheapest_bucket_indices,
+    cheapest_slots,
+    daily_quantiles,
+    daily_stats,
+    plan_load,
+    price_levels,
+    window_extremes,
+    window_sums,
+)
+from .utils import FusedEvent, LevelConfig, SlotIndex, fuse_slots
+
+# Bound for the per-snapshot plan_load() cache (one entry per distinct call).
+_MAX_CACHED_PLANS = 64
+
+_T = TypeVar("_T")
+
+
+@dataclass(frozen=True, kw_only=True)
+class BucketSnapshot:
+    """15-min bucket prices from start, with batched window extremes."""
+
+    start: dt.datetime
+    prices: list[float | None]
+    window_minutes: tuple[int, ...] = ()
+    _extremes: dict[int, WindowExtremes] = field(
+        default_factory=dict, repr=False, compare=False
+    )
+    _cheapest: dict[int, tuple[frozenset[int], list[WindowResult]]] = field(
+        default_factory=dict, repr=False, compare=False
+    )
+
+    @property
+    def missing_buckets(self) -> int:
+        return self.prices.count(None)
+
+    def window(self, window_minutes: int, mode: str) -> WindowResult | None:
+        if window_minutes not in self._extremes:
+            # One batch pass for all configured lengths (plus the requested one).
+            self._extremes.update(
+                window_extremes(
+                    self.prices,
+                    self.start,
+                    {*self.window_minutes, window_minutes} - self._extremes.keys(),
+                )
+            )
+        ext = self._extremes[window_minutes]
+        return ext.min if mode == "min" else ext.max
+
+    def _cheapest_selection(
+        self, count: int
+    ) -> tuple[frozenset[int], list[WindowResult]]:
+        sel = self._cheapest.get(count)
+        if sel is None:
+            sel = (
+                frozenset(cheapest_bucket_indices(self.prices, count)),
+                cheapest_slots(self.prices, self.start, count),
+            )
+            self._cheapest[count] = sel
+        return sel
+
+    def cheapest(self, count: int) -> list[WindowResult]:
+        """The `count` cheapest buckets as contiguous runs."""
+        return self._cheapest_selection(count)[1]
+
+    def is_cheapest(self, now: dt.datetime, count: int) -> bool:
+        """Whether the bucket containing now is among the `count` cheapest."""
+        offset = int(now.timestamp()) - int(self.start.timestamp())
+        if offset < 0:
+            return False
+        return offset // BUCKET_SECONDS in self._cheapest_selection(count)[0]
+
+
+@dataclass(frozen=True, kw_only=True)
+class DaySnapshot(BucketSnapshot):
+    """Per-day view: 15-min bucket prices, daily stats and window extremes."""
+
+    day: dt.date
+    stats: DailyStats
+
+
+@dataclass(frozen=True, kw_only=True)
+class RollingHorizon:
+    """
+    15-min buckets over all known prices, queried as a horizon that starts
+    at the current bucket and spans N minutes (or to the end of the data).
+
+    Prefix sums make the horizon average O(1); window extremes use one
+    sliding tracker per (length, mode, horizon) that only advances by the
+    buckets that passed since the previous query.
+    """
+
+    start_ts: int
+    prices: list[float | None]
+    _csum: list[float] = field(default_factory=list, repr=False, compare=False)
+    _cmiss: list[int] = field(default_factory=list, repr=False, compare=False)
+    _trackers: dict[tuple[int, str, int], SlidingWindowExtreme] = field(
+        default_factory=dict, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        total, missing = 0.0, 0
+        self._csum.append(total)
+        self._cmiss.append(missing)
+        for p in self.prices:
+            if p is None:
+                missing += 1
+            else:
+                total += p
+            self._csum.append(total)
+            self._cmiss.append(missing)
+
+    def span(self, now: dt.datetime, horizon_minutes: int = 0) -> tuple[int, int]:
+        """Bucket indices [lo, hi) of the horizon; 0 minutes means to the end."""
+        lo = (int(now.timestamp()) - self.start_ts) // BUCKET_SECONDS
+        hi = len(self.prices)
+        if horizon_minutes > 0:
+            hi = min(hi, lo + horizon_minutes // BUCKET_MINUTES)
+        lo = min(max(lo, 0), len(self.prices))
+        return lo, max(lo, hi)
+
+    def at(self, index: int) -> dt.datetime:
+        return from_epoch(self.start_ts + index * BUCKET_SECONDS)
+
+    def missing_buckets(self, now: dt.datetime, horizon_minutes: int = 0) -> int:
+        lo, hi = self.span(now, horizon_minutes)
+        return self._cmiss[hi] - self._cmiss[lo]
+
+    def average(self, now: dt.datetime, horizon_minutes: int = 0) -> float | None:
+        lo, hi = self.span(now, horizon_minutes)
+        covered = (hi - lo) - (self._cmiss[hi] - self._cmiss[lo])
+        if covered <= 0:
+            return None
+        return (self._csum[hi] - self._csum[lo]) / covered
+
+    def window(
+        self,
+        now: dt.datetime,
+        window_minutes: int,
+        mode: str,
+        horizon_minutes: int = 0,
+    ) -> WindowResult | None:
+        k = window_minutes // BUCKET_MINUTES
+        key = (k, mode, horizon_minutes)
+        tracker = self._trackers.get(key)
+        if tracker is None:
+            tracker = SlidingWindowExtreme(window_sums(self.prices, k), mode)
+            self._trackers[key] = tracker
+        lo, hi = self.span(now, horizon_minutes)
+        best = tracker.query(lo, hi - k + 1)
+        if best is None:
+            return None
+        idx, total = best
+        start = self.at(idx)
+        return WindowResult(start=start, end=self.at(idx + k), avg=total / k)
+
+
+@dataclass(frozen=True)
+class PriceLevels:
+    """Level of every fused event, with the thresholds per local day."""
+
+    levels: list[str]
+    thresholds: dict[dt.date, tuple[float, float]]
+
+    def run(self, idx: int, fused: list[FusedEvent]) -> tuple[int, int]:
+        """Index range [lo, hi) of the uninterrupted same-level run around idx."""
+        level = self.levels[idx]
+        lo = idx
+        while (
+            lo > 0
+            and self.levels[lo - 1] == level
+            and fused[lo - 1].end == fused[lo].start
+        ):
+            lo -= 1
+        hi = idx + 1
+        while (
+            hi < len(fused)
+            and self.levels[hi] == level
+            and fused[hi].start == fused[hi - 1].end
+        ):
+            hi += 1
+        return lo, hi
+
+
+@dataclass(frozen=True)
+class TariffSnapshot:
+    """
+    Immutable view of one coordinator refresh.
+
+    Everything derived from the slot list (fused events, per-day buckets,
+    stats and window extremes) is computed at most once per snapshot, so
+    entities only do lookups when writing state.
+    """
+
+    slots: TariffSeries
+    fused: list[FusedEvent]
+    index: SlotIndex
+    events_by_day: dict[dt.date, list[FusedEvent]]
+    window_minutes: tuple[int, ...] = ()
+    _days: dict[dt.date, DaySnapshot] = field(
+        default_factory=dict, repr=False, compare=False
+    )
+    _plans: dict[tuple[int, int, tuple[float, ...]], LoadPlan | None] = field(
+        default_factory=dict, repr=False, compare=False
+    )
+    _day_attributes: dict[dt.date, list[dict[str, Any]]] = field(
+        default_factory=dict, repr=False, compare=False
+    )
+    _levels: dict[LevelConfig, PriceLevels] = field(
+        default_factory=dict, repr=False, compare=False
+    )
+    _rendered: dict[Hashable, Any] = field(
+        default_factory=dict, repr=False, compare=False
+    )
+
+    @classmethod
+    def build(
+        cls,
+        slots: Iterable[TariffSlot],
+        window_minutes: Iterable[int] = (),
+        *,
+        previous: TariffSnapshot | None = None,
+        diff: SeriesDiff | None = None,
+    ) -> TariffSnapshot:
+        """
+        Build the view for a slot list.
+
+        With the previous snapshot and the diff leading to this data, the
+        per-day views of days the diff does not touch are carried over.
+        """
+        series = TariffSeries.from_slots(slots)
+        fused = fuse_slots(series)
+        by_day: dict[dt.date, list[FusedEvent]] = {}
+        for fe in fused:
+            by_day.setdefault(dt_util.as_local(fe.start).date(), []).append(fe)
+        minutes = tuple(sorted(set(window_minutes)))
+
+        days: dict[dt.date, DaySnapshot] = {}
+        if (
+            previous is not None
+            and diff is not None
+            and previous.window_minutes == minutes
+        ):
+            days = {
+                day: snap
+                for day, snap in previous._days.items()
+                if day not in diff.days
+            }
+
+        return cls(
+            slots=series,
+            fused=fused,
+            index=SlotIndex(fused),
+            events_by_day=by_day,
+            window_minutes=minutes,
+            _days=days,
+        )
+
+    def current(self, now: dt.datetime) -> FusedEvent | None:
+        i = self.index.position(now)
+        return self.fused[i] if i is not None else None
+
+    def next_boundary(self, now: dt.datetime) -> dt.datetime | None:
+        return self.index.next_boundary(now)
+
+    def events_for_day(self, day: dt.date) -> list[FusedEvent]:
+        return self.events_by_day.get(day, [])
+
+    def day_attributes(self, day: dt.date) -> list[dict[str, Any]]:
+        """A day's events as [{start, end, value}] attribute list (built once)."""
+        attrs = self._day_attributes.get(day)
+        if attrs is None:
+            attrs = [fe.attributes for fe in self.events_for_day(day)]
+            self._day_attributes[day] = attrs
+        return attrs
+
+    def price_levels(self, config: LevelConfig) -> PriceLevels:
+        """Levels of all fused events, computed once per data version."""
+        levels = self._levels.get(config)
+        if levels is None:
+            thresholds: dict[dt.date, tuple[float, float]] = {}
+            prices: list[float] = []
+            cheap: list[float] = []
+            expensive: list[float] = []
+            # events_by_day is filled in fused order
+            for day, events in self.events_by_day.items():
+                if config.mode == LEVEL_MODE_QUANTILE:
+                    q_lo, q_hi = daily_quantiles(
+                        self.slots, day, (config.cheap / 100, config.expensive / 100)
+                    )
+                    # A day with fused events always has slot prices
+                    if q_lo is None or q_hi is None:
+                        raise ValueError(f"No prices on {day}")
+                    lo, hi = q_lo, q_hi
+                else:
+                    lo, hi = config.cheap, config.expensive
+                thresholds[day] = (lo, hi)
+                for fe in events:
+                    prices.append(fe.price)
+                    cheap.append(lo)
+                    expensive.append(hi)
+            levels = PriceLevels(
+                levels=price_levels(prices, cheap, expensive, config.hysteresis),
+                thresholds=thresholds,
+            )
+            self._levels[config] = levels
+        return levels
+
+    def rendered(self, key: Hashable, build: Callable[[], _T]) -> _T:
+        """
+        Entity payloads derived from this data version (e.g. calendar events).
+
+        build() runs once per key and snapshot and all entities of the entry
+        share the result; only fill in lazily built parts, never replace them.
+        """
+        if key not in self._rendered:
+            self._rendered[key] = build()
+        return self._rendered[key]
+
+    def day(self, day: dt.date) -> DaySnapshot:
+        snap = self._days.get(day)
+        if snap is None:
+            prices, day_start = bucket_prices(self.slots, day)
+            snap = DaySnapshot(
+                day=day,
+                start=day_start,
+                prices=prices,
+                stats=daily_stats(self.slots, day),
+                window_minutes=self.window_minutes,
+            )
+            self._days[day] = snap
+        return snap
+
+    def day_offset(self, now: dt.datetime, offset: int) -> DaySnapshot:
+        return self.day(dt_util.as_local(now).date() + dt.timedelta(days=offset))
+
+    @cached_property
+    def rolling(self) -> RollingHorizon:
+        """Bucket grid from the first to the last known slot (built once)."""
+        if not len(self.slots):
+            return RollingHorizon(start_ts=0, prices=[])
+        start = self.slots.starts[0] - self.slots.starts[0] % BUCKET_SECONDS
+        return RollingHorizon(
+            start_ts=start,
+            prices=bucket_prices_range(
+                self.slots, from_epoch(start), from_epoch(self.slots.ends[-1])
+            ),
+        )
+
+    def plan_load(
+        self, start: dt.datetime, end: dt.datetime, profile_kw: tuple[float, ...]
+    ) -> LoadPlan | None:
+        """Cheapest start in [start, end) for a load profile, cached per data version."""
+        key = (int(start.timestamp()), int(end.timestamp()), profile_kw)
+        if key not in self._plans:
+            if len(self._plans) >= _MAX_CACHED_PLANS:
+                self._plans.clear()
+            prices = bucket_prices_range(self.slots, start, end)
+            self._plans[key] = plan_load(prices, start, profile_kw)
+        return self._plans[key]
@@ -1,14 +1,29 @@
 from __future__ import annotations
 
 import datetime as dt
+import heapq
+from collections import deque
+from collections.abc import Iterable, Sequence
 from dataclasses import dataclass
+from functools import cached_property
 from typing import TypedDict
 
 from homeassistant.util import dt as dt_util
 
-from .api import TariffSlot
+from .api import TariffSeries, TariffSlot, from_epoch
+from .const import LEVEL_CHEAP, LEVEL_EXPENSIVE, LEVEL_NORMAL
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy ships with Home Assistant
+    np = None
 
 BUCKET_MINUTES = 15
+BUCKET_SECONDS = BUCKET_MINUTES * 60
+HOUR_SECONDS = 3600
+
+# "numpy" when available, else the pure-Python reference implementation.
+ENGINE = "numpy" if np is not None else "python"
 
 
 class DailyStats(TypedDict):
@@ -30,86 +45,200 @@ def _day_range_local(day: dt.date) -> tuple[dt.datetime, dt.datetime]:
     return start, end
 
 
-def daily_stats(slots: list[TariffSlot], day: dt.date) -> DailyStats:
-    """Time-weighted average + min/max for a local day, based on overlap with that day."""
+def _day_range_epoch(day: dt.date) -> tuple[int, int]:
     start, end = _day_range_local(day)
+    return int(start.timestamp()), int(end.timestamp())
+
+
+def _offset(start: dt.datetime, minutes: int) -> dt.datetime:
+    """Absolute offset (DST-safe, unlike aware datetime + timedelta)."""
+    return from_epoch(int(start.timestamp()) + minutes * 60)
 
+
+def daily_stats(slots: Iterable[TariffSlot], day: dt.date) -> DailyStats:
+    """Time-weighted average + min/max for a local day, based on overlap with that day."""
+    series = TariffSeries.from_slots(slots)
+    start, end = _day_range_epoch(day)
+    if ENGINE == "numpy":
+        return _daily_stats_numpy(series, start, end)
+    return _daily_stats_python(series, start, end)
+
+
+def _daily_stats_python(series: TariffSeries, start: int, end: int) -> DailyStats:
     total_weighted = 0.0
-    total_seconds = 0.0
+    total_seconds = 0
 
-    min_p: float | None = None
-    max_p: float | None = None
-    slots_count = 0
+    vals: list[float] = []
 
-    for s in slots:
-        a = max(s.start, start)
-        b = min(s.end, end)
+    lo, hi = series.overlapping(start, end)
+    for i in range(lo, hi):
+        a = max(series.starts[i], start)
+        b = min(series.ends[i], end)
 
         if b <= a:
             continue
 
-        seconds = (b - a).total_seconds()
+        seconds = b - a
+        p = series.prices[i]
         total_seconds += seconds
-        total_weighted += s.price_chf_per_kwh * seconds
-
-        p = float(s.price_chf_per_kwh)
-        min_p = p if min_p is None else min(min_p, p)
-        max_p = p if max_p is None else max(max_p, p)
-
-        slots_count += 1
+        total_weighted += p * seconds
+        vals.append(p)
 
     avg = (total_weighted / total_seconds) if total_seconds > 0 else None
     covered_minutes = round(total_seconds / 60.0)
 
-    vals = [s.price_chf_per_kwh for s in slots if s.price_chf_per_kwh is not None]
     vals.sort()
 
     return {
         "avg": avg,
-        "min": min_p,
-        "max": max_p,
+        "min": vals[0] if vals else None,
+        "max": vals[-1] if vals else None,
         "median": _median(vals),
         "q25": _quantile(vals, q=0.25),
         "q75": _quantile(vals, q=0.75),
-        "slots_count": slots_count,
+        "slots_count": len(vals),
         "covered_minutes": covered_minutes,
     }
 
 
+def _daily_stats_numpy(series: TariffSeries, start: int, end: int) -> DailyStats:
+    lo, hi = series.overlapping(start, end)
+    starts = np.frombuffer(series.starts, dtype=np.int64)[lo:hi]
+    ends = np.frombuffer(series.ends, dtype=np.int64)[lo:hi]
+    prices = np.frombuffer(series.prices, dtype=np.float64)[lo:hi]
+
+    seconds = np.minimum(ends, end) - np.maximum(starts, start)
+    mask = seconds > 0
+    seconds = seconds[mask]
+    vals = prices[mask]
+
+    total_seconds = int(seconds.sum())
+    if not total_seconds:
+        return {
+            "avg": None,
+            "min": None,
+            "max": None,
+            "median": None,
+            "q25": None,
+            "q75": None,
+            "slots_count": 0,
+            "covered_minutes": 0,
+        }
+
+    # np.quantile's default "linear" method matches _quantile().
+    q25, median, q75 = np.quantile(vals, (0.25, 0.5, 0.75)).tolist()
+    return {
+        "avg": float(np.dot(vals, seconds) / total_seconds),
+        "min": float(vals.min()),
+        "max": float(vals.max()),
+        "median": median,
+        "q25": q25,
+        "q75": q75,
+        "slots_count": int(vals.size),
+        "covered_minutes": round(total_seconds / 60.0),
+    }
+
+
 @dataclass
 class WindowResult:
     start: dt.datetime
     end: dt.datetime
     avg: float
 
+    @cached_property
+    def start_iso(self) -> str:
+        return self.start.isoformat()
+
+    @cached_property
+    def end_iso(self) -> str:
+        return self.end.isoformat()
+
+
+@dataclass
+class LoadPlan:
+    start: dt.datetime
+    end: dt.datetime
+    cost_chf: float
+    energy_kwh: float
+
+
+@dataclass
+class HourlyStats:
+    start_ts: int
+    mean: float
+    min: float
+    max: float
+
+
+@dataclass
+class WindowExtremes:
+    min: WindowResult | None
+    max: WindowResult | None
+
 
 def bucket_prices(
-    slots: list[TariffSlot], day: dt.date
+    slots: Iterable[TariffSlot], day: dt.date
 ) -> tuple[list[float | None], dt.datetime]:
-    day_start, day_end = _day_range_local(day)
-    slots_sorted = sorted(slots, key=lambda s: s.start)
+    series = TariffSeries.from_slots(slots)
+    day_start, _ = _day_range_local(day)
+    start_ts, end_ts = _day_range_epoch(day)
+    if ENGINE == "numpy":
+        return _bucket_prices_numpy(series, start_ts, end_ts), day_start
+    return _bucket_prices_python(series, start_ts, end_ts), day_start
+
+
+def bucket_prices_range(
+    slots: Iterable[TariffSlot], start: dt.datetime, end: dt.datetime
+) -> list[float | None]:
+    """15-min bucket prices for an arbitrary [start, end) range."""
+    series = TariffSeries.from_slots(slots)
+    start_ts, end_ts = int(start.timestamp()), int(end.timestamp())
+    if ENGINE == "numpy":
+        return _bucket_prices_numpy(series, start_ts, end_ts)
+    return _bucket_prices_python(series, start_ts, end_ts)
+
+
+def _bucket_prices_python(
+    series: TariffSeries, start_ts: int, end_ts: int
+) -> list[float | None]:
+    starts, ends, values = series.starts, series.ends, series.prices
 
     prices: list[float | None] = []
-    t = day_start
 
-    i = 0
-    n = len(slots_sorted)
+    i, _ = series.overlapping(start_ts, end_ts)
+    n = len(series)
 
-    step = dt.timedelta(minutes=BUCKET_MINUTES)
-    while t < day_end:
-        while i < n and slots_sorted[i].end <= t:
+    for t in range(start_ts, end_ts, BUCKET_SECONDS):
+        while i < n and ends[i] <= t:
             i += 1
 
         price: float | None = None
-        if i < n:
-            s = slots_sorted[i]
-            if s.start <= t < s.end:
-                price = float(s.price_chf_per_kwh)
+        if i < n and starts[i] <= t < ends[i]:
+            price = values[i]
 
         prices.append(price)
-        t += step
 
-    return prices, day_start
+    return prices
+
+
+def _bucket_prices_numpy(
+    series: TariffSeries, start_ts: int, end_ts: int
+) -> list[float | None]:
+    t = np.arange(start_ts, end_ts, BUCKET_SECONDS, dtype=np.int64)
+    if not len(series):
+        return [None] * t.size
+
+    starts = np.frombuffer(series.starts, dtype=np.int64)
+    ends = np.frombuffer(series.ends, dtype=np.int64)
+    values = np.frombuffer(series.prices, dtype=np.float64)
+
+    idx = np.searchsorted(starts, t, side="right") - 1
+    safe = np.maximum(idx, 0)
+    valid = (idx >= 0) & (t < ends[safe])
+    return [
+        p if ok else None
+        for p, ok in zip(values[safe].tolist(), valid.tolist(), strict=True)
+    ]
 
 
 def _quantile(sorted_vals: list[float], q: float) -> float | None:
@@ -136,6 +265,48 @@ def _median(sorted_vals: list[float]) -> float | None:
     return _quantile(sorted_vals, q=0.5)
 
 
+def daily_quantiles(
+    slots: Iterable[TariffSlot], day: dt.date, qs: Iterable[float]
+) -> list[float | None]:
+    """Quantiles (q in [0,1]) of the slot prices overlapping a local day."""
+    series = TariffSeries.from_slots(slots)
+    lo, hi = series.overlapping(*_day_range_epoch(day))
+    vals = sorted(series.prices[lo:hi])
+    return [_quantile(vals, q) for q in qs]
+
+
+def price_levels(
+    prices: Sequence[float],
+    cheap: Sequence[float],
+    expensive: Sequence[float],
+    hysteresis: float,
+    previous: str | None = None,
+) -> list[str]:
+    """
+    Level of each price in a chronological sequence, with hysteresis.
+
+    A price is cheap at or below its cheap threshold and expensive at or
+    above its expensive threshold (thresholds are per price, e.g. per day).
+    Once cheap, it stays cheap until the price rises above the threshold
+    plus hysteresis (expensive: below the threshold minus hysteresis), so
+    small moves around a threshold do not flip the level back and forth.
+    """
+    levels: list[str] = []
+    level = previous
+    for price, lo, hi in zip(prices, cheap, expensive, strict=True):
+        if price >= hi:
+            level = LEVEL_EXPENSIVE
+        elif price <= lo:
+            level = LEVEL_CHEAP
+        elif not (
+            (level == LEVEL_CHEAP and price < lo + hysteresis)
+            or (level == LEVEL_EXPENSIVE and price > hi - hysteresis)
+        ):
+            level = LEVEL_NORMAL
+        levels.append(level)
+    return levels
+
+
 def rolling_window_extreme(
     prices: list[float | None], day_start: dt.datetime, window_minutes: int, mode: str
 ) -> WindowResult | None:
@@ -143,59 +314,313 @@ def rolling_window_extreme(
     Find lowest/highest continuous window based on bucket averages.
     Requires all buckets in the window are non-None.
     """
-    if window_minutes % BUCKET_MINUTES != 0:
-        raise ValueError("window_minutes must be a multiple of 15")
+    extremes = window_extremes(prices, day_start, (window_minutes,))[window_minutes]
+    return extremes.min if mode == "min" else extremes.max
 
-    k = window_minutes // BUCKET_MINUTES
-    if k <= 0 or len(prices) < k:
+
+def window_extremes(
+    prices: list[float | None],
+    day_start: dt.datetime,
+    windows_minutes: Iterable[int],
+) -> dict[int, WindowExtremes]:
+    """
+    Lowest and highest continuous window for several window lengths at once.
+
+    Prefix sums over the bucket array are built once and shared by all
+    window lengths, so each additional length is a single O(n) scan.
+    Requires all buckets in a window are non-None.
+    """
+    lengths = sorted(set(windows_minutes))
+    for minutes in lengths:
+        if minutes % BUCKET_MINUTES != 0:
+            raise ValueError("window_minutes must be a multiple of 15")
+
+    if ENGINE == "numpy":
+        csum, cmiss = _prefix_sums_numpy(prices)
+        scan = _scan_numpy
+    else:
+        csum, cmiss = _prefix_sums_python(prices)
+        scan = _scan_python
+
+    out: dict[int, WindowExtremes] = {}
+    for minutes in lengths:
+        k = minutes // BUCKET_MINUTES
+        if k <= 0 or len(prices) < k:
+            out[minutes] = WindowExtremes(min=None, max=None)
+            continue
+        best = scan(csum, cmiss, k)
+        if best is None:
+            out[minutes] = WindowExtremes(min=None, max=None)
+            continue
+        (lo_idx, lo_sum), (hi_idx, hi_sum) = best
+        out[minutes] = WindowExtremes(
+            min=_window_result(day_start, lo_idx, minutes, lo_sum / k),
+            max=_window_result(day_start, hi_idx, minutes, hi_sum / k),
+        )
+    return out
+
+
+def _window_result(
+    day_start: dt.datetime, idx: int, window_minutes: int, avg: float
+) -> WindowResult:
+    start = _offset(day_start, idx * BUCKET_MINUTES)
+    return WindowResult(start=start, end=_offset(start, window_minutes), avg=avg)
+
+
+def _prefix_sums_python(
+    prices: list[float | None],
+) -> tuple[list[float], list[int]]:
+    """Cumulative price sums and cumulative missing-bucket counts, 0-prefixed."""
+    csum = [0.0]
+    cmiss = [0]
+    for p in prices:
+        if p is None:
+            csum.append(csum[-1])
+            cmiss.append(cmiss[-1] + 1)
+        else:
+            csum.append(csum[-1] + p)
+            cmiss.append(cmiss[-1])
+    return csum, cmiss
+
+
+def _scan_python(
+    csum: list[float], cmiss: list[int], k: int
+) -> tuple[tuple[int, float], tuple[int, float]] | None:
+    """First (index, sum) of the lowest and the highest complete window."""
+    lo: tuple[int, float] | None = None
+    hi: tuple[int, float] | None = None
+    for i in range(len(csum) - k):
+        if cmiss[i + k] != cmiss[i]:
+            continue
+        total = csum[i + k] - csum[i]
+        if lo is None or total < lo[1]:
+            lo = (i, total)
+        if hi is None or total > hi[1]:
+            hi = (i, total)
+    if lo is None or hi is None:
         return None
+    return lo, hi
 
-    best_idx: int | None = None
-    best_avg: float | None = None
 
-    # sliding sum for speed, but must handle None
-    window_sum = 0.0
-    none_count = 0
+def _prefix_sums_numpy(prices: list[float | None]) -> tuple[np.ndarray, np.ndarray]:
+    """Cumulative price sums and cumulative missing-bucket counts, 0-prefixed."""
+    arr = np.array([np.nan if p is None else p for p in prices], dtype=np.float64)
+    missing = np.isnan(arr)
+    csum = np.concatenate(([0.0], np.cumsum(np.where(missing, 0.0, arr))))
+    cmiss = np.concatenate(([0], np.cumsum(missing)))
+    return csum, cmiss
 
-    # init first window
-    for j in range(k):
-        v = prices[j]
-        if v is None:
-            none_count += 1
-        else:
-            window_sum += v
 
-    def better(a: float, b: float) -> bool:
-        return a < b if mode == "min" else a > b
+def _scan_numpy(
+    csum: np.ndarray, cmiss: np.ndarray, k: int
+) -> tuple[tuple[int, float], tuple[int, float]] | None:
+    """First (index, sum) of the lowest and the highest complete window."""
+    sums = csum[k:] - csum[:-k]
+    complete = (cmiss[k:] - cmiss[:-k]) == 0
+    if not complete.any():
+        return None
+    lo = int(np.where(complete, sums, np.inf).argmin())
+    hi = int(np.where(complete, sums, -np.inf).argmax())
+    return (lo, float(sums[lo])), (hi, float(sums[hi]))
 
-    if none_count == 0:
-        best_idx = 0
-        best_avg = window_sum / k
 
-    # slide
-    for i in range(1, len(prices) - k + 1):
-        out_v = prices[i - 1]
-        in_v = prices[i + k - 1]
+def window_sums(prices: list[float | None], k: int) -> list[float | None]:
+    """Sum of every k-bucket window by start index (None if incomplete)."""
+    if k <= 0 or len(prices) < k:
+        return []
+    if ENGINE == "numpy":
+        csum, cmiss = _prefix_sums_numpy(prices)
+        sums = (csum[k:] - csum[:-k]).tolist()
+        complete = ((cmiss[k:] - cmiss[:-k]) == 0).tolist()
+        return [v if ok else None for v, ok in zip(sums, complete, strict=True)]
+    csum, cmiss = _prefix_sums_python(prices)
+    return [
+        csum[i + k] - csum[i] if cmiss[i + k] == cmiss[i] else None
+        for i in range(len(prices) - k + 1)
+    ]
+
+
+class SlidingWindowExtreme:
+    """
+    Lowest or highest window sum over a moving range of start indices.
 
-        if out_v is None:
-            none_count -= 1
-        else:
-            window_sum -= out_v
+    Window sums are computed once; moving the range forward pops expired
+    starts from the front of a monotonic deque and pushes newly admitted
+    starts at the back, so a 15-min step costs amortised O(1) instead of a
+    rescan of the horizon. The earliest window wins ties, as in
+    window_extremes().
+    """
 
-        if in_v is None:
-            none_count += 1
-        else:
-            window_sum += in_v
+    def __init__(self, sums: list[float | None], mode: str) -> None:
+        self._sums = sums
+        self._sign = 1.0 if mode == "min" else -1.0
+        self._deque: deque[int] = deque()
+        self._lo = 0
+        self._hi = 0
+
+    def query(self, lo: int, hi: int) -> tuple[int, float] | None:
+        """(start index, sum) of the extreme window starting in [lo, hi)."""
+        lo = max(lo, 0)
+        hi = min(hi, len(self._sums))
+        if lo < self._lo or hi < self._hi:
+            # Only forward moves are incremental; start over otherwise.
+            self._deque.clear()
+            self._hi = lo
+        self._lo = lo
+
+        sums, sign, dq = self._sums, self._sign, self._deque
+        for i in range(max(self._hi, lo), hi):
+            value = sums[i]
+            if value is None:
+                continue
+            while dq and sign * sums[dq[-1]] > sign * value:
+                dq.pop()
+            dq.append(i)
+        self._hi = max(self._hi, hi)
+
+        while dq and dq[0] < lo:
+            dq.popleft()
+        if not dq:
+            return None
+        return dq[0], sums[dq[0]]
+
+
+def cheapest_bucket_indices(prices: list[float | None], count: int) -> list[int]:
+    """
+    Indices of the `count` cheapest (non-None) buckets, in time order.
 
-        if none_count == 0:
-            avg = window_sum / k
-            if best_avg is None or better(avg, best_avg):
-                best_avg = avg
-                best_idx = i
+    Uses a bounded heap (O(n log k)) instead of sorting the whole array;
+    ties are resolved in favour of the earlier bucket.
+    """
+    if count <= 0:
+        return []
+    best = heapq.nsmallest(
+        count, ((p, i) for i, p in enumerate(prices) if p is not None)
+    )
+    return sorted(i for _, i in best)
+
+
+def cheapest_slots(
+    prices: list[float | None], start: dt.datetime, count: int
+) -> list[WindowResult]:
+    """Cheapest `count` buckets, merged into contiguous runs with their average."""
+    idx = cheapest_bucket_indices(prices, count)
+    runs: list[WindowResult] = []
+    i = 0
+    while i < len(idx):
+        j = i
+        while j + 1 < len(idx) and idx[j + 1] == idx[j] + 1:
+            j += 1
+        k = j - i + 1
+        total = sum(prices[x] or 0.0 for x in idx[i : j + 1])
+        runs.append(_window_result(start, idx[i], k * BUCKET_MINUTES, total / k))
+        i = j + 1
+    return runs
+
+
+def plan_load(
+    prices: list[float | None], start: dt.datetime, profile_kw: Sequence[float]
+) -> LoadPlan | None:
+    """
+    Cost-minimal start for a load with a power profile (kW per 15-min step).
 
-    if best_idx is None or best_avg is None:
+    Evaluates every start on the bucket grid whose steps all have a price
+    (a correlation of prices and per-step energy, O(n*m)); the earliest
+    start wins ties.
+    """
+    m = len(profile_kw)
+    if m == 0 or len(prices) < m:
         return None
 
-    start = day_start + dt.timedelta(minutes=best_idx * BUCKET_MINUTES)
-    end = start + dt.timedelta(minutes=window_minutes)
-    return WindowResult(start=start, end=end, avg=best_avg)
+    # kWh drawn in each 15-min step
+    weights = [kw * BUCKET_MINUTES / 60 for kw in profile_kw]
+    if ENGINE == "numpy":
+        best = _plan_load_numpy(prices, weights)
+    else:
+        best = _plan_load_python(prices, weights)
+    if best is None:
+        return None
+
+    idx, cost = best
+    plan_start = _offset(start, idx * BUCKET_MINUTES)
+    return LoadPlan(
+        start=plan_start,
+        end=_offset(plan_start, m * BUCKET_MINUTES),
+        cost_chf=cost,
+        energy_kwh=sum(weights),
+    )
+
+
+def _plan_load_python(
+    prices: list[float | None], weights: list[float]
+) -> tuple[int, float] | None:
+    m = len(weights)
+    _, cmiss = _prefix_sums_python(prices)
+    best: tuple[int, float] | None = None
+    for i in range(len(prices) - m + 1):
+        if cmiss[i + m] != cmiss[i]:
+            continue
+        cost = 0.0
+        for j, w in enumerate(weights):
+            cost += (prices[i + j] or 0.0) * w
+        if best is None or cost < best[1]:
+            best = (i, cost)
+    return best
+
+
+def _plan_load_numpy(
+    prices: list[float | None], weights: list[float]
+) -> tuple[int, float] | None:
+    m = len(weights)
+    _, cmiss = _prefix_sums_numpy(prices)
+    complete = (cmiss[m:] - cmiss[:-m]) == 0
+    if not complete.any():
+        return None
+    arr = np.array([0.0 if p is None else p for p in prices], dtype=np.float64)
+    costs = np.correlate(arr, np.asarray(weights, dtype=np.float64), mode="valid")
+    idx = int(np.where(complete, costs, np.inf).argmin())
+    return idx, float(costs[idx])
+
+
+def hourly_stats(
+    series: TariffSeries, start_ts: int | None = None, end_ts: int | None = None
+) -> list[HourlyStats]:
+    """
+    Time-weighted mean, min and max per UTC hour overlapping [start, end).
+
+    Only hours completely covered by slots are returned; slots longer than
+    an hour count towards every hour they span.
+    """
+    if not len(series):
+        return []
+    lo_ts = series.starts[0] if start_ts is None else start_ts
+    hi_ts = series.ends[-1] if end_ts is None else end_ts
+    lo_ts -= lo_ts % HOUR_SECONDS
+    hi_ts += -hi_ts % HOUR_SECONDS
+    lo, hi = series.overlapping(lo_ts, hi_ts)
+
+    out: list[HourlyStats] = []
+    hour: int | None = None
+    weighted = 0.0
+    covered = 0
+    low = high = 0.0
+
+    def flush() -> None:
+        if hour is not None and covered == HOUR_SECONDS:
+            out.append(HourlyStats(hour, weighted / HOUR_SECONDS, low, high))
+
+    starts, ends, prices = series.starts, series.ends, series.prices
+    for i in range(lo, hi):
+        start, end, price = max(starts[i], lo_ts), min(ends[i], hi_ts), prices[i]
+        while start < end:
+            slot_hour = start - start % HOUR_SECONDS
+            if slot_hour != hour:
+                flush()
+                hour, weighted, covered, low, high = slot_hour, 0.0, 0, price, price
+            part_end = min(end, slot_hour + HOUR_SECONDS)
+            weighted += price * (part_end - start)
+            covered += part_end - start
+            low, high = min(low, price), max(high, price)
+            start = part_end
+    flush()
+    return out
@@ -1,27 +1,24 @@
 from __future__ import annotations
 
+import datetime as dt
+import shutil
+import struct
+from bisect import bisect_left
+from collections import OrderedDict
+from pathlib import Path
 from typing import Any
 
-from homeassistant.helpers.storage import Store
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import STORAGE_DIR, Store
 from homeassistant.util import dt as dt_util
 
-from .api import TariffSlot
+from .api import CachedResponse, TariffSeries, TariffSlot, from_epoch
+from .const import DOMAIN, RESPONSE_CACHE_SIZE
 
 STORAGE_VERSION = 1
 
 
-def slots_to_json(slots: list[TariffSlot]) -> list[dict[str, Any]]:
-    return [
-        {
-            "start": s.start.isoformat(),
-            "end": s.end.isoformat(),
-            "price": s.price_chf_per_kwh,
-        }
-        for s in slots
-    ]
-
-
-def slots_from_json(raw: list[dict[str, Any]]) -> list[TariffSlot]:
+def slots_from_json(raw: list[dict[str, Any]]) -> TariffSeries:
     out: list[TariffSlot] = []
     for item in raw:
         start = dt_util.parse_datetime(item["start"])
@@ -35,10 +32,228 @@ def slots_from_json(raw: list[dict[str, Any]]) -> list[TariffSlot]:
                 price_chf_per_kwh=float(item["price"]),
             )
         )
-    out.sort(key=lambda s: s.start)
-    return out
+    return TariffSeries.from_slots(out)
 
 
 def make_store(hass, entry_id: str) -> Store:
     # Unique key per config entry
     return Store(hass, STORAGE_VERSION, f"ekz_tariffs.{entry_id}")
+
+
+# Archive record: start (epoch s), end (epoch s), price (CHF/kWh), little endian
+_RECORD = struct.Struct("<qqd")
+_SUFFIX = ".bin"
+# Rewrite a month file when more than half of its records are stale
+_COMPACT_RATIO = 0.5
+# Seconds to batch response cache writes
+_CACHE_SAVE_DELAY = 10
+
+
+def archive_dir(hass: HomeAssistant, entry_id: str) -> Path:
+    return Path(hass.config.path(STORAGE_DIR, DOMAIN, entry_id))
+
+
+class TariffArchive:
+    """
+    Append-only binary tariff archive, one file per local month.
+
+    Every slot is a fixed 24-byte record, so a refresh only appends the
+    added/changed slots instead of rewriting everything, and reading a
+    range only opens the month files it overlaps. Later records win over
+    earlier ones for the same time, which makes price revisions plain
+    appends. Month files are compacted when reading them and when appends
+    may have made more than _COMPACT_RATIO of their records stale. All
+    file I/O runs in the executor.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        self._hass = hass
+        self.path = archive_dir(hass, entry_id)
+        # Live records per month file when it was last read or compacted;
+        # appends only re-check a file once it grew past the compact ratio.
+        self._live: dict[str, int] = {}
+
+    async def async_read(
+        self, start_ts: int | None = None, end_ts: int | None = None
+    ) -> TariffSeries:
+        """Slots overlapping [start_ts, end_ts) (open-ended when None)."""
+        return await self._hass.async_add_executor_job(self.read, start_ts, end_ts)
+
+    async def async_append(self, series: TariffSeries) -> None:
+        if len(series):
+            await self._hass.async_add_executor_job(self.append, series)
+
+    async def async_evict(self, before_ts: int) -> None:
+        """Delete month files that end before before_ts."""
+        await self._hass.async_add_executor_job(self.evict, before_ts)
+
+    async def async_remove(self) -> None:
+        await self._hass.async_add_executor_job(shutil.rmtree, self.path, True)
+
+    def read(
+        self, start_ts: int | None = None, end_ts: int | None = None
+    ) -> TariffSeries:
+        rows: list[tuple[int, int, float]] = []
+        for path, month_start, month_end in self._months():
+            if start_ts is not None and month_end <= start_ts:
+                continue
+            if end_ts is not None and month_start >= end_ts:
+                continue
+            rows.extend(self._read_file(path))
+        rows.sort()
+        series = TariffSeries.from_rows(rows)
+        if start_ts is not None:
+            series = series.since(start_ts)
+        if end_ts is not None:
+            series = series[: bisect_left(series.starts, end_ts)]
+        return series
+
+    def append(self, series: TariffSeries) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        by_month: dict[str, bytearray] = {}
+        for start, end, price in series.rows():
+            local = from_epoch(start)
+            name = f"{local.year:04d}-{local.month:02d}{_SUFFIX}"
+            by_month.setdefault(name, bytearray()).extend(
+                _RECORD.pack(start, end, price)
+            )
+        for name, data in by_month.items():
+            path = self.path / name
+            with path.open("ab") as fh:
+                size = fh.tell()
+                fh.write(data)
+            live = self._live.setdefault(name, size // _RECORD.size)
+            records = (size + len(data)) // _RECORD.size
+            if records * (1 - _COMPACT_RATIO) > live:
+                self._read_file(path)
+
+    def evict(self, before_ts: int) -> None:
+        for path, _, month_end in self._months():
+            if month_end <= before_ts:
+                path.unlink(missing_ok=True)
+                self._live.pop(path.name, None)
+
+    def _months(self) -> list[tuple[Path, int, int]]:
+        """Archive files with their local month bounds (epoch s), oldest first."""
+        if not self.path.is_dir():
+            return []
+        out: list[tuple[Path, int, int]] = []
+        for path in sorted(self.path.glob(f"*{_SUFFIX}")):
+            try:
+                year, month = (int(p) for p in path.stem.split("-"))
+            except ValueError:
+                continue
+            start = dt.datetime(year, month, 1, tzinfo=dt_util.DEFAULT_TIME_ZONE)
+            end = (start + dt.timedelta(days=32)).replace(day=1)
+            out.append((path, int(start.timestamp()), int(end.timestamp())))
+        return out
+
+    def _read_file(self, path: Path) -> list[tuple[int, int, float]]:
+        data = path.read_bytes()
+        # A torn append leaves a partial trailing record; ignore it.
+        usable = len(data) - len(data) % _RECORD.size
+        records = list(_RECORD.iter_unpack(memoryview(data)[:usable]))
+        rows = _latest_wins(records)
+        if len(rows) < len(records) * (1 - _COMPACT_RATIO) or usable != len(data):
+            tmp = path.with_suffix(".tmp")
+            tmp.write_bytes(b"".join(_RECORD.pack(*row) for row in rows))
+            tmp.replace(path)
+        self._live[path.name] = len(rows)
+        return rows
+
+
+def _latest_wins(
+    records: list[tuple[int, int, float]],
+) -> list[tuple[int, int, float]]:
+    """Resolve overlapping records in favour of the later one, sorted by start."""
+    # Sort by start, newest first among equal starts, via the record position.
+    order = sorted(range(len(records)), key=lambda i: (records[i][0], -i))
+    kept: list[tuple[int, tuple[int, int, float]]] = []
+    for i in order:
+        rec = records[i]
+        if kept and kept[-1][1][1] > rec[0]:
+            # Overlaps the previous kept slot: keep whichever was written last.
+            if kept[-1][0] > i:
+                continue
+            while kept and kept[-1][1][1] > rec[0]:
+                kept.pop()
+        kept.append((i, rec))
+    return [rec for _, rec in kept]
+
+
+async def async_migrate_store(store: Store, archive: TariffArchive) -> None:
+    """Move slots from the legacy JSON Store into the archive (once)."""
+    saved = await store.async_load()
+    if saved and saved.get("slots"):
+        await archive.async_append(slots_from_json(saved["slots"]))
+    if saved is not None:
+        await store.async_remove()
+
+
+class ResponseCache:
+    """
+    API responses by (tariff, range), in memory and in a Store.
+
+    Holds the validators the server sent (ETag/Last-Modified) so requests
+    can be made conditional; on 304 the cached series is returned without
+    downloading or parsing anything. Least recently used entries beyond
+    max_entries are dropped.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, max_entries: int = RESPONSE_CACHE_SIZE
+    ) -> None:
+        self._store: Store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.responses")
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._loaded = False
+
+    async def async_get(
+        self, tariff_name: str, start_ts: int, end_ts: int
+    ) -> CachedResponse | None:
+        if not self._loaded:
+            await self._async_load()
+        key = _cache_key(tariff_name, start_ts, end_ts)
+        cached = self._entries.get(key)
+        if cached is not None:
+            self._entries.move_to_end(key)
+        return cached
+
+    def async_put(
+        self, tariff_name: str, start_ts: int, end_ts: int, response: CachedResponse
+    ) -> None:
+        key = _cache_key(tariff_name, start_ts, end_ts)
+        self._entries[key] = response
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+        self._store.async_delay_save(self._data_to_save, _CACHE_SAVE_DELAY)
+
+    async def _async_load(self) -> None:
+        saved = await self._store.async_load() or {}
+        for key, item in saved.get("responses", {}).items():
+            self._entries.setdefault(
+                key,
+                CachedResponse(
+                    etag=item.get("etag"),
+                    last_modified=item.get("last_modified"),
+                    series=TariffSeries.from_rows(map(tuple, item["rows"])),
+                ),
+            )
+        self._loaded = True
+
+    def _data_to_save(self) -> dict[str, Any]:
+        return {
+            "responses": {
+                key: {
+                    "etag": cached.etag,
+                    "last_modified": cached.last_modified,
+                    "rows": list(cached.series.rows()),
+                }
+                for key, cached in self._entries.items()
+            }
+        }
+
+
+def _cache_key(tariff_name: str, start_ts: int, end_ts: int) -> str:
+    return f"{tariff_name}/{start_ts}/{end_ts}"
@@ -1,9 +1,33 @@
 import datetime as dt
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable, Mapping, Sequence
 from dataclasses import dataclass
+from functools import cached_property
+from typing import Any, Protocol
 
 from homeassistant.util import dt as dt_util
 
-from .api import TariffSlot
+from .api import TariffSeries, TariffSlot, from_epoch
+from .const import (
+    CONF_HORIZON_HOURS,
+    CONF_LEVEL_CHEAP,
+    CONF_LEVEL_EXPENSIVE,
+    CONF_LEVEL_HYSTERESIS,
+    CONF_LEVEL_MODE,
+    CONF_WINDOW_MINUTES,
+    CONF_WINDOW_MODES,
+    CONF_WINDOW_SCOPES,
+    DEFAULT_HORIZON_HOURS,
+    DEFAULT_LEVEL_HYSTERESIS,
+    DEFAULT_LEVEL_MODE,
+    DEFAULT_LEVEL_THRESHOLDS,
+    DEFAULT_WINDOW_MINUTES,
+    DEFAULT_WINDOW_MODES,
+    DEFAULT_WINDOW_SCOPES,
+    LEVEL_MODE_OFF,
+    WINDOW_SCOPE_UPCOMING,
+    WINDOW_SCOPES,
+)
 
 
 @dataclass
@@ -12,29 +36,252 @@ class FusedEvent:
     end: dt.datetime
     price: float
 
+    # Fused events are built once per snapshot, so these strings are
+    # formatted once per data version and shared by all entities.
+    @cached_property
+    def start_iso(self) -> str:
+        return self.start.isoformat()
 
-def fuse_slots(slots: list[TariffSlot]) -> list[FusedEvent]:
+    @cached_property
+    def end_iso(self) -> str:
+        return self.end.isoformat()
+
+    @cached_property
+    def attributes(self) -> dict[str, Any]:
+        """{start, end, value} as listed in the state attributes."""
+        return {
+            "start": self.start_iso,
+            "end": self.end_iso,
+            "value": round(self.price, 6),
+        }
+
+
+def fuse_slots(slots: Iterable[TariffSlot]) -> list[FusedEvent]:
+    series = TariffSeries.from_slots(slots)
     fused: list[FusedEvent] = []
-    if not slots:
+    n = len(series)
+    if not n:
         return fused
 
+    starts, ends, prices = series.starts, series.ends, series.prices
+
     def norm(x: float) -> float:
         return round(x, 6)
 
-    cur = FusedEvent(
-        start=slots[0].start, end=slots[0].end, price=norm(slots[0].price_chf_per_kwh)
-    )
-    for s in slots[1:]:
-        p = norm(s.price_chf_per_kwh)
-        if p == cur.price and s.start == cur.end:
-            cur.end = s.end
+    # Work on epoch seconds and only materialize datetimes per fused event.
+    cur_start = starts[0]
+    cur_end = ends[0]
+    cur_price = norm(prices[0])
+    for i in range(1, n):
+        p = norm(prices[i])
+        if p == cur_price and starts[i] == cur_end:
+            cur_end = ends[i]
         else:
-            fused.append(cur)
-            cur = FusedEvent(start=s.start, end=s.end, price=p)
-    fused.append(cur)
+            fused.append(
+                FusedEvent(
+                    start=from_epoch(cur_start),
+                    end=from_epoch(cur_end),
+                    price=cur_price,
+                )
+            )
+            cur_start, cur_end, cur_price = starts[i], ends[i], p
+    fused.append(
+        FusedEvent(
+            start=from_epoch(cur_start), end=from_epoch(cur_end), price=cur_price
+        )
+    )
     return fused
 
 
+class _Interval(Protocol):
+    @property
+    def start(self) -> dt.datetime: ...
+
+    @property
+    def end(self) -> dt.datetime: ...
+
+
+class SlotIndex:
+    """
+    Bisect index over sorted, non-overlapping intervals (slots or fused events).
+
+    Keeps parallel start/end epoch arrays so current/next lookups are
+    O(log n) instead of a linear scan over all items.
+    """
+
+    def __init__(self, items: Sequence[_Interval]):
+        self.items = items
+        self._starts = [x.start.timestamp() for x in items]
+        self._ends = [x.end.timestamp() for x in items]
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def position(self, now: dt.datetime) -> int | None:
+        """Index of the item containing now, if any."""
+        ts = now.timestamp()
+        i = bisect_right(self._starts, ts) - 1
+        if i >= 0 and ts < self._ends[i]:
+            return i
+        return None
+
+    def next_position(self, now: dt.datetime) -> int | None:
+        """Index of the first item starting strictly after now, if any."""
+        i = bisect_right(self._starts, now.timestamp())
+        return i if i < len(self._starts) else None
+
+    def range(self, start: dt.datetime, end: dt.datetime) -> tuple[int, int]:
+        """Index range [lo, hi) of the items overlapping [start, end)."""
+        lo = bisect_right(self._ends, start.timestamp())
+        hi = bisect_left(self._starts, end.timestamp(), lo)
+        return lo, max(lo, hi)
+
+    def find(self, now: dt.datetime) -> _Interval | None:
+        i = self.position(now)
+        return self.items[i] if i is not None else None
+
+    def current_or_next(self, now: dt.datetime) -> _Interval | None:
+        i = self.position(now)
+        if i is None:
+            i = self.next_position(now)
+        return self.items[i] if i is not None else None
+
+    def next_boundary(self, now: dt.datetime) -> dt.datetime | None:
+        """
+        Next moment when the price can change:
+        - if currently in an item: its end
+        - else: the next item start after now
+        """
+        i = self.position(now)
+        if i is not None:
+            return self.items[i].end
+        i = self.next_position(now)
+        return self.items[i].start if i is not None else None
+
+
+def missing_ranges(
+    covered: Sequence[tuple[int, int]], start: int, end: int
+) -> list[tuple[int, int]]:
+    """Parts of [start, end) not in the sorted, disjoint covered ranges."""
+    out: list[tuple[int, int]] = []
+    cur = start
+    for a, b in covered:
+        if b <= cur:
+            continue
+        if a >= end:
+            break
+        if a > cur:
+            out.append((cur, a))
+        cur = max(cur, b)
+    if cur < end:
+        out.append((cur, end))
+    return out
+
+
 def next_midnight(now: dt.datetime) -> dt.datetime:
     start_today = dt_util.start_of_local_day(now)
     return start_today + dt.timedelta(days=1)
+
+
+def next_time_of_day(now: dt.datetime, hour: int, minute: int) -> dt.datetime:
+    """Next local hour:minute strictly after now."""
+    day = dt_util.as_local(now).date()
+    while True:
+        candidate = dt_util.as_local(
+            dt.datetime.combine(day, dt.time(hour, minute), dt_util.DEFAULT_TIME_ZONE)
+        )
+        if candidate > now:
+            return candidate
+        day += dt.timedelta(days=1)
+
+
+@dataclass(frozen=True)
+class WindowSpec:
+    minutes: int
+    mode: str
+    scope: str
+    # Rolling horizon of the "upcoming" scope, 0 = until end of known prices
+    horizon_minutes: int = 0
+
+    @property
+    def label(self) -> str:
+        return window_label(self.minutes)
+
+    @property
+    def scope_label(self) -> str:
+        if self.scope == WINDOW_SCOPE_UPCOMING and self.horizon_minutes:
+            return f"next {window_label(self.horizon_minutes)}"
+        return self.scope
+
+
+@dataclass(frozen=True)
+class LevelConfig:
+    mode: str
+    # CHF/kWh ("absolute") or percentiles of the day's prices ("quantile")
+    cheap: float
+    expensive: float
+    # CHF/kWh in both modes
+    hysteresis: float
+
+
+def level_config(options: Mapping[str, Any]) -> LevelConfig | None:
+    """Price level settings, None if levels are off."""
+    mode = options.get(CONF_LEVEL_MODE, DEFAULT_LEVEL_MODE)
+    if mode == LEVEL_MODE_OFF:
+        return None
+    cheap, expensive = DEFAULT_LEVEL_THRESHOLDS[mode]
+    return LevelConfig(
+        mode=mode,
+        cheap=float(options.get(CONF_LEVEL_CHEAP, cheap)),
+        expensive=float(options.get(CONF_LEVEL_EXPENSIVE, expensive)),
+        hysteresis=float(options.get(CONF_LEVEL_HYSTERESIS, DEFAULT_LEVEL_HYSTERESIS)),
+    )
+
+
+def window_label(minutes: int) -> str:
+    return f"{minutes // 60}h" if minutes % 60 == 0 else f"{minutes}min"
+
+
+def parse_window_hours(text: str) -> list[int]:
+    """Parse "1, 1.5, 3" (hours) into sorted window minutes (multiples of 15)."""
+    out: set[int] = set()
+    for part in text.replace(";", ",").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        minutes = float(part) * 60
+        if minutes <= 0 or minutes % 15 != 0:
+            raise ValueError(f"Invalid window length: {part}")
+        out.add(int(minutes))
+    if not out:
+        raise ValueError("No window length given")
+    return sorted(out)
+
+
+def format_window_hours(minutes: Iterable[int]) -> str:
+    return ", ".join(f"{m / 60:g}" for m in sorted(minutes))
+
+
+def horizon_minutes(options: Mapping[str, Any]) -> int:
+    return int(float(options.get(CONF_HORIZON_HOURS, DEFAULT_HORIZON_HOURS)) * 60)
+
+
+def window_specs(options: Mapping[str, Any]) -> list[WindowSpec]:
+    """Window sensors to create: every configured scope x mode x length."""
+    minutes = options.get(CONF_WINDOW_MINUTES, DEFAULT_WINDOW_MINUTES)
+    modes = options.get(CONF_WINDOW_MODES, DEFAULT_WINDOW_MODES)
+    scopes = options.get(CONF_WINDOW_SCOPES, DEFAULT_WINDOW_SCOPES)
+    horizon = horizon_minutes(options)
+    return [
+        WindowSpec(
+            minutes=m,
+            mode=mode,
+            scope=scope,
+            horizon_minutes=horizon if scope == WINDOW_SCOPE_UPCOMING else 0,
+        )
+        for scope in WINDOW_SCOPES
+        if scope in scopes
+        for mode in ("min", "max")
+        if mode in modes
+        for m in sorted(minutes, reverse=True)
+    ]
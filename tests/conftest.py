@@ -15,6 +15,17 @@ def auto_enable_custom_integrations(enable_custom_integrations):
     yield
 
 
+@pytest.fixture(autouse=True)
+def isolated_archive(tmp_path):
+    # The tariff archive writes real files (unlike the mocked Store); keep
+    # them out of the shared testing config dir.
+    with patch(
+        "custom_components.ekz_tariffs.storage.archive_dir",
+        lambda hass, entry_id: tmp_path / entry_id,
+    ):
+        yield
+
+
 @pytest.fixture
 def mock_config_entry() -> MockConfigEntry:
     return MockConfigEntry(
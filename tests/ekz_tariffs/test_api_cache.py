@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import datetime as dt
+from http import HTTPStatus
+
+import pytest
+from custom_components.ekz_tariffs.api import EkzTariffsApi
+from custom_components.ekz_tariffs.const import API_BASE, API_TARIFFS_PATH
+from custom_components.ekz_tariffs.storage import ResponseCache
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+URL = f"{API_BASE}{API_TARIFFS_PATH}"
+
+
+def _body(start: dt.datetime, prices: list[float]) -> dict:
+    items = []
+    for i, price in enumerate(prices):
+        slot = start + dt.timedelta(minutes=15 * i)
+        items.append(
+            {
+                "start_timestamp": slot.isoformat(),
+                "end_timestamp": (slot + dt.timedelta(minutes=15)).isoformat(),
+                "integrated": [{"unit": "CHF_kWh", "value": price}],
+            }
+        )
+    return {"prices": items}
+
+
+@pytest.mark.asyncio
+async def test_conditional_request_reuses_cached_response(
+    hass_time_zone, aioclient_mock, fixed_now
+):
+    hass = hass_time_zone
+    start = fixed_now.replace(hour=0, minute=0)
+    end = start + dt.timedelta(hours=1)
+    api = EkzTariffsApi(async_get_clientsession(hass), cache=ResponseCache(hass))
+
+    aioclient_mock.get(
+        URL,
+        json=_body(start, [0.1, 0.2, 0.3, 0.4]),
+        headers={"ETag": '"v1"', "Last-Modified": "Sun, 28 Dec 2025 17:00:00 GMT"},
+    )
+    first = await api.fetch_tariffs("400D", start, end)
+    assert list(first.prices) == [0.1, 0.2, 0.3, 0.4]
+    assert "If-None-Match" not in (aioclient_mock.mock_calls[0][3] or {})
+
+    aioclient_mock.clear_requests()
+    aioclient_mock.get(URL, status=HTTPStatus.NOT_MODIFIED)
+    second = await api.fetch_tariffs("400D", start, end)
+    assert second is first
+    headers = aioclient_mock.mock_calls[0][3]
+    assert headers["If-None-Match"] == '"v1"'
+    assert headers["If-Modified-Since"] == "Sun, 28 Dec 2025 17:00:00 GMT"
+
+    # Another range is not answered from the cache
+    aioclient_mock.clear_requests()
+    aioclient_mock.get(URL, json=_body(end, [0.5]))
+    other = await api.fetch_tariffs("400D", end, end + dt.timedelta(minutes=15))
+    assert list(other.prices) == [0.5]
+    assert "If-None-Match" not in (aioclient_mock.mock_calls[0][3] or {})
+
+
+@pytest.mark.asyncio
+async def test_response_cache_persists_and_evicts(hass_time_zone, hass_storage):
+    from custom_components.ekz_tariffs.api import CachedResponse, TariffSeries
+
+    hass = hass_time_zone
+    cache = ResponseCache(hass, max_entries=2)
+    series = TariffSeries.from_rows([(0, 900, 0.25), (900, 1800, 0.5)])
+    for start in (0, 1, 2):
+        cache.async_put("400D", start, 1800, CachedResponse('"e"', None, series))
+    assert await cache.async_get("400D", 0, 1800) is None
+
+    # Written with a delay; flush it and read it back in a new cache
+    await cache._store._async_handle_write_data()
+    restored = ResponseCache(hass, max_entries=2)
+    cached = await restored.async_get("400D", 2, 1800)
+    assert cached == CachedResponse('"e"', None, series)
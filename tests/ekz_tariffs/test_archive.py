@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import datetime as dt
+from unittest.mock import patch
+
+import pytest
+from custom_components.ekz_tariffs.api import TariffSeries
+from custom_components.ekz_tariffs.const import DOMAIN
+from custom_components.ekz_tariffs.storage import (
+    TariffArchive,
+    async_migrate_store,
+    make_store,
+)
+from homeassistant.util import dt as dt_util
+
+START = dt.datetime(2025, 12, 31, 20, 0, tzinfo=dt_util.DEFAULT_TIME_ZONE)
+
+
+def _series(prices, start=START, minutes=15):
+    from tests.conftest import make_slots
+
+    return TariffSeries.from_slots(make_slots(start, prices, minutes=minutes))
+
+
+@pytest.mark.asyncio
+async def test_archive_appends_per_month_and_reads_ranges(hass_time_zone):
+    archive = TariffArchive(hass_time_zone, "entry")
+    series = _series([0.1] * 32)  # 20:00 - 04:00, across the new year
+    await archive.async_append(series)
+
+    assert sorted(p.name for p in archive.path.iterdir()) == [
+        "2025-12.bin",
+        "2026-01.bin",
+    ]
+    assert await archive.async_read() == series
+
+    jan = int(dt.datetime(2026, 1, 1, tzinfo=dt_util.DEFAULT_TIME_ZONE).timestamp())
+    part = await archive.async_read(jan, jan + 3600)
+    assert list(part.starts) == [jan + i * 900 for i in range(4)]
+
+    # Revisions are appended; the latest record wins
+    revised = _series([0.5, 0.6], start=START + dt.timedelta(hours=1))
+    await archive.async_append(revised)
+    loaded = await archive.async_read()
+    assert len(loaded) == 32
+    assert list(loaded.prices[3:7]) == [0.1, 0.5, 0.6, 0.1]
+
+    # Later hourly slots replace the 15-min ones they overlap
+    await archive.async_append(_series([0.9], start=START, minutes=60))
+    loaded = await archive.async_read()
+    assert list(loaded.prices[:2]) == [0.9, 0.5]
+
+    await archive.async_evict(jan)
+    assert [p.name for p in archive.path.iterdir()] == ["2026-01.bin"]
+
+
+@pytest.mark.asyncio
+async def test_archive_ignores_torn_record_and_compacts(hass_time_zone):
+    archive = TariffArchive(hass_time_zone, "entry")
+    series = _series([0.2] * 4)
+    for _ in range(3):
+        await archive.async_append(series)
+    path = archive.path / "2025-12.bin"
+    with path.open("ab") as fh:
+        fh.write(b"\x01\x02\x03")
+
+    assert await archive.async_read() == series
+    assert path.stat().st_size == 4 * 24
+
+
+@pytest.mark.asyncio
+async def test_archive_compacts_on_append(hass_time_zone):
+    archive = TariffArchive(hass_time_zone, "entry")
+    path = archive.path / "2025-12.bin"
+    await archive.async_append(_series([0.1] * 8))
+    # Repeated revisions of the same slots without any read in between
+    sizes = []
+    for price in (0.2, 0.3, 0.4, 0.5, 0.6):
+        await archive.async_append(_series([price] * 8))
+        sizes.append(path.stat().st_size // 24)
+    assert max(sizes) <= 16
+    assert sizes[-1] < 8 * 6
+    assert await archive.async_read() == _series([0.6] * 8)
+
+    # New slots alone don't trigger rewrites beyond the ratio
+    await archive.async_append(_series([0.7] * 4, start=START + dt.timedelta(hours=2)))
+    assert len(await archive.async_read()) == 12
+
+
+@pytest.mark.asyncio
+async def test_setup_migrates_json_store_and_restores_archive(
+    hass_time_zone, mock_config_entry, patch_now, fixed_now
+):
+    from tests.conftest import make_slots
+
+    hass = hass_time_zone
+    mock_config_entry.add_to_hass(hass)
+    today = fixed_now.replace(hour=0, minute=0)
+    legacy = make_slots(today, [0.25] * 192)
+
+    store = make_store(hass, mock_config_entry.entry_id)
+    await store.async_save(
+        {
+            "slots": [
+                {
+                    "start": s.start.isoformat(),
+                    "end": s.end.isoformat(),
+                    "price": s.price_chf_per_kwh,
+                }
+                for s in legacy
+            ]
+        }
+    )
+
+    with patch(
+        "custom_components.ekz_tariffs.api.EkzTariffsApi.fetch_tariffs",
+        return_value=[],
+    ) as fetch:
+        assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
+        await hass.async_block_till_done()
+
+    # Today and tomorrow came from the migrated archive; nothing to fetch
+    assert fetch.call_count == 0
+    coordinator = hass.data[DOMAIN][mock_config_entry.entry_id]["coordinator"]
+    assert coordinator.data == TariffSeries.from_slots(legacy)
+    assert await store.async_load() is None
+
+    archive = TariffArchive(hass, mock_config_entry.entry_id)
+    assert await archive.async_read() == TariffSeries.from_slots(legacy)
+
+    # Migrating again is a no-op
+    await async_migrate_store(store, archive)
+    assert len(await archive.async_read()) == 192
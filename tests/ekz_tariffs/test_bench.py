@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from benchmarks.bench import SIZES, cases, compare, make_series
+
+
+def test_benchmark_cases_run(hass_time_zone):
+    # Keep the benchmark script in sync with the engine API.
+    series = make_series(SIZES["day"])
+    assert len(series) == 96
+    for fn in cases(series, SIZES["day"]).values():
+        fn()
+
+
+def test_compare_flags_only_slow_cases():
+    baseline = {"python/a/day": 10.0, "python/b/day": 10.0}
+    results = {"python/a/day": 14.0, "python/b/day": 16.0, "python/c/day": 99.0}
+    regressions = compare(results, baseline, threshold=1.5)
+    assert len(regressions) == 1
+    assert regressions[0].startswith("python/b/day")
@@ -41,10 +41,60 @@ async def test_calendar_fires_callback_event_on_start(
         assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
         await hass.async_block_till_done()
 
-        # Fire time change to exactly event start
-        async_fire_time_changed(hass, start)
-        await hass.async_block_till_done()
+        # Step through the 12:15 bucket boundary to exactly event start; the
+        # entry's scheduler only arms one timer (the next boundary) at a time.
+        for when in (now + dt.timedelta(minutes=15), start):
+            async_fire_time_changed(hass, when)
+            await hass.async_block_till_done()
 
     assert len(events) >= 1
     assert events[-1].data["type"] == EVENT_TARIFF_START
     assert events[-1].data["price_chf_per_kwh"] == 0.30
+
+
+@pytest.mark.asyncio
+async def test_calendar_get_events_pages_range(
+    hass_time_zone, mock_config_entry, patch_now, fixed_now
+):
+    from custom_components.ekz_tariffs.const import DOMAIN
+
+    from tests.conftest import make_slots
+
+    hass = hass_time_zone
+    mock_config_entry.add_to_hass(hass)
+    today = fixed_now.replace(hour=0, minute=0)
+    # Alternating prices: every 15-min slot is its own event
+    slots = make_slots(today, [0.1, 0.2] * 96)
+
+    with patch(
+        "custom_components.ekz_tariffs.api.EkzTariffsApi.fetch_tariffs",
+        return_value=slots,
+    ):
+        assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
+        await hass.async_block_till_done()
+
+    component = hass.data["calendar"]
+    entity_id = next(iter(hass.states.async_entity_ids("calendar")))
+    calendar = component.get_entity(entity_id)
+
+    start = today + dt.timedelta(hours=1, minutes=5)
+    end = today + dt.timedelta(hours=3)
+    events = await calendar.async_get_events(hass, start, end)
+    assert [e.start for e in events] == [
+        today + dt.timedelta(minutes=15 * i) for i in range(4, 12)
+    ]
+    assert events[0].summary == "EKZ 400D: 0.10000 CHF/kWh"
+
+    pages = [
+        page
+        async for page in calendar.async_iter_events(
+            today, today + dt.timedelta(days=2), page_size=50
+        )
+    ]
+    assert [len(p) for p in pages] == [50, 50, 50, 42]
+    assert [e for p in pages for e in p][4:12] == events
+    # Events are built once per data version and shared
+    assert pages[0][4] is events[0]
+    coordinator = hass.data[DOMAIN][mock_config_entry.entry_id]["coordinator"]
+    assert calendar.event is pages[0][48]
+    assert coordinator.snapshot.fused[48].start == fixed_now.replace(minute=0)
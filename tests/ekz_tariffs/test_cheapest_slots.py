@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import datetime as dt
+import random
+from unittest.mock import patch
+
+import pytest
+from custom_components.ekz_tariffs.const import (
+    CONF_CHEAPEST_COUNT,
+    DOMAIN,
+    SERVICE_CHEAPEST_SLOTS,
+)
+from custom_components.ekz_tariffs.statistics import (
+    cheapest_bucket_indices,
+    cheapest_slots,
+)
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
+
+
+def test_cheapest_bucket_indices_matches_full_sort():
+    rng = random.Random(3)
+    prices = [rng.choice([None, *range(20)]) for _ in range(200)]
+    ranked = sorted((p, i) for i, p in enumerate(prices) if p is not None)
+    for count in (0, 1, 12, 50, 500):
+        expected = sorted(i for _, i in ranked[:count])
+        assert cheapest_bucket_indices(prices, count) == expected
+
+
+def test_cheapest_slots_merges_contiguous_runs():
+    start = dt.datetime(2025, 12, 28, 0, 0, tzinfo=dt_util.DEFAULT_TIME_ZONE)
+    prices = [0.3, 0.1, 0.1, 0.3, None, 0.2, 0.3]
+    runs = cheapest_slots(prices, start, 3)
+    assert [(r.start, r.end) for r in runs] == [
+        (start + dt.timedelta(minutes=15), start + dt.timedelta(minutes=45)),
+        (start + dt.timedelta(minutes=75), start + dt.timedelta(minutes=90)),
+    ]
+    assert runs[0].avg == pytest.approx(0.1)
+    assert runs[1].avg == pytest.approx(0.2)
+
+
+@pytest.mark.asyncio
+async def test_cheapest_slots_service_and_binary_sensor(
+    hass_time_zone, mock_config_entry, patch_now, fixed_now
+):
+    from tests.conftest import make_slots
+
+    hass = hass_time_zone
+    mock_config_entry.add_to_hass(hass)
+    # The binary sensor is off by default
+    hass.config_entries.async_update_entry(
+        mock_config_entry, options={CONF_CHEAPEST_COUNT: 16}
+    )
+    day_start = fixed_now.replace(hour=0, minute=0)
+    # cheap between 12:00 and 13:00, expensive otherwise
+    prices = [0.30] * 96
+    prices[48:52] = [0.10, 0.11, 0.12, 0.13]
+    slots = make_slots(day_start, prices)
+
+    with patch(
+        "custom_components.ekz_tariffs.api.EkzTariffsApi.fetch_tariffs",
+        return_value=slots,
+    ):
+        assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
+        await hass.async_block_till_done()
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_CHEAPEST_SLOTS,
+        {"count": 3, "start": day_start.isoformat()},
+        blocking=True,
+        return_response=True,
+    )
+    assert response["count"] == 3
+    assert response["slots"] == [
+        {
+            "start": (day_start + dt.timedelta(hours=12)).isoformat(),
+            "end": (day_start + dt.timedelta(hours=12, minutes=45)).isoformat(),
+            "value": 0.11,
+        }
+    ]
+    assert response["average_price"] == pytest.approx(0.11)
+
+    registry = er.async_get(hass)
+    entity_id = registry.async_get_entity_id(
+        "binary_sensor", DOMAIN, f"{mock_config_entry.entry_id}_cheapest_slots_today"
+    )
+    assert entity_id is not None
+    # fixed_now is 12:07 -> inside the cheapest bucket
+    assert hass.states.get(entity_id).state == "on"
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import datetime as dt
+from unittest.mock import patch
+
+import pytest
+from custom_components.ekz_tariffs.api import TariffSeries
+from custom_components.ekz_tariffs.const import DOMAIN
+from custom_components.ekz_tariffs.diff import diff_series
+from custom_components.ekz_tariffs.snapshot import TariffSnapshot
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_capture_events
+
+START = dt.datetime(2025, 12, 28, 0, 0, tzinfo=dt_util.DEFAULT_TIME_ZONE)
+
+
+def _series(prices, start=START):
+    from tests.conftest import make_slots
+
+    return TariffSeries.from_slots(make_slots(start, prices))
+
+
+def _ts(minutes: int) -> int:
+    return int(START.timestamp()) + minutes * 60
+
+
+def test_diff_series_ranges(hass_time_zone):
+    old = _series([0.1, 0.1, 0.2, 0.2])
+    new = _series(
+        [0.1, 0.3, 0.3, 0.2, 0.4, 0.4], start=START + dt.timedelta(minutes=15)
+    )
+
+    diff = diff_series(old, new)
+    assert diff.removed == ((_ts(0), _ts(15)),)
+    assert diff.changed == ((_ts(30), _ts(60)),)
+    assert diff.added == ((_ts(60), _ts(105)),)
+    assert diff.days == frozenset({START.date()})
+    assert diff.affects(START + dt.timedelta(minutes=40))
+    assert not diff.affects(
+        START + dt.timedelta(minutes=15), START + dt.timedelta(minutes=30)
+    )
+
+    assert not diff_series(old, _series([0.1, 0.1, 0.2, 0.2]))
+
+
+def test_snapshot_reuses_untouched_days(hass_time_zone):
+    old = _series([0.2] * 192)
+    prices = [0.2] * 192
+    prices[100] = 0.5  # tomorrow only
+    new = _series(prices)
+
+    previous = TariffSnapshot.build(old)
+    today = previous.day(START.date())
+    tomorrow = previous.day(START.date() + dt.timedelta(days=1))
+
+    snapshot = TariffSnapshot.build(new, previous=previous, diff=diff_series(old, new))
+    assert snapshot.day(START.date()) is today
+    assert snapshot.day(START.date() + dt.timedelta(days=1)) is not tomorrow
+    assert snapshot.day(START.date() + dt.timedelta(days=1)).stats["max"] == 0.5
+
+
+@pytest.mark.asyncio
+async def test_refresh_only_writes_affected_entities(
+    hass_time_zone, mock_config_entry, patch_now, fixed_now
+):
+    from tests.conftest import make_slots
+
+    hass = hass_time_zone
+    mock_config_entry.add_to_hass(hass)
+    day_start = fixed_now.replace(hour=0, minute=0)
+    prices = [0.2] * 192
+
+    with patch(
+        "custom_components.ekz_tariffs.api.EkzTariffsApi.fetch_tariffs",
+        return_value=make_slots(day_start, prices),
+    ):
+        assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
+        await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][mock_config_entry.entry_id]["coordinator"]
+
+    changes = async_capture_events(hass, EVENT_STATE_CHANGED)
+    with patch(
+        "custom_components.ekz_tariffs.api.EkzTariffsApi.fetch_tariffs",
+        return_value=make_slots(day_start, prices),
+    ) as fetch:
+        coordinator.request_refetch()
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+    assert fetch.call_count == 1
+    assert changes == []
+
+    # A price change tomorrow leaves today's sensors alone
+    prices[120] = 0.9
+    with patch(
+        "custom_components.ekz_tariffs.api.EkzTariffsApi.fetch_tariffs",
+        return_value=make_slots(day_start, prices),
+    ):
+        coordinator.request_refetch()
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+
+    written = {e.data["entity_id"] for e in changes}
+    assert "sensor.average_price_tomorrow_400d" in written
+    assert "sensor.average_price_today_400d" not in written
+    assert "sensor.lowest_2h_window_today_400d" not in written
+    assert hass.states.get("sensor.highest_2h_window_tomorrow_400d").state == "0.2875"
+
+    # A failed archive write fails the refresh and keeps the previous diff
+    diff, base, data = coordinator.last_diff, coordinator._diff_base, coordinator.data
+    prices[121] = 0.8
+    with (
+        patch(
+            "custom_components.ekz_tariffs.api.EkzTariffsApi.fetch_tariffs",
+            return_value=make_slots(day_start, prices),
+        ),
+        patch(
+            "custom_components.ekz_tariffs.storage.TariffArchive.async_append",
+            side_effect=OSError("disk full"),
+        ),
+    ):
+        coordinator.request_refetch()
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+    assert not coordinator.last_update_success
+    assert coordinator.data is data
+    assert coordinator.last_diff is diff
+    assert coordinator._diff_base is base
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import datetime as dt
+from unittest.mock import patch
+
+import pytest
+from custom_components.ekz_tariffs.api import TariffSeries
+from custom_components.ekz_tariffs.const import DOMAIN
+from custom_components.ekz_tariffs.external_statistics import price_statistic_id
+from custom_components.ekz_tariffs.statistics import hourly_stats
+from homeassistant.components.recorder.statistics import statistics_during_period
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.components.recorder.common import (
+    async_wait_recording_done,
+)
+
+H = 3600
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(recorder_mock, enable_custom_integrations):
+    # The recorder must be set up before hass (and the custom integrations)
+    yield
+
+
+def test_hourly_stats_weights_and_skips_partial_hours():
+    series = TariffSeries.from_rows(
+        [
+            # 00:30-01:00 only -> hour 0 incomplete
+            (1800, 2700, 0.5),
+            (2700, H, 0.5),
+            # hour 1 in 15-min slots
+            (H, H + 900, 0.1),
+            (H + 900, H + 1800, 0.2),
+            (H + 1800, H + 2700, 0.3),
+            (H + 2700, 2 * H, 0.4),
+            # one 2-hour slot covering hours 2 and 3
+            (2 * H, 4 * H, 0.25),
+        ]
+    )
+    hours = hourly_stats(series)
+    assert [h.start_ts for h in hours] == [H, 2 * H, 3 * H]
+    assert hours[0].mean == pytest.approx(0.25)
+    assert (hours[0].min, hours[0].max) == (0.1, 0.4)
+    assert (hours[1].mean, hours[2].mean) == (0.25, 0.25)
+
+    # A range inside an hour selects the whole hour
+    assert [h.start_ts for h in hourly_stats(series, H + 900, H + 1000)] == [H]
+
+
+@pytest.mark.asyncio
+async def test_prices_are_imported_as_long_term_statistics(
+    recorder_mock, hass_time_zone, mock_config_entry, patch_now, fixed_now
+):
+    from tests.conftest import make_slots
+
+    hass = hass_time_zone
+    mock_config_entry.add_to_hass(hass)
+    today = fixed_now.replace(hour=0, minute=0)
+    slots = make_slots(today, [0.1, 0.2, 0.3, 0.4] * 48)
+
+    with patch(
+        "custom_components.ekz_tariffs.api.EkzTariffsApi.fetch_tariffs",
+        return_value=slots,
+    ):
+        assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
+        await hass.async_block_till_done()
+    await async_wait_recording_done(hass)
+
+    statistic_id = price_statistic_id("400D")
+    assert statistic_id == "ekz_tariffs:price_400d"
+    stats = await recorder_mock.async_add_executor_job(
+        statistics_during_period,
+        hass,
+        dt_util.as_utc(today),
+        None,
+        {statistic_id},
+        "hour",
+        None,
+        {"mean", "min", "max"},
+    )
+    rows = stats[statistic_id]
+    assert len(rows) == 48
+    assert rows[0]["start"] == today.timestamp()
+    assert rows[0]["mean"] == pytest.approx(0.25)
+    assert (rows[0]["min"], rows[0]["max"]) == (0.1, 0.4)
+
+    # A revision re-imports only the affected hour
+    coordinator = hass.data[DOMAIN][mock_config_entry.entry_id]["coordinator"]
+    revised = list(slots)
+    revised[4:8] = make_slots(today + dt.timedelta(hours=1), [0.5] * 4)
+    coordinator.request_refetch()
+    with patch(
+        "custom_components.ekz_tariffs.api.EkzTariffsApi.fetch_tariffs",
+        return_value=revised,
+    ):
+        await coordinator.async_refresh()
+    await async_wait_recording_done(hass)
+    stats = await recorder_mock.async_add_executor_job(
+        statistics_during_period,
+        hass,
+        dt_util.as_utc(today),
+        None,
+        {statistic_id},
+        "hour",
+        None,
+        {"mean"},
+    )
+    means = [row["mean"] for row in stats[statistic_id]]
+    assert len(means) == 48
+    assert means[1] == pytest.approx(0.5)
+    assert means[0] == means[2] == pytest.approx(0.25)
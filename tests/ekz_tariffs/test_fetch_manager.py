@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+from contextlib import ExitStack
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from custom_components.ekz_tariffs.const import (
+    CONF_TARIFF_NAME,
+    DATA_FETCH_MANAGER,
+    DOMAIN,
+    MAX_PARALLEL_FETCHES,
+)
+from custom_components.ekz_tariffs.fetch import async_get_fetch_manager
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+TARIFFS = ("400D", "400ST", "400F")
+
+
+@pytest.mark.asyncio
+async def test_identical_requests_are_fetched_once(
+    hass_time_zone, patch_now, fixed_now
+):
+    from tests.conftest import make_slots
+
+    hass = hass_time_zone
+    release = asyncio.Event()
+    calls = []
+
+    async def _fetch(self, *, tariff_name, start, end):
+        calls.append(tariff_name)
+        await release.wait()
+        return make_slots(start, [0.25] * 4)
+
+    manager = async_get_fetch_manager(hass)
+    assert hass.data[DATA_FETCH_MANAGER] is manager
+    start = fixed_now.replace(hour=0, minute=0)
+    end = start + dt.timedelta(hours=1)
+    with patch("custom_components.ekz_tariffs.api.EkzTariffsApi.fetch_tariffs", _fetch):
+        tasks = [
+            hass.async_create_task(manager.fetch_tariffs("400D", start, end))
+            for _ in range(3)
+        ]
+        for _ in range(3):
+            await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks)
+
+    assert calls == ["400D"]
+    assert results[0] is results[1] is results[2]
+    assert len(results[0]) == 4
+
+
+@pytest.mark.asyncio
+async def test_refresh_service_fetches_all_entries_with_bounded_parallelism(
+    hass_time_zone, patch_now, fixed_now
+):
+    from tests.conftest import make_slots
+
+    hass = hass_time_zone
+    entries = []
+    for name in TARIFFS:
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            title=f"EKZ {name}",
+            data={CONF_TARIFF_NAME: name},
+            unique_id=f"ekz_tariffs_{name}",
+        )
+        entry.add_to_hass(hass)
+        entries.append(entry)
+
+    today = fixed_now.replace(hour=0, minute=0)
+    active = 0
+    peak = 0
+    calls = []
+
+    async def _fetch(self, *, tariff_name, start, end):
+        nonlocal active, peak
+        calls.append(tariff_name)
+        active += 1
+        peak = max(peak, active)
+        for _ in range(3):
+            await asyncio.sleep(0)
+        active -= 1
+        return make_slots(today, [0.25] * 192)
+
+    with patch("custom_components.ekz_tariffs.api.EkzTariffsApi.fetch_tariffs", _fetch):
+        # Setting up the integration sets up all of its entries
+        assert await hass.config_entries.async_setup(entries[0].entry_id)
+        await hass.async_block_till_done()
+        assert sorted(calls) == sorted(TARIFFS)
+
+        calls.clear()
+        peak = 0
+        await hass.services.async_call(DOMAIN, "refresh", {}, blocking=True)
+
+        assert sorted(calls) == sorted(TARIFFS)
+        assert peak == MAX_PARALLEL_FETCHES
+
+    coordinators = [
+        hass.data[DOMAIN][entry.entry_id]["coordinator"] for entry in entries
+    ]
+    with ExitStack() as stack:
+        spies = [
+            stack.enter_context(
+                patch.object(coordinator, "async_request_refresh", new=AsyncMock())
+            )
+            for coordinator in coordinators
+        ]
+        await hass.services.async_call(
+            DOMAIN, "refresh", {"entry_id": entries[1].entry_id}, blocking=True
+        )
+    assert [spy.await_count for spy in spies] == [0, 1, 0]
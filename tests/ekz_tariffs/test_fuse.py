@@ -3,7 +3,7 @@ from __future__ import annotations
 import datetime as dt
 
 from custom_components.ekz_tariffs.api import TariffSlot
-from custom_components.ekz_tariffs.calendar import fuse_slots
+from custom_components.ekz_tariffs.utils import fuse_slots
 from homeassistant.util import dt as dt_util
 
 
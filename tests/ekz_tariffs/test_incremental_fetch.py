@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import datetime as dt
+import random
+from unittest.mock import patch
+
+import pytest
+from custom_components.ekz_tariffs.api import TariffSeries
+from custom_components.ekz_tariffs.const import CONF_HISTORY_DAYS, DOMAIN
+from custom_components.ekz_tariffs.utils import missing_ranges
+from homeassistant.util import dt as dt_util
+
+START = dt.datetime(2025, 12, 28, 0, 0, tzinfo=dt_util.DEFAULT_TIME_ZONE)
+
+
+def test_missing_ranges():
+    covered = [(0, 10), (20, 30), (40, 50)]
+    assert missing_ranges(covered, 0, 50) == [(10, 20), (30, 40)]
+    assert missing_ranges(covered, 5, 25) == [(10, 20)]
+    assert missing_ranges(covered, 45, 70) == [(50, 70)]
+    assert missing_ranges([], 3, 7) == [(3, 7)]
+    assert missing_ranges(covered, 20, 30) == []
+
+
+def test_series_merge_prefers_new_slots(hass_time_zone):
+    from tests.conftest import make_slots
+
+    old = TariffSeries.from_slots(make_slots(START, [0.1] * 8))
+    # hourly slots replacing the 15-min slots from 01:00, plus one new hour
+    new = TariffSeries.from_slots(
+        make_slots(START + dt.timedelta(hours=1), [0.5, 0.6], minutes=60)
+    )
+    merged = old.merged(new)
+    assert list(merged.prices) == [0.1, 0.1, 0.1, 0.1, 0.5, 0.6]
+    assert merged.covered() == [
+        (int(START.timestamp()), int((START + dt.timedelta(hours=3)).timestamp()))
+    ]
+    assert len(merged.since(int((START + dt.timedelta(hours=1)).timestamp()))) == 2
+
+
+def test_series_merge_matches_reference():
+    rng = random.Random(5)
+
+    def series(step: int) -> TariffSeries:
+        rows = []
+        ts = rng.randrange(0, step)
+        while ts < 40 * 900:
+            length = rng.choice([1, 2, 4]) * step
+            if rng.random() < 0.7:
+                rows.append((ts, ts + length, rng.random()))
+            ts += length
+        return TariffSeries.from_rows(rows)
+
+    for _ in range(200):
+        old, new = series(900), series(rng.choice([900, 3600]))
+        ranges = new.covered()
+        keep = [
+            row
+            for row in old.rows()
+            if not any(row[0] < end and start < row[1] for start, end in ranges)
+        ]
+        expected = TariffSeries.from_rows(sorted([*keep, *new.rows()]))
+        assert old.merged(new) == expected
+
+
+@pytest.mark.asyncio
+async def test_refresh_fetches_only_missing_days_and_evicts_history(
+    hass_time_zone, mock_config_entry, patch_now, fixed_now
+):
+    from tests.conftest import make_slots
+
+    hass = hass_time_zone
+    mock_config_entry.add_to_hass(hass)
+    hass.config_entries.async_update_entry(
+        mock_config_entry, options={CONF_HISTORY_DAYS: 1}
+    )
+    today = fixed_now.replace(hour=0, minute=0)
+    tomorrow = today + dt.timedelta(days=1)
+
+    # Tomorrow's prices are not published yet at setup.
+    with patch(
+        "custom_components.ekz_tariffs.api.EkzTariffsApi.fetch_tariffs",
+        return_value=make_slots(today, [0.2] * 96),
+    ) as fetch:
+        assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
+        await hass.async_block_till_done()
+    assert fetch.call_args.kwargs["start"] == today
+    coordinator = hass.data[DOMAIN][mock_config_entry.entry_id]["coordinator"]
+
+    with patch(
+        "custom_components.ekz_tariffs.api.EkzTariffsApi.fetch_tariffs",
+        return_value=make_slots(tomorrow, [0.3] * 96),
+    ) as fetch:
+        await coordinator.async_refresh()
+    assert fetch.call_count == 1
+    assert fetch.call_args.kwargs["start"] == tomorrow
+    assert fetch.call_args.kwargs["end"] == tomorrow + dt.timedelta(days=1)
+    assert len(coordinator.data) == 192
+
+    # Two days later: only the new window is requested, today-2 is evicted.
+    later = fixed_now + dt.timedelta(days=2)
+    with (
+        patch("homeassistant.util.dt.now", return_value=later),
+        patch(
+            "custom_components.ekz_tariffs.api.EkzTariffsApi.fetch_tariffs",
+            return_value=[],
+        ) as fetch,
+    ):
+        await coordinator.async_refresh()
+    assert fetch.call_args.kwargs["start"] == today + dt.timedelta(days=2)
+    assert coordinator.data.starts[0] == int(tomorrow.timestamp())
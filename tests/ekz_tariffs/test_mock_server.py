@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import datetime as dt
+
+import pytest
+from aiohttp import ClientResponseError
+from benchmarks.mock_server import MockConfig, MockEkzServer
+from custom_components.ekz_tariffs.api import EkzTariffsApi
+from custom_components.ekz_tariffs.storage import ResponseCache
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+
+@pytest.fixture
+async def mock_server(socket_enabled):
+    server = MockEkzServer(MockConfig())
+    base_url = await server.async_start()
+    yield server, base_url
+    await server.async_stop()
+
+
+@pytest.mark.asyncio
+async def test_api_against_mock_server(hass_time_zone, mock_server, fixed_now):
+    hass = hass_time_zone
+    server, base_url = mock_server
+    api = EkzTariffsApi(
+        async_get_clientsession(hass), cache=ResponseCache(hass), base_url=base_url
+    )
+    start = fixed_now.replace(hour=0, minute=0)
+    end = start + dt.timedelta(days=2)
+
+    series = await api.fetch_tariffs("400D", start, end)
+    assert len(series) == 192
+    assert series.starts[0] == int(start.timestamp())
+    # The API asks for the integrated tariff
+    assert series.prices[0] == server.price("integrated_400D", start)
+
+    # Same range again: conditional request answered with 304
+    assert await api.fetch_tariffs("400D", start, end) is series
+    assert server.stats.ok == 1
+    assert server.stats.not_modified == 1
+
+    # Revised prices change the ETag
+    server.config.revision = 1
+    revised = await api.fetch_tariffs("400D", start, end)
+    assert revised != series
+    assert server.stats.ok == 2
+
+    server.config.error_rate = 1.0
+    with pytest.raises(ClientResponseError):
+        await api.fetch_tariffs("400D", start, end)
+    assert server.stats.errors == 1
+
+
+@pytest.mark.asyncio
+async def test_mock_server_rate_limit(hass_time_zone, mock_server, fixed_now):
+    hass = hass_time_zone
+    server, base_url = mock_server
+    server.config.rate_limit = 0.001
+    server.config.burst = 2
+    server._tokens = 2.0
+    api = EkzTariffsApi(async_get_clientsession(hass), base_url=base_url)
+    start = fixed_now.replace(hour=0, minute=0)
+
+    for _ in range(2):
+        await api.fetch_tariffs("400D", start, start + dt.timedelta(hours=1))
+    with pytest.raises(ClientResponseError) as err:
+        await api.fetch_tariffs("400D", start, start + dt.timedelta(hours=1))
+    assert err.value.status == 429
+    assert server.stats.rate_limited == 1
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import pytest
+from custom_components.ekz_tariffs.const import (
+    CONF_LEVEL_CHEAP,
+    CONF_LEVEL_EXPENSIVE,
+    CONF_LEVEL_HYSTERESIS,
+    CONF_LEVEL_MODE,
+    CONF_WINDOW_HOURS,
+    CONF_WINDOW_MINUTES,
+    CONF_WINDOW_MODES,
+    CONF_WINDOW_SCOPES,
+    LEVEL_MODE_ABSOLUTE,
+    LEVEL_MODE_OFF,
+    LEVEL_MODE_QUANTILE,
+)
+from custom_components.ekz_tariffs.utils import parse_window_hours, window_specs
+from homeassistant.data_entry_flow import FlowResultType, InvalidData
+from homeassistant.helpers import entity_registry as er
+
+
+def test_parse_window_hours():
+    assert parse_window_hours("3, 1,1.5; 6") == [60, 90, 180, 360]
+    for bad in ("", "0", "1.1", "abc", "-2"):
+        with pytest.raises(ValueError):
+            parse_window_hours(bad)
+
+
+def test_default_window_specs_keep_legacy_sensors():
+    labels = [f"{s.mode}_{s.label}_{s.scope}" for s in window_specs({})]
+    assert labels == [
+        "min_4h_today",
+        "min_2h_today",
+        "max_4h_today",
+        "max_2h_today",
+        "min_4h_tomorrow",
+        "min_2h_tomorrow",
+        "max_4h_tomorrow",
+        "max_2h_tomorrow",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_options_flow_creates_configured_window_sensors(
+    hass_time_zone, mock_config_entry, patch_now, fixed_now
+):
+    from tests.conftest import make_slots
+
+    hass = hass_time_zone
+    mock_config_entry.add_to_hass(hass)
+    slots = make_slots(fixed_now.replace(hour=0, minute=0), [0.2] * 96)
+
+    with patch(
+        "custom_components.ekz_tariffs.api.EkzTariffsApi.fetch_tariffs",
+        return_value=slots,
+    ):
+        assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
+        await hass.async_block_till_done()
+
+        result = await hass.config_entries.options.async_init(
+            mock_config_entry.entry_id
+        )
+        assert result["type"] == FlowResultType.FORM
+
+        result = await hass.config_entries.options.async_configure(
+            result["flow_id"],
+            user_input={
+                CONF_WINDOW_HOURS: "1.1",
+                CONF_WINDOW_MODES: ["min"],
+                CONF_WINDOW_SCOPES: ["today"],
+            },
+        )
+        assert result["errors"] == {CONF_WINDOW_HOURS: "invalid_window_hours"}
+
+        result = await hass.config_entries.options.async_configure(
+            result["flow_id"],
+            user_input={
+                CONF_WINDOW_HOURS: "1, 5",
+                CONF_WINDOW_MODES: ["min"],
+                CONF_WINDOW_SCOPES: ["today", "upcoming"],
+            },
+        )
+        assert result["type"] == FlowResultType.CREATE_ENTRY
+        await hass.async_block_till_done()
+
+    assert mock_config_entry.options[CONF_WINDOW_MINUTES] == [60, 300]
+
+    registry = er.async_get(hass)
+    entry_id = mock_config_entry.entry_id
+    for suffix in ("lowest_1h_today", "lowest_5h_today", "lowest_5h_upcoming"):
+        entity_id = registry.async_get_entity_id(
+            "sensor", "ekz_tariffs", f"{entry_id}_{suffix}"
+        )
+        assert entity_id is not None, suffix
+        state = hass.states.get(entity_id)
+        assert state is not None
+        assert float(state.state) == 0.2
+
+
+@pytest.mark.asyncio
+async def test_options_flow_asks_level_thresholds_per_mode(
+    hass_time_zone, mock_config_entry, patch_now, fixed_now
+):
+    from tests.conftest import make_slots
+
+    hass = hass_time_zone
+    mock_config_entry.add_to_hass(hass)
+    slots = make_slots(fixed_now.replace(hour=0, minute=0), [0.2] * 96)
+    window = {
+        CONF_WINDOW_HOURS: "2, 4",
+        CONF_WINDOW_MODES: ["min"],
+        CONF_WINDOW_SCOPES: ["today"],
+    }
+
+    async def configure(mode):
+        result = await hass.config_entries.options.async_init(
+            mock_config_entry.entry_id
+        )
+        return await hass.config_entries.options.async_configure(
+            result["flow_id"], user_input={**window, CONF_LEVEL_MODE: mode}
+        )
+
+    with patch(
+        "custom_components.ekz_tariffs.api.EkzTariffsApi.fetch_tariffs",
+        return_value=slots,
+    ):
+        assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
+        await hass.async_block_till_done()
+
+        result = await configure(LEVEL_MODE_QUANTILE)
+        assert result["step_id"] == "levels"
+        assert result["data_schema"]({}) == {
+            CONF_LEVEL_CHEAP: 25.0,
+            CONF_LEVEL_EXPENSIVE: 75.0,
+            CONF_LEVEL_HYSTERESIS: 0.005,
+        }
+        flow_id = result["flow_id"]
+        # Percentiles stop at 100
+        with pytest.raises(InvalidData):
+            await hass.config_entries.options.async_configure(
+                flow_id, user_input={CONF_LEVEL_CHEAP: 20, CONF_LEVEL_EXPENSIVE: 150}
+            )
+        result = await hass.config_entries.options.async_configure(
+            flow_id, user_input={CONF_LEVEL_CHEAP: 60, CONF_LEVEL_EXPENSIVE: 40}
+        )
+        assert result["errors"] == {CONF_LEVEL_EXPENSIVE: "invalid_levels"}
+        result = await hass.config_entries.options.async_configure(
+            flow_id, user_input={CONF_LEVEL_CHEAP: 20, CONF_LEVEL_EXPENSIVE: 80}
+        )
+        assert result["type"] == FlowResultType.CREATE_ENTRY
+        await hass.async_block_till_done()
+        assert mock_config_entry.options[CONF_LEVEL_CHEAP] == 20
+        assert mock_config_entry.options[CONF_LEVEL_EXPENSIVE] == 80
+
+        # Same mode again: the stored thresholds are offered
+        result = await configure(LEVEL_MODE_QUANTILE)
+        assert result["data_schema"]({})[CONF_LEVEL_EXPENSIVE] == 80
+        await hass.config_entries.options.async_configure(
+            result["flow_id"],
+            user_input={CONF_LEVEL_CHEAP: 20, CONF_LEVEL_EXPENSIVE: 80},
+        )
+        await hass.async_block_till_done()
+
+        # Percentiles are not prices: switching modes starts from its defaults
+        result = await configure(LEVEL_MODE_ABSOLUTE)
+        assert result["data_schema"]({})[CONF_LEVEL_CHEAP] == 0.20
+        assert result["data_schema"]({})[CONF_LEVEL_EXPENSIVE] == 0.35
+        # Prices above 100 CHF/kWh are fine, negative ones are not
+        with pytest.raises(InvalidData):
+            await hass.config_entries.options.async_configure(
+                result["flow_id"],
+                user_input={CONF_LEVEL_CHEAP: -1, CONF_LEVEL_EXPENSIVE: 0.35},
+            )
+        result = await hass.config_entries.options.async_configure(
+            result["flow_id"],
+            user_input={CONF_LEVEL_CHEAP: 0.25, CONF_LEVEL_EXPENSIVE: 150},
+        )
+        assert result["type"] == FlowResultType.CREATE_ENTRY
+        await hass.async_block_till_done()
+
+        # Turning levels off skips the thresholds step and drops them
+        result = await configure(LEVEL_MODE_OFF)
+        assert result["type"] == FlowResultType.CREATE_ENTRY
+        await hass.async_block_till_done()
+
+    assert mock_config_entry.options[CONF_LEVEL_MODE] == LEVEL_MODE_OFF
+    assert CONF_LEVEL_CHEAP not in mock_config_entry.options
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import datetime as dt
+
+import pytest
+from custom_components.ekz_tariffs.api import _parse_prices, parse_epoch
+from homeassistant.util import dt as dt_util
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "2025-12-28T00:00:00+01:00",
+        "2025-03-30T03:00:00+02:00",
+        "2025-10-26T02:45:00+01:00",
+        "2025-10-26T02:45:00+02:00",
+        "2025-12-28T23:15:00Z",
+        "2025-12-28 23:15:00-05:30",
+        "2025-12-28T23:15:00.500+01:00",
+        "1969-12-31T23:59:59+00:00",
+    ],
+)
+def test_parse_epoch_matches_dt_util(value):
+    expected = dt_util.parse_datetime(value)
+    assert parse_epoch(value) == int(expected.timestamp())
+
+
+def test_parse_epoch_rejects_garbage_like_dt_util():
+    assert parse_epoch("not a timestamp") is None
+    with pytest.raises(ValueError):
+        parse_epoch("2025-13-45T00:00:00+01:00")
+
+
+def test_parse_epoch_reads_naive_timestamps_in_ha_time_zone():
+    zurich = dt_util.get_time_zone("Europe/Zurich")
+    previous = dt_util.DEFAULT_TIME_ZONE
+    dt_util.set_default_time_zone(zurich)
+    try:
+        expected = dt.datetime(2025, 12, 28, 23, 15, tzinfo=zurich)
+        assert parse_epoch("2025-12-28T23:15:00") == int(expected.timestamp())
+        assert parse_epoch("2025-12-28 23:15") == int(expected.timestamp())
+    finally:
+        dt_util.set_default_time_zone(previous)
+
+
+def _item(start, minutes, price):
+    end = start + dt.timedelta(minutes=minutes)
+    return {
+        "start_timestamp": start.isoformat(),
+        "end_timestamp": end.isoformat(),
+        "integrated": [
+            {"unit": "CHF_m", "value": 1.0},
+            {"unit": "CHF_kWh", "value": price},
+        ],
+    }
+
+
+def test_parse_prices_sorts_only_when_needed():
+    start = dt.datetime(2025, 12, 28, tzinfo=dt_util.get_time_zone("Europe/Zurich"))
+    items = [_item(start + dt.timedelta(minutes=15 * i), 15, i) for i in range(4)]
+    ordered = _parse_prices({"prices": items})
+    assert list(ordered.prices) == [0.0, 1.0, 2.0, 3.0]
+    assert ordered.starts[0] == int(start.timestamp())
+
+    shuffled = _parse_prices({"prices": [items[2], items[0], items[3], items[1]]})
+    assert shuffled == ordered
+
+    items[1]["integrated"] = []
+    assert list(_parse_prices({"prices": items}).prices) == [0.0, 2.0, 3.0]
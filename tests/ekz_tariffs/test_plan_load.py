@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import datetime as dt
+import random
+from unittest.mock import patch
+
+import pytest
+from custom_components.ekz_tariffs import statistics
+from custom_components.ekz_tariffs.const import DOMAIN, SERVICE_PLAN_LOAD
+from custom_components.ekz_tariffs.statistics import plan_load
+from homeassistant.util import dt as dt_util
+
+START = dt.datetime(2025, 12, 28, 0, 0, tzinfo=dt_util.DEFAULT_TIME_ZONE)
+
+
+def test_plan_load_skips_incomplete_starts():
+    prices = [0.1, None, 0.1, 0.3, 0.15, 0.2, 0.4]
+    plan = plan_load(prices, START, [4.0, 4.0])
+    # [0.1, None] is incomplete; 0.15+0.2 beats 0.1+0.3
+    assert plan.start == START + dt.timedelta(minutes=60)
+    assert plan.end == START + dt.timedelta(minutes=90)
+    assert plan.energy_kwh == pytest.approx(2.0)
+    assert plan.cost_chf == pytest.approx(0.35)
+    assert plan_load([0.1, None, 0.1], START, [1.0, 1.0]) is None
+    assert plan_load([0.1], START, [1.0, 1.0]) is None
+
+
+@pytest.mark.skipif(statistics.np is None, reason="numpy not installed")
+def test_plan_load_engines_agree():
+    rng = random.Random(8)
+    for _ in range(50):
+        prices = [rng.choice([None, *(i / 10 for i in range(10))]) for _ in range(80)]
+        weights = [rng.choice([0.0, 0.5, 2.0, 3.5]) for _ in range(rng.randint(1, 12))]
+        py = statistics._plan_load_python(prices, weights)
+        npy = statistics._plan_load_numpy(prices, weights)
+        if py is None:
+            assert npy is None
+        else:
+            assert npy[1] == pytest.approx(py[1])
+            # equal-cost ties may differ by float rounding only
+            assert sum(
+                (prices[npy[0] + j] or 0) * w for j, w in enumerate(weights)
+            ) == pytest.approx(py[1])
+
+
+@pytest.mark.asyncio
+async def test_plan_load_service(
+    hass_time_zone, mock_config_entry, patch_now, fixed_now
+):
+    from tests.conftest import make_slots
+
+    hass = hass_time_zone
+    mock_config_entry.add_to_hass(hass)
+    day_start = fixed_now.replace(hour=0, minute=0)
+    prices = [0.30] * 96
+    prices[80:84] = [0.10, 0.10, 0.20, 0.20]  # 20:00 - 21:00
+    slots = make_slots(day_start, prices)
+
+    with patch(
+        "custom_components.ekz_tariffs.api.EkzTariffsApi.fetch_tariffs",
+        return_value=slots,
+    ):
+        assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
+        await hass.async_block_till_done()
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_PLAN_LOAD,
+        {"power_profile": [4, 4, 2]},
+        blocking=True,
+        return_response=True,
+    )
+    assert response["start"] == (day_start + dt.timedelta(hours=20)).isoformat()
+    assert (
+        response["end"] == (day_start + dt.timedelta(hours=20, minutes=45)).isoformat()
+    )
+    assert response["energy_kwh"] == pytest.approx(2.5)
+    assert response["cost_chf"] == pytest.approx(0.3)
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_PLAN_LOAD,
+        {
+            "power_profile": [4, 4, 2],
+            "deadline": (day_start + dt.timedelta(hours=20, minutes=30)).isoformat(),
+        },
+        blocking=True,
+        return_response=True,
+    )
+    assert (
+        response["start"]
+        == (day_start + dt.timedelta(hours=19, minutes=45)).isoformat()
+    )
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_PLAN_LOAD,
+        {"power_profile": [1.0] * 200},
+        blocking=True,
+        return_response=True,
+    )
+    assert response["start"] is None
+    assert response["cost_chf"] is None
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import datetime as dt
+from unittest.mock import patch
+
+import pytest
+from custom_components.ekz_tariffs.const import (
+    CONF_LEVEL_CHEAP,
+    CONF_LEVEL_EXPENSIVE,
+    CONF_LEVEL_HYSTERESIS,
+    CONF_LEVEL_MODE,
+    CONF_TARIFF_NAME,
+    DOMAIN,
+    EVENT_PRICE_LEVEL,
+    EVENT_TARIFF_START,
+    EVENT_TYPE,
+    LEVEL_CHEAP,
+    LEVEL_EXPENSIVE,
+    LEVEL_MODE_ABSOLUTE,
+    LEVEL_MODE_QUANTILE,
+    LEVEL_NORMAL,
+)
+from custom_components.ekz_tariffs.snapshot import TariffSnapshot
+from custom_components.ekz_tariffs.statistics import price_levels
+from custom_components.ekz_tariffs.utils import LevelConfig, level_config
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_capture_events,
+    async_fire_time_changed,
+)
+
+C, N, E = LEVEL_CHEAP, LEVEL_NORMAL, LEVEL_EXPENSIVE
+
+
+def test_price_levels_hysteresis():
+    prices = [0.10, 0.21, 0.22, 0.26, 0.31, 0.29, 0.27, 0.19, 0.20]
+    n = len(prices)
+    levels = price_levels(prices, [0.20] * n, [0.30] * n, 0.025)
+    # 0.21/0.22 stay cheap within 0.20 + 0.025, 0.29 stays expensive
+    assert levels == [C, C, C, N, E, E, N, C, C]
+    # Without hysteresis every crossing switches
+    assert price_levels(prices, [0.20] * n, [0.30] * n, 0) == [
+        C, N, N, N, E, N, N, C, C
+    ]  # fmt: skip
+    # A jump over the normal band switches directly
+    assert price_levels([0.1, 0.4, 0.1], [0.2] * 3, [0.3] * 3, 0.5) == [C, E, C]
+    # Hysteresis is carried over from the previous level
+    assert price_levels([0.21], [0.2], [0.3], 0.025, previous=C) == [C]
+
+
+def test_level_config_from_options():
+    assert level_config({}) is None
+    assert level_config({CONF_LEVEL_MODE: LEVEL_MODE_QUANTILE}) == LevelConfig(
+        mode=LEVEL_MODE_QUANTILE, cheap=25.0, expensive=75.0, hysteresis=0.005
+    )
+    # Absolute thresholds default to prices, not percentiles
+    assert level_config({CONF_LEVEL_MODE: LEVEL_MODE_ABSOLUTE}) == LevelConfig(
+        mode=LEVEL_MODE_ABSOLUTE, cheap=0.20, expensive=0.35, hysteresis=0.005
+    )
+
+
+def test_snapshot_levels_use_daily_quantiles():
+    from tests.conftest import make_slots
+
+    tz = dt_util.DEFAULT_TIME_ZONE
+    day1 = dt.datetime(2025, 12, 28, 0, 0, tzinfo=tz)
+    day2 = day1 + dt.timedelta(days=1)
+    # Day 2 is twice as expensive, so absolute levels differ per day but the
+    # relative ones repeat.
+    shape = [0.10, 0.20, 0.30, 0.40] * 24
+    snap = TariffSnapshot.build(
+        make_slots(day1, shape) + make_slots(day2, [2 * p for p in shape])
+    )
+
+    config = LevelConfig(LEVEL_MODE_QUANTILE, 25, 75, 0.0)
+    levels = snap.price_levels(config)
+    assert snap.price_levels(config) is levels
+    assert levels.thresholds[day1.date()] == pytest.approx((0.175, 0.325))
+    assert levels.thresholds[day2.date()] == pytest.approx((0.35, 0.65))
+    assert levels.levels[:4] == levels.levels[96:100] == [C, N, N, E]
+
+    absolute = snap.price_levels(LevelConfig(LEVEL_MODE_ABSOLUTE, 0.15, 0.35, 0.0))
+    assert absolute.levels[:4] == [C, N, N, E]
+    assert absolute.levels[96:100] == [N, E, E, E]
+    # Contiguous same-level events form one run
+    assert absolute.run(97, snap.fused) == (97, 100)
+
+
+@pytest.mark.asyncio
+async def test_price_level_sensor_fires_only_on_level_change(
+    hass_time_zone, patch_now, fixed_now
+):
+    from tests.conftest import make_slots
+
+    hass = hass_time_zone
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_TARIFF_NAME: "400D"},
+        options={
+            CONF_LEVEL_MODE: LEVEL_MODE_ABSOLUTE,
+            CONF_LEVEL_CHEAP: 0.2,
+            CONF_LEVEL_EXPENSIVE: 0.3,
+            CONF_LEVEL_HYSTERESIS: 0.02,
+        },
+        unique_id="ekz_tariffs_400D",
+    )
+    entry.add_to_hass(hass)
+    start = fixed_now.replace(minute=0)
+    # 12:00 cheap, 12:15 still cheap (hysteresis), 12:30 normal, 12:45 expensive
+    slots = make_slots(start, [0.19, 0.21, 0.25, 0.35, 0.36])
+    events = async_capture_events(hass, EVENT_TYPE)
+
+    with patch(
+        "custom_components.ekz_tariffs.api.EkzTariffsApi.fetch_tariffs",
+        return_value=slots,
+    ):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+    entity_id = er.async_get(hass).async_get_entity_id(
+        "sensor", DOMAIN, f"{entry.entry_id}_price_level"
+    )
+    state = hass.states.get(entity_id)
+    assert state.state == C
+    assert state.attributes["level_start"] == start.isoformat()
+    assert (
+        state.attributes["level_end"] == (start + dt.timedelta(minutes=30)).isoformat()
+    )
+    assert state.attributes["cheap_threshold"] == 0.2
+
+    for minutes in (15, 30, 45, 60):
+        when = start + dt.timedelta(minutes=minutes)
+        with patch("homeassistant.util.dt.now", return_value=when):
+            async_fire_time_changed(hass, when)
+            await hass.async_block_till_done()
+
+    level_events = [e.data for e in events if e.data["type"] == EVENT_PRICE_LEVEL]
+    assert [(e["previous_level"], e["level"]) for e in level_events] == [
+        (C, N),
+        (N, E),
+    ]
+    assert level_events[1]["start"] == (start + dt.timedelta(minutes=45)).isoformat()
+    assert level_events[1]["end"] == (start + dt.timedelta(minutes=75)).isoformat()
+    assert len([e for e in events if e.data["type"] == EVENT_TARIFF_START]) == 4
+    assert hass.states.get(entity_id).state == E
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import datetime as dt
+from unittest.mock import patch
+
+import pytest
+from custom_components.ekz_tariffs.api import TariffSeries
+from custom_components.ekz_tariffs.const import (
+    DOMAIN,
+    RETRY_BASE_SECONDS,
+    RETRY_MAX_SECONDS,
+)
+
+FETCH = "custom_components.ekz_tariffs.api.EkzTariffsApi.fetch_tariffs"
+
+
+@pytest.mark.asyncio
+async def test_failed_fetch_is_retried_with_jittered_backoff(
+    hass_time_zone, mock_config_entry, patch_now, fixed_now
+):
+    from tests.conftest import make_slots
+
+    hass = hass_time_zone
+    mock_config_entry.add_to_hass(hass)
+    today = fixed_now.replace(hour=0, minute=0)
+
+    with patch(FETCH, return_value=make_slots(today, [0.25] * 192)):
+        assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
+        await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][mock_config_entry.entry_id]["coordinator"]
+    assert coordinator.update_interval is None
+
+    coordinator.request_refetch()
+    with patch(FETCH, side_effect=TimeoutError):
+        for n in range(6):
+            await coordinator.async_refresh()
+            assert not coordinator.last_update_success
+            delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2**n)
+            seconds = coordinator.update_interval.total_seconds()
+            assert delay / 2 <= seconds <= delay
+
+    # The pending refetch is what the retry performs; success stops retrying
+    with patch(FETCH, return_value=make_slots(today, [0.5] * 192)) as fetch:
+        await coordinator.async_refresh()
+    assert fetch.call_count == 1
+    assert coordinator.last_update_success
+    assert coordinator.update_interval is None
+    assert coordinator.data.prices[0] == 0.5
+
+
+@pytest.mark.asyncio
+async def test_missing_tomorrow_is_polled_after_publication_time(
+    hass_time_zone, mock_config_entry, fixed_now
+):
+    from tests.conftest import make_slots
+
+    hass = hass_time_zone
+    mock_config_entry.add_to_hass(hass)
+    today = fixed_now.replace(hour=0, minute=0)
+    tomorrow = today + dt.timedelta(days=1)
+    evening = fixed_now.replace(hour=18, minute=45)
+
+    with (
+        patch("homeassistant.util.dt.now", return_value=evening),
+        patch(FETCH, return_value=make_slots(today, [0.25] * 96)) as fetch,
+    ):
+        assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
+        await hass.async_block_till_done()
+        coordinator = hass.data[DOMAIN][mock_config_entry.entry_id]["coordinator"]
+
+        # Tomorrow is not published yet -> keep polling
+        assert coordinator.update_interval is not None
+        assert coordinator.needs_fetch
+        await coordinator.async_refresh()
+        assert fetch.call_args.kwargs["start"] == tomorrow
+        assert coordinator.update_interval.total_seconds() > RETRY_BASE_SECONDS / 2
+
+        fetch.return_value = make_slots(tomorrow, [0.5] * 96)
+        await coordinator.async_refresh()
+        assert coordinator.update_interval is None
+        assert not coordinator.needs_fetch
+        assert coordinator.data == TariffSeries.from_slots(
+            make_slots(today, [0.25] * 96 + [0.5] * 96)
+        )
+
+        # Complete coverage: the daily cycle does not call the API
+        fetch.reset_mock()
+        await hass.data["ekz_tariffs_fetch_manager"].async_refresh_all()
+        assert fetch.call_count == 0
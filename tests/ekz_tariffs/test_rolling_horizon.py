@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import datetime as dt
+import random
+from unittest.mock import patch
+
+import pytest
+from custom_components.ekz_tariffs.const import (
+    CONF_HORIZON_HOURS,
+    CONF_WINDOW_MINUTES,
+    CONF_WINDOW_MODES,
+    CONF_WINDOW_SCOPES,
+)
+from custom_components.ekz_tariffs.snapshot import TariffSnapshot
+from custom_components.ekz_tariffs.statistics import (
+    SlidingWindowExtreme,
+    window_extremes,
+    window_sums,
+)
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
+
+START = dt.datetime(2025, 12, 28, 0, 0, tzinfo=dt_util.DEFAULT_TIME_ZONE)
+
+
+def _brute(sums, lo, hi, mode):
+    best = None
+    for i in range(max(lo, 0), min(hi, len(sums))):
+        v = sums[i]
+        if v is None:
+            continue
+        if best is None or (v < best[1] if mode == "min" else v > best[1]):
+            best = (i, v)
+    return best
+
+
+@pytest.mark.parametrize("mode", ["min", "max"])
+def test_sliding_extreme_matches_rescan(mode):
+    rng = random.Random(9)
+    prices = [rng.choice([None, 0.1, 0.2, 0.2, 0.3, 0.4]) for _ in range(200)]
+    for k in (1, 4, 9):
+        sums = window_sums(prices, k)
+        tracker = SlidingWindowExtreme(sums, mode)
+        # fixed-length horizon, then a horizon that runs to the end
+        for lo in range(0, 190):
+            assert tracker.query(lo, lo + 40) == _brute(sums, lo, lo + 40, mode)
+        tracker = SlidingWindowExtreme(sums, mode)
+        for lo in range(0, 190, 3):
+            assert tracker.query(lo, len(sums)) == _brute(sums, lo, len(sums), mode)
+        # moving backwards falls back to a fresh scan
+        assert tracker.query(5, 60) == _brute(sums, 5, 60, mode)
+
+
+def test_rolling_horizon_matches_window_extremes(hass_time_zone):
+    from tests.conftest import make_slots
+
+    rng = random.Random(4)
+    # dyadic prices keep window sums exact, so ties resolve identically
+    prices = [rng.choice([0.125, 0.25, 0.375, 0.5]) for _ in range(192)]
+    snapshot = TariffSnapshot.build(make_slots(START, prices))
+    rolling = snapshot.rolling
+
+    for step in range(0, 150, 5):
+        now = START + dt.timedelta(minutes=15 * step + 7)
+        lo = step
+        hi = step + 24
+        expected = window_extremes(
+            prices[lo:hi], START + dt.timedelta(minutes=15 * lo), (120,)
+        )[120]
+        res = rolling.window(now, 120, "min", horizon_minutes=360)
+        assert res.start == expected.min.start
+        assert res.avg == pytest.approx(expected.min.avg)
+        assert rolling.average(now, 360) == pytest.approx(sum(prices[lo:hi]) / 24)
+
+        to_end = rolling.window(now, 120, "max")
+        expected = window_extremes(
+            prices[lo:], START + dt.timedelta(minutes=15 * lo), (120,)
+        )[120]
+        assert to_end.start == expected.max.start
+
+
+@pytest.mark.asyncio
+async def test_upcoming_scope_creates_rolling_sensors(
+    hass_time_zone, mock_config_entry, patch_now, fixed_now
+):
+    from tests.conftest import make_slots
+
+    hass = hass_time_zone
+    entry = mock_config_entry
+    entry.add_to_hass(hass)
+    hass.config_entries.async_update_entry(
+        entry,
+        options={
+            CONF_WINDOW_MINUTES: [60],
+            CONF_WINDOW_MODES: ["min"],
+            CONF_WINDOW_SCOPES: ["upcoming"],
+            CONF_HORIZON_HOURS: 6,
+        },
+    )
+    day_start = fixed_now.replace(hour=0, minute=0)
+    prices = [0.30] * 96
+    prices[60:64] = [0.10] * 4  # 15:00 - 16:00, inside the 6h horizon
+    prices[80:84] = [0.05] * 4  # 20:00 - 21:00, beyond it
+
+    with patch(
+        "custom_components.ekz_tariffs.api.EkzTariffsApi.fetch_tariffs",
+        return_value=make_slots(day_start, prices),
+    ):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+    registry = er.async_get(hass)
+    window_id = registry.async_get_entity_id(
+        "sensor", "ekz_tariffs", f"{entry.entry_id}_lowest_1h_upcoming"
+    )
+    state = hass.states.get(window_id)
+    assert float(state.state) == 0.1
+    assert (
+        state.attributes["window_start"]
+        == (day_start + dt.timedelta(hours=15)).isoformat()
+    )
+
+    avg_id = registry.async_get_entity_id(
+        "sensor", "ekz_tariffs", f"{entry.entry_id}_avg_upcoming"
+    )
+    # 24 buckets from 12:00: 4 at 0.10, 20 at 0.30
+    assert float(hass.states.get(avg_id).state) == pytest.approx(
+        round((4 * 0.1 + 20 * 0.3) / 24, 6)
+    )
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import datetime as dt
+
+import pytest
+from custom_components.ekz_tariffs.scheduler import (
+    BOUNDARY_BUCKET,
+    BOUNDARY_MIDNIGHT,
+    BOUNDARY_SLOT,
+    BoundaryScheduler,
+)
+from custom_components.ekz_tariffs.snapshot import TariffSnapshot
+from custom_components.ekz_tariffs.utils import next_time_of_day
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+
+class _FakeCoordinator:
+    def __init__(self, snapshot: TariffSnapshot) -> None:
+        self.snapshot = snapshot
+        self.listeners: list = []
+
+    def async_add_listener(self, update_callback):
+        self.listeners.append(update_callback)
+        return lambda: self.listeners.remove(update_callback)
+
+
+def test_next_time_of_day_across_dst(hass_time_zone):
+    tz = dt_util.DEFAULT_TIME_ZONE
+    # 2026-03-29 is 23h long in Zurich
+    now = dt.datetime(2026, 3, 28, 19, 0, tzinfo=tz)
+    nxt = next_time_of_day(now, 18, 30)
+    assert nxt == dt.datetime(2026, 3, 29, 18, 30, tzinfo=tz)
+    assert nxt.utcoffset() == dt.timedelta(hours=2)
+    assert next_time_of_day(nxt - dt.timedelta(minutes=1), 18, 30) == nxt
+
+
+@pytest.mark.asyncio
+async def test_scheduler_arms_one_timer_and_dispatches(
+    hass_time_zone, patch_now, fixed_now
+):
+    from tests.conftest import make_slots
+
+    hass = hass_time_zone
+    start = fixed_now.replace(hour=12, minute=0)
+    # 12:00-12:30 at 0.2, 12:30-13:00 at 0.3
+    coordinator = _FakeCoordinator(
+        TariffSnapshot.build(make_slots(start, [0.2, 0.2, 0.3, 0.3]))
+    )
+    scheduler = BoundaryScheduler(hass, coordinator)
+    calls: list[tuple[str, dt.datetime]] = []
+
+    unsub_slot = scheduler.async_subscribe(
+        BOUNDARY_SLOT, lambda when: calls.append((BOUNDARY_SLOT, when))
+    )
+    scheduler.async_subscribe(
+        BOUNDARY_BUCKET, lambda when: calls.append((BOUNDARY_BUCKET, when))
+    )
+    scheduler.async_subscribe(
+        BOUNDARY_MIDNIGHT, lambda when: calls.append((BOUNDARY_MIDNIGHT, when))
+    )
+    assert len(coordinator.listeners) == 1
+    assert scheduler.next_boundary == start + dt.timedelta(minutes=15)
+
+    for minutes in (15, 30):
+        async_fire_time_changed(hass, start + dt.timedelta(minutes=minutes))
+        await hass.async_block_till_done()
+
+    half = start + dt.timedelta(minutes=30)
+    assert calls == [
+        (BOUNDARY_BUCKET, start + dt.timedelta(minutes=15)),
+        (BOUNDARY_BUCKET, half),
+        (BOUNDARY_SLOT, half),
+    ]
+    assert scheduler.next_boundary == start + dt.timedelta(minutes=45)
+
+    # Slot boundaries are re-planned on new data
+    coordinator.snapshot = TariffSnapshot.build(
+        make_slots(start, [0.2, 0.2, 0.2, 0.2, 0.2, 0.1])
+    )
+    coordinator.listeners[0]()
+    unsub_slot()
+    assert coordinator.listeners == []
+
+    scheduler.async_stop()
+    assert scheduler.next_boundary is None
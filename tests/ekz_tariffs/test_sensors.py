@@ -46,6 +46,8 @@ async def test_current_price_and_next_change_sensors(
 
     assert current_entity_id is not None
     assert nextchange_entity_id is not None
+    # Opt-in entities are not created by default
+    assert not hass.states.async_entity_ids("binary_sensor")
 
     # State now should be within the first slot price (0.20)
     cur = hass.states.get(current_entity_id)
@@ -59,3 +61,67 @@ async def test_current_price_and_next_change_sensors(
     # fixed_now is at 11:07 -> boundary is 11:15
     print(nxt.state)
     assert "11:15:00" in nxt.state
+
+
+@pytest.mark.asyncio
+async def test_slim_attributes_move_schedule_to_unrecorded_sensor(
+    hass_time_zone, patch_now, fixed_now
+):
+    from custom_components.ekz_tariffs.const import (
+        CONF_SLIM_ATTRIBUTES,
+        CONF_TARIFF_NAME,
+        DOMAIN,
+    )
+    from pytest_homeassistant_custom_component.common import (
+        MockConfigEntry,
+        async_fire_time_changed,
+    )
+
+    from tests.conftest import make_slots
+
+    hass = hass_time_zone
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_TARIFF_NAME: "400D"},
+        options={CONF_SLIM_ATTRIBUTES: True},
+        unique_id="ekz_tariffs_400D",
+    )
+    entry.add_to_hass(hass)
+    today = fixed_now.replace(hour=0, minute=0)
+    slots = make_slots(today, [0.2, 0.3] * 96)
+
+    with patch(
+        "custom_components.ekz_tariffs.api.EkzTariffsApi.fetch_tariffs",
+        return_value=slots,
+    ):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+    registry = er.async_get(hass)
+    current_id = registry.async_get_entity_id(
+        "sensor", DOMAIN, f"{entry.entry_id}_current_price"
+    )
+    schedule_id = registry.async_get_entity_id(
+        "sensor", DOMAIN, f"{entry.entry_id}_schedule"
+    )
+
+    current = hass.states.get(current_id)
+    assert float(current.state) == 0.2
+    assert "today" not in current.attributes
+    assert "tomorrow" not in current.attributes
+    assert current.attributes["next_change"] is not None
+
+    schedule = hass.states.get(schedule_id)
+    assert len(schedule.attributes["today"]) == 96
+    assert len(schedule.attributes["tomorrow"]) == 96
+    assert schedule.attributes["schedule_date"] == "2025-12-28"
+    assert schedule.state == "2025-12-29T23:00:00+00:00"
+    assert {"today", "tomorrow"} <= schedule.state_info["unrecorded_attributes"]
+
+    # A slot boundary rewrites the price, not the schedule
+    boundary = fixed_now.replace(minute=15)
+    with patch("homeassistant.util.dt.now", return_value=boundary):
+        async_fire_time_changed(hass, boundary)
+        await hass.async_block_till_done()
+    assert float(hass.states.get(current_id).state) == 0.3
+    assert hass.states.get(schedule_id).last_updated == schedule.last_updated
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import datetime as dt
+
+from custom_components.ekz_tariffs.api import TariffSeries, TariffSlot
+from custom_components.ekz_tariffs.statistics import bucket_prices, daily_stats
+from homeassistant.util import dt as dt_util
+
+
+def test_series_roundtrip_and_slicing():
+    from tests.conftest import make_slots
+
+    tz = dt_util.DEFAULT_TIME_ZONE
+    t0 = dt.datetime(2025, 12, 28, 0, 0, tzinfo=tz)
+    slots = make_slots(t0, [0.10, 0.11, 0.12])
+
+    series = TariffSeries.from_slots(reversed(slots))
+    assert len(series) == 3
+    assert list(series) == slots
+    assert series[-1] == slots[-1]
+    assert isinstance(series[1:], TariffSeries)
+    assert list(series[1:]) == slots[1:]
+    assert series == TariffSeries.from_slots(slots)
+    assert TariffSeries.from_slots(series) is series
+
+
+async def test_bucket_prices_on_dst_day(hass_time_zone):
+    # 2025-03-30 in Europe/Zurich has only 23 hours.
+    tz = dt_util.get_time_zone("Europe/Zurich")
+    start = dt.datetime(2025, 3, 30, 0, 0, tzinfo=tz)
+    slots = [
+        TariffSlot(
+            dt_util.utc_from_timestamp(start.timestamp() + i * 900),
+            dt_util.utc_from_timestamp(start.timestamp() + (i + 1) * 900),
+            0.2,
+        )
+        for i in range(92)
+    ]
+
+    prices, day_start = bucket_prices(slots, start.date())
+    assert day_start == start
+    assert len(prices) == 92
+    assert None not in prices
+
+    stats = daily_stats(slots, start.date())
+    assert stats["covered_minutes"] == 23 * 60
+    assert stats["slots_count"] == 92
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import datetime as dt
+
+from custom_components.ekz_tariffs.utils import SlotIndex, fuse_slots
+from homeassistant.util import dt as dt_util
+
+
+def test_slot_index_current_and_next_boundary():
+    from tests.conftest import make_slots
+
+    tz = dt_util.DEFAULT_TIME_ZONE
+    t0 = dt.datetime(2025, 12, 28, 0, 0, tzinfo=tz)
+    # gap between 00:30 and 01:00
+    slots = make_slots(t0, [0.10, 0.12]) + make_slots(
+        t0 + dt.timedelta(hours=1), [0.20]
+    )
+    index = SlotIndex(fuse_slots(slots))
+
+    assert index.find(t0) is index.items[0]
+    assert index.find(t0 + dt.timedelta(minutes=20)) is index.items[1]
+    assert index.find(t0 + dt.timedelta(minutes=40)) is None
+    assert index.find(t0 - dt.timedelta(minutes=1)) is None
+
+    assert index.next_boundary(t0 + dt.timedelta(minutes=5)) == t0 + dt.timedelta(
+        minutes=15
+    )
+    # in the gap: next start
+    assert index.next_boundary(t0 + dt.timedelta(minutes=40)) == t0 + dt.timedelta(
+        hours=1
+    )
+    assert index.current_or_next(t0 + dt.timedelta(minutes=40)) is index.items[2]
+    assert index.next_boundary(t0 + dt.timedelta(hours=2)) is None
+
+
+def test_slot_index_range_selects_overlapping_items():
+    from tests.conftest import make_slots
+
+    tz = dt_util.DEFAULT_TIME_ZONE
+    t0 = dt.datetime(2025, 12, 28, 0, 0, tzinfo=tz)
+    # 00:00-00:15, 00:15-00:30, gap, 01:00-01:15
+    slots = make_slots(t0, [0.10, 0.12]) + make_slots(
+        t0 + dt.timedelta(hours=1), [0.20]
+    )
+    index = SlotIndex(fuse_slots(slots))
+
+    def minutes(m: int) -> dt.datetime:
+        return t0 + dt.timedelta(minutes=m)
+
+    assert index.range(minutes(-60), minutes(120)) == (0, 3)
+    # End is exclusive, a touching start is not an overlap
+    assert index.range(minutes(0), minutes(15)) == (0, 1)
+    assert index.range(minutes(15), minutes(16)) == (1, 2)
+    assert index.range(minutes(10), minutes(61)) == (0, 3)
+    # Inside the gap, before and after all items
+    assert index.range(minutes(35), minutes(55)) == (2, 2)
+    assert index.range(minutes(-30), minutes(0)) == (0, 0)
+    assert index.range(minutes(75), minutes(90)) == (3, 3)
+    # Inverted range
+    assert index.range(minutes(60), minutes(0)) == (2, 2)
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import datetime as dt
+from unittest.mock import patch
+
+import pytest
+from custom_components.ekz_tariffs.const import DOMAIN
+from custom_components.ekz_tariffs.snapshot import TariffSnapshot
+from homeassistant.util import dt as dt_util
+
+
+def test_snapshot_groups_events_and_caches_days():
+    from tests.conftest import make_slots
+
+    tz = dt_util.DEFAULT_TIME_ZONE
+    t0 = dt.datetime(2025, 12, 28, 23, 0, tzinfo=tz)
+    slots = make_slots(t0, [0.10, 0.10, 0.12, 0.12, 0.20, 0.20, 0.20, 0.20])
+
+    snap = TariffSnapshot.build(slots)
+    assert len(snap.fused) == 3
+    assert [e.price for e in snap.events_for_day(t0.date())] == [0.10, 0.12]
+    assert [e.price for e in snap.events_for_day(t0.date() + dt.timedelta(days=1))] == [
+        0.20
+    ]
+
+    day = snap.day(t0.date())
+    assert snap.day(t0.date()) is day
+    assert day.stats["slots_count"] == 4
+    assert day.missing_buckets == 96 - 4
+    assert day.window(30, "min") is day.window(30, "min")
+    assert day.window(30, "min").avg == pytest.approx(0.10)
+
+
+def test_snapshot_renders_event_payloads_once():
+    from tests.conftest import make_slots
+
+    tz = dt_util.DEFAULT_TIME_ZONE
+    t0 = dt.datetime(2025, 12, 28, 23, 0, tzinfo=tz)
+    snap = TariffSnapshot.build(make_slots(t0, [0.1, 0.1, 0.1234567, 0.2]))
+
+    attrs = snap.day_attributes(t0.date())
+    assert snap.day_attributes(t0.date()) is attrs
+    assert attrs[0] == {
+        "start": t0.isoformat(),
+        "end": (t0 + dt.timedelta(minutes=30)).isoformat(),
+        "value": 0.1,
+    }
+    assert attrs[1]["value"] == 0.123457
+    assert snap.fused[0].start_iso is attrs[0]["start"]
+    assert snap.day_attributes(t0.date() + dt.timedelta(days=2)) == []
+
+    builds = []
+
+    def build():
+        builds.append(1)
+        return [fe.start_iso for fe in snap.fused]
+
+    assert snap.rendered("k", build) is snap.rendered("k", build)
+    assert len(builds) == 1
+    # A new data version renders again
+    assert TariffSnapshot.build(snap.slots).rendered("k", build) is not None
+    assert len(builds) == 2
+
+
+@pytest.mark.asyncio
+async def test_coordinator_snapshot_rebuilt_only_on_data_change(
+    hass, mock_config_entry
+):
+    from tests.conftest import make_slots
+
+    mock_config_entry.add_to_hass(hass)
+    start = dt_util.start_of_local_day()
+    slots = make_slots(start, [0.20, 0.21])
+
+    with patch(
+        "custom_components.ekz_tariffs.api.EkzTariffsApi.fetch_tariffs",
+        return_value=slots,
+    ):
+        assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
+        await hass.async_block_till_done()
+
+    coordinator = hass.data[DOMAIN][mock_config_entry.entry_id]["coordinator"]
+    snap = coordinator.snapshot
+    assert coordinator.snapshot is snap
+
+    coordinator.async_set_updated_data(make_slots(start, [0.30, 0.31]))
+    assert coordinator.snapshot is not snap
+    assert coordinator.snapshot.fused[0].price == 0.30
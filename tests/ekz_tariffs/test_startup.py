@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+from unittest.mock import patch
+
+import pytest
+from custom_components.ekz_tariffs.api import TariffSeries
+from custom_components.ekz_tariffs.const import DOMAIN
+from custom_components.ekz_tariffs.storage import TariffArchive
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.helpers import entity_registry as er
+
+
+@pytest.mark.asyncio
+async def test_setup_does_not_wait_for_fetch_when_today_is_cached(
+    hass_time_zone, mock_config_entry, fixed_now
+):
+    from tests.conftest import make_slots
+
+    hass = hass_time_zone
+    # After the daily fetch time, when tomorrow's prices are published
+    evening = fixed_now.replace(hour=19)
+    mock_config_entry.add_to_hass(hass)
+    today = fixed_now.replace(hour=0, minute=0)
+    tomorrow = today + dt.timedelta(days=1)
+    archive = TariffArchive(hass, mock_config_entry.entry_id)
+    await archive.async_append(TariffSeries.from_slots(make_slots(today, [0.25] * 96)))
+
+    release = asyncio.Event()
+    calls = []
+
+    async def _slow_fetch(self, *, tariff_name, start, end):
+        calls.append((start, end))
+        await release.wait()
+        return make_slots(tomorrow, [0.5] * 96)
+
+    with (
+        patch("homeassistant.util.dt.now", return_value=evening),
+        patch(
+            "custom_components.ekz_tariffs.api.EkzTariffsApi.fetch_tariffs",
+            _slow_fetch,
+        ),
+    ):
+        assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
+        assert mock_config_entry.state is ConfigEntryState.LOADED
+
+        # Entities are up with the cached prices while tomorrow is fetched
+        registry = er.async_get(hass)
+        entity_id = registry.async_get_entity_id(
+            "sensor", DOMAIN, f"{mock_config_entry.entry_id}_current_price"
+        )
+        assert float(hass.states.get(entity_id).state) == 0.25
+        assert calls == [(tomorrow, today + dt.timedelta(days=2))]
+
+        release.set()
+        await hass.async_block_till_done()
+
+    coordinator = hass.data[DOMAIN][mock_config_entry.entry_id]["coordinator"]
+    assert len(coordinator.data) == 192
+
+
+@pytest.mark.asyncio
+async def test_setup_skips_fetch_before_tomorrow_is_published(
+    hass_time_zone, mock_config_entry, patch_now, fixed_now
+):
+    from tests.conftest import make_slots
+
+    hass = hass_time_zone
+    mock_config_entry.add_to_hass(hass)
+    today = fixed_now.replace(hour=0, minute=0)
+    archive = TariffArchive(hass, mock_config_entry.entry_id)
+    await archive.async_append(TariffSeries.from_slots(make_slots(today, [0.25] * 96)))
+
+    with patch(
+        "custom_components.ekz_tariffs.api.EkzTariffsApi.fetch_tariffs",
+        return_value=[],
+    ) as fetch:
+        assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
+        await hass.async_block_till_done()
+
+    # 12:07: tomorrow is left to the daily fetch, nothing is polled
+    assert fetch.call_count == 0
+    coordinator = hass.data[DOMAIN][mock_config_entry.entry_id]["coordinator"]
+    assert coordinator.update_interval is None
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import datetime as dt
+import random
+
+import pytest
+from custom_components.ekz_tariffs import statistics
+from custom_components.ekz_tariffs.api import TariffSeries
+from homeassistant.util import dt as dt_util
+
+pytest.importorskip("numpy")
+
+
+def _random_series(days: int, seed: int) -> TariffSeries:
+    from tests.conftest import make_slots
+
+    rng = random.Random(seed)
+    tz = dt_util.DEFAULT_TIME_ZONE
+    t0 = dt.datetime(2025, 12, 27, 0, 0, tzinfo=tz)
+    slots = make_slots(
+        t0, [round(rng.uniform(0.05, 0.40), 6) for _ in range(96 * days)]
+    )
+    # punch a few holes so missing-bucket handling is exercised
+    for _ in range(10):
+        slots.pop(rng.randrange(len(slots)))
+    return TariffSeries.from_slots(slots)
+
+
+def _run(engine: str, monkeypatch, series: TariffSeries, day: dt.date, windows):
+    monkeypatch.setattr(statistics, "ENGINE", engine)
+    stats = statistics.daily_stats(series, day)
+    prices, day_start = statistics.bucket_prices(series, day)
+    extremes = [
+        statistics.rolling_window_extreme(prices, day_start, minutes, mode)
+        for minutes, mode in windows
+    ]
+    return stats, prices, extremes
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_numpy_engine_matches_python(monkeypatch, seed):
+    series = _random_series(days=3, seed=seed)
+    windows = [(m, mode) for m in (15, 60, 120, 240, 360) for mode in ("min", "max")]
+
+    for offset in range(-1, 4):
+        day = dt.date(2025, 12, 27) + dt.timedelta(days=offset)
+        py = _run("python", monkeypatch, series, day, windows)
+        npy = _run("numpy", monkeypatch, series, day, windows)
+
+        py_stats, py_prices, py_ext = py
+        np_stats, np_prices, np_ext = npy
+        assert py_prices == np_prices
+        for key, value in py_stats.items():
+            assert np_stats[key] == pytest.approx(value), key
+        for a, b in zip(py_ext, np_ext, strict=True):
+            if a is None:
+                assert b is None
+                continue
+            assert (a.start, a.end) == (b.start, b.end)
+            assert a.avg == pytest.approx(b.avg)
+
+
+@pytest.mark.parametrize("engine", ["python", "numpy"])
+def test_window_extremes_batch_matches_single_windows(monkeypatch, engine):
+    monkeypatch.setattr(statistics, "ENGINE", engine)
+    series = _random_series(days=1, seed=7)
+    prices, day_start = statistics.bucket_prices(series, dt.date(2025, 12, 27))
+
+    lengths = (60, 120, 180, 240, 300, 360)
+    batch = statistics.window_extremes(prices, day_start, lengths)
+    assert sorted(batch) == list(lengths)
+    for minutes in lengths:
+        assert batch[minutes].min == statistics.rolling_window_extreme(
+            prices, day_start, minutes, "min"
+        )
+        assert batch[minutes].max == statistics.rolling_window_extreme(
+            prices, day_start, minutes, "max"
+        )